@@ -0,0 +1,756 @@
+# -*- coding: utf-8 -*-
+"""
+性能基准测试脚本
+用于衡量各项性能优化的效果
+"""
+
+import sys
+import os
+import json
+import logging
+import random
+import statistics
+import subprocess
+import time
+import timeit
+from datetime import date, timedelta
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def bench_lazy_logging(iterations: int = 200000):
+    """对比DEBUG关闭时，f-string日志与%-style延迟格式化的开销"""
+    print("=" * 50)
+    print("基准测试: 日志延迟格式化（DEBUG关闭）")
+    print("=" * 50)
+
+    data_file = '/path/to/users.json'
+    users = list(range(500))
+
+    def eager():
+        logger.debug(f'开始保存数据到: {data_file} ({len(users)} 个用户)')
+
+    def lazy():
+        logger.debug('开始保存数据到: %s (%s 个用户)', data_file, len(users))
+
+    def guarded():
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('开始保存数据到: %s (%s 条成绩记录)', data_file, sum(users))
+
+    def guarded_eager_arg():
+        logger.debug('开始保存数据到: %s (%s 条成绩记录)', data_file, sum(users))
+
+    original_level = logger.logger.level
+    logger.set_level(logging.INFO)
+    try:
+        results = [
+            ("f-string", timeit.timeit(eager, number=iterations)),
+            ("%-style", timeit.timeit(lazy, number=iterations)),
+            ("%-style + 昂贵参数", timeit.timeit(guarded_eager_arg, number=iterations)),
+            ("isEnabledFor 守卫", timeit.timeit(guarded, number=iterations)),
+        ]
+    finally:
+        logger.set_level(original_level)
+
+    for name, elapsed in results:
+        print(f"{name:<20} {elapsed / iterations * 1e9:8.1f} ns/次")
+    print()
+    return results
+
+
+def make_records(count: int, seed: int = 0, start: date = date(2020, 1, 1)):
+    """生成模拟成绩记录（每周一次测试）"""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        scores = {
+            "required": round(rng.uniform(4, 10), 1),
+            "category1": round(rng.uniform(4, 10), 1),
+            "category2": round(rng.uniform(4, 10), 1),
+        }
+        scores["total"] = round(sum(scores.values()), 1)
+        records.append({
+            "date": (start + timedelta(weeks=i)).isoformat(),
+            "required": {"1000m": rng.randint(220, 300)},
+            "category1": {"50m": round(rng.uniform(7.3, 9.0), 1)},
+            "category2": {"basketball": round(rng.uniform(9.4, 18.0), 1)},
+            "scores": scores,
+            "total_score": scores["total"],
+        })
+    return records
+
+
+def bench_trend_chart_refresh(record_count: int = 500, rounds: int = 5):
+    """趋势图刷新耗时：每次重建图表 vs 复用图表原地更新"""
+    print("=" * 50)
+    print(f"基准测试: 趋势图刷新（{record_count} 条记录后新增 1 条）")
+    print("=" * 50)
+
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from utils.trend_chart import TrendChart, CHART_DATA_CHANGED
+    except ImportError:
+        print("⚠️  未安装matplotlib，跳过\n")
+        return None
+
+    records = make_records(record_count + rounds)
+    title = "测试用户 - 成绩趋势分析"
+
+    # 旧方式：每次刷新都新建 Figure、坐标轴和画布
+    start = time.perf_counter()
+    for i in range(rounds):
+        chart = TrendChart()
+        canvas = FigureCanvasAgg(chart.figure)
+        chart.update(records[:record_count + i + 1], title)
+        canvas.draw()
+    rebuild_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    # 新方式：复用同一个图表，新增记录后原地更新并完整重绘
+    chart = TrendChart(animated=True)
+    canvas = FigureCanvasAgg(chart.figure)
+    chart.update(records[:record_count], title)
+    canvas.draw()
+    start = time.perf_counter()
+    for i in range(rounds):
+        chart.update(records[:record_count + i + 1], title)
+        canvas.draw()
+        chart.draw_lines()
+    reuse_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    # 坐标轴不变（只修改数值）时使用 blit 局部重绘
+    background = canvas.copy_from_bbox(chart.figure.bbox)
+    current = [dict(r) for r in records[:record_count + rounds]]
+    start = time.perf_counter()
+    for i in range(rounds):
+        current[-1] = dict(current[-1], scores=dict(current[-1]["scores"], total=float(i)))
+        assert chart.update(current, title) == CHART_DATA_CHANGED
+        canvas.restore_region(background)
+        chart.draw_lines()
+        canvas.blit(chart.figure.bbox)
+    blit_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    print(f"重建图表:          {rebuild_ms:8.1f} ms/次")
+    print(f"复用图表+完整重绘: {reuse_ms:8.1f} ms/次")
+    print(f"复用图表+blit:     {blit_ms:8.1f} ms/次")
+    print()
+    return {"rebuild_ms": rebuild_ms, "reuse_ms": reuse_ms, "blit_ms": blit_ms}
+
+
+def bench_downsampling(record_count: int = 3000, rounds: int = 3):
+    """长历史趋势图：完整绘制 vs LTTB 降采样的渲染耗时和视觉保真度"""
+    print("=" * 50)
+    print(f"基准测试: 趋势图降采样（{record_count} 条记录）")
+    print("=" * 50)
+
+    try:
+        import numpy as np
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from utils.trend_chart import TrendChart
+    except ImportError:
+        print("⚠️  未安装matplotlib，跳过\n")
+        return None
+    from utils.downsample import lttb_indices
+
+    records = make_records(record_count)
+    title = "测试用户 - 成绩趋势分析"
+
+    def render(max_points, max_ticks=None):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            chart = TrendChart(max_points=max_points, max_ticks=max_ticks or TrendChart().max_ticks)
+            canvas = FigureCanvasAgg(chart.figure)
+            chart.update(records, title)
+            canvas.draw()
+        elapsed_ms = (time.perf_counter() - start) * 1000 / rounds
+        return elapsed_ms, np.asarray(canvas.buffer_rgba(), dtype=np.float64)
+
+    # 原方式：全部数据点，每条记录一个刻度
+    original_ms, _ = render(0, max_ticks=record_count)
+    full_ms, full_image = render(0)
+    budget = TrendChart().max_points
+    sampled_ms, sampled_image = render(budget)
+
+    # 保真度：降采样折线在每个原始点上的插值误差，以及两幅图像的像素差异
+    totals = [r["scores"]["total"] for r in records]
+    kept = lttb_indices(range(record_count), totals, budget)
+    interpolated = np.interp(range(record_count), kept, [totals[i] for i in kept])
+    errors = np.abs(interpolated - np.array(totals))
+    pixel_diff = np.abs(full_image - sampled_image).mean() / 255 * 100
+
+    print(f"原方式:         {original_ms:8.1f} ms/次（{record_count} 点，{record_count} 个刻度）")
+    print(f"完整绘制:       {full_ms:8.1f} ms/次（{record_count} 点，刻度抽稀）")
+    print(f"LTTB降采样:     {sampled_ms:8.1f} ms/次（{budget} 点）")
+    print(f"总分插值误差:   平均 {errors.mean():.2f} 分，最大 {errors.max():.2f} 分")
+    print(f"像素平均差异:   {pixel_diff:.2f}%")
+    print()
+    return {"original_ms": original_ms, "full_ms": full_ms, "sampled_ms": sampled_ms,
+            "mean_error": float(errors.mean()), "pixel_diff_pct": float(pixel_diff)}
+
+
+def bench_analytics(record_count: int = 5000, rounds: int = 5):
+    """成绩分析：原多次遍历逻辑 vs 单次遍历引擎 vs 新增一条记录后的增量更新"""
+    print("=" * 50)
+    print(f"基准测试: 成绩分析（{record_count} 条记录）")
+    print("=" * 50)
+
+    from models.user_stats import UserStats
+    from services.analytics_engine import AnalyticsEngine, analyze_records
+    from test_optimization import _legacy_analyze_all_data, _make_varied_records
+
+    records = _make_varied_records(record_count + rounds)
+    base = records[:record_count]
+
+    legacy_ms = timeit.timeit(lambda: _legacy_analyze_all_data(base), number=rounds) * 1000 / rounds
+    engine_ms = timeit.timeit(lambda: analyze_records(base), number=rounds) * 1000 / rounds
+    stats = UserStats.from_records(base)
+    stored_ms = timeit.timeit(lambda: analyze_records(base, stats), number=rounds) * 1000 / rounds
+
+    engine = AnalyticsEngine(base)
+    start = time.perf_counter()
+    for i in range(rounds):
+        engine.sync(records[:record_count + i + 1])
+        engine.result()
+    append_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    print(f"原分析逻辑:     {legacy_ms:8.2f} ms/次")
+    print(f"单次遍历引擎:   {engine_ms:8.2f} ms/次")
+    print(f"使用已保存统计: {stored_ms:8.3f} ms/次")
+    print(f"新增1条增量:    {append_ms:8.3f} ms/次")
+    print()
+    return {"legacy_ms": legacy_ms, "engine_ms": engine_ms, "stored_ms": stored_ms, "append_ms": append_ms}
+
+
+def bench_cohort(record_count: int = 100000, users_count: int = 5000, queries: int = 10000):
+    """群体百分位：构建有序数组、二分查询 vs 线性扫描、增量更新 vs 重新构建"""
+    print("=" * 50)
+    print(f"基准测试: 群体百分位（{users_count} 个用户，{record_count} 条记录）")
+    print("=" * 50)
+
+    from models.user import User
+    from services.cohort_service import CohortService
+    from test_optimization import _make_varied_records
+
+    records = _make_varied_records(record_count + 1000, seed=3)
+    per_user = record_count // users_count
+    users = []
+    for i in range(users_count):
+        user = User(f"学生{i:05d}", "male" if i % 2 else "female")
+        user.records = records[i * per_user:(i + 1) * per_user]
+        users.append(user)
+
+    start = time.perf_counter()
+    service = CohortService(users)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(0)
+    targets = [rng.uniform(18, 30) for _ in range(queries)]
+    start = time.perf_counter()
+    for score in targets:
+        service.percentile("male", "total", score)
+    bisect_us = (time.perf_counter() - start) * 1e6 / queries
+
+    values = service._arrays[("male", "total")]
+    start = time.perf_counter()
+    for score in targets[:1000]:
+        sum(1 for v in values if v < score)
+    linear_us = (time.perf_counter() - start) * 1e6 / 1000
+
+    extra = records[record_count:]
+    start = time.perf_counter()
+    for i, record in enumerate(extra):
+        user = users[i % users_count]
+        user.records.append(record)
+        service.add_record(user, record)
+    add_us = (time.perf_counter() - start) * 1e6 / len(extra)
+
+    print(f"构建有序数组:       {build_ms:8.1f} ms")
+    print(f"二分查询:           {bisect_us:8.2f} µs/次")
+    print(f"线性扫描查询:       {linear_us:8.2f} µs/次")
+    print(f"增量新增一条记录:   {add_us:8.2f} µs/次（重新构建需 {build_ms:.1f} ms）")
+    print()
+    return {"build_ms": build_ms, "bisect_us": bisect_us, "linear_us": linear_us, "add_us": add_us}
+
+
+def bench_leaderboard(record_count: int = 100000, users_count: int = 5000, k: int = 10):
+    """排行榜：堆选择前K名 vs 全量排序"""
+    print("=" * 50)
+    print(f"基准测试: 排行榜前{k}名（{users_count} 个用户，{record_count} 条记录）")
+    print("=" * 50)
+
+    from models.user import User
+    from services.leaderboard_service import LeaderboardService
+    from test_optimization import _make_varied_records
+
+    records = _make_varied_records(record_count, seed=4)
+    per_user = record_count // users_count
+    users = []
+    for i in range(users_count):
+        user = User(f"学生{i:05d}", "male" if i % 2 else "female")
+        user.records = records[i * per_user:(i + 1) * per_user]
+        users.append(user)
+    service = LeaderboardService(users)
+
+    rounds = 5
+    start = time.perf_counter()
+    for _ in range(rounds):
+        service.top("total", k)
+    heap_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        ranked = sorted(service._best_entries("total"), key=lambda item: item[0], reverse=True)
+        service._ranked(ranked, "total")
+    sort_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        service.top("50m", k, gender="male", start_date="2025-03-01", end_date="2025-09-01")
+    filtered_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    print(f"堆选择前{k}名:       {heap_ms:8.1f} ms")
+    print(f"全量排序:           {sort_ms:8.1f} ms")
+    print(f"按项目/性别/日期筛选: {filtered_ms:6.1f} ms")
+    print()
+    return {"heap_ms": heap_ms, "sort_ms": sort_ms, "filtered_ms": filtered_ms}
+
+
+def bench_electives(users_count: int = 5000, records_per_user: int = 20):
+    """班级最优选考组合：逐个学生计算 vs 向量化批量计算"""
+    print("=" * 50)
+    print(f"基准测试: 最优选考组合（{users_count} 个用户 × {records_per_user} 条记录）")
+    print("=" * 50)
+
+    from models.user import User
+    from services import elective_optimizer
+    from services.elective_optimizer import ElectiveOptimizer
+    from test_optimization import _make_varied_records
+
+    users = []
+    for i in range(users_count):
+        user = User(f"学生{i:05d}", "male" if i % 2 else "female")
+        user.records = _make_varied_records(records_per_user, seed=i)
+        users.append(user)
+    optimizer = ElectiveOptimizer()
+
+    results = {}
+    for mode in ("latest", "best"):
+        start = time.perf_counter()
+        for user in users:
+            optimizer.optimize_user(user, mode)
+        scalar_ms = (time.perf_counter() - start) * 1000
+        results[mode] = {"scalar_ms": scalar_ms, "vectorized_ms": None}
+        line = f"{mode:<7} 逐个计算 {scalar_ms:8.1f} ms"
+        if elective_optimizer.np is not None:
+            start = time.perf_counter()
+            optimizer.optimize_class(users, mode)
+            results[mode]["vectorized_ms"] = (time.perf_counter() - start) * 1000
+            line += f"   向量化 {results[mode]['vectorized_ms']:8.1f} ms"
+        print(line)
+    print()
+    return results
+
+
+def bench_forecast(users_count: int = 5000, records_per_user: int = 20):
+    """班级成绩趋势预测：逐条序列回归 vs 批量回归 vs 缓存命中"""
+    print("=" * 50)
+    print(f"基准测试: 成绩趋势预测（{users_count} 个用户 × {records_per_user} 条记录）")
+    print("=" * 50)
+
+    from models.user import User
+    from services import forecast_engine
+    from services.forecast_engine import ForecastEngine
+    from test_optimization import _make_varied_records
+
+    users = []
+    for i in range(users_count):
+        user = User(f"学生{i:05d}", "male" if i % 2 else "female")
+        user.records = _make_varied_records(records_per_user, seed=i)
+        users.append(user)
+
+    results = {}
+    numpy_module = forecast_engine.np
+    try:
+        forecast_engine.np = None
+        start = time.perf_counter()
+        ForecastEngine(method="linear").forecast_class(users)
+        results["scalar_ms"] = (time.perf_counter() - start) * 1000
+    finally:
+        forecast_engine.np = numpy_module
+    print(f"逐条序列回归: {results['scalar_ms']:8.1f} ms")
+
+    engine = ForecastEngine(method="linear")
+    start = time.perf_counter()
+    engine.forecast_class(users)
+    results["vectorized_ms"] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    engine.forecast_class(users)
+    results["cached_ms"] = (time.perf_counter() - start) * 1000
+    if numpy_module is not None:
+        print(f"批量回归:     {results['vectorized_ms']:8.1f} ms")
+    print(f"缓存命中:     {results['cached_ms']:8.1f} ms")
+
+    start = time.perf_counter()
+    ForecastEngine(method="smoothing").forecast_class(users)
+    results["smoothing_ms"] = (time.perf_counter() - start) * 1000
+    print(f"指数平滑:     {results['smoothing_ms']:8.1f} ms")
+    print()
+    return results
+
+
+def bench_group_commit(adds: int = 1000, users_count: int = 40):
+    """连续录入成绩：每次立即写入 vs 合并写入（对比写入/fsync 次数和总耗时）"""
+    print("=" * 50)
+    print(f"基准测试: 合并写入（连续 {adds} 次录入，{users_count} 名学生）")
+    print("=" * 50)
+
+    import tempfile
+    from models.user import User
+    from services.data_manager import DataManager
+
+    records = make_records(adds)
+    modes = [
+        ("每次立即写入", {"group_commit": False}),
+        ("合并写入 N=20", {"group_commit": True, "max_pending": 20, "max_delay_ms": 2000}),
+        ("合并写入 N=100", {"group_commit": True, "max_pending": 100, "max_delay_ms": 2000}),
+    ]
+    results = {}
+    for name, options in modes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manager = DataManager(os.path.join(tmp_dir, "users.json"), **options)
+            for i in range(users_count):
+                manager.users.append(User(f"学生{i:02d}", "male"))
+            manager.save_data()
+            user_ids = [user.id for user in manager.users]
+            saves, fsyncs = manager.save_count, manager.fsync_count
+
+            start = time.perf_counter()
+            for i, record in enumerate(records):
+                manager.add_score_record(user_ids[i % users_count], record)
+            manager.flush()
+            elapsed = time.perf_counter() - start
+
+        results[name] = {"seconds": elapsed, "saves": manager.save_count - saves,
+                         "fsyncs": manager.fsync_count - fsyncs}
+        print(f"{name:<16} {elapsed:8.2f} 秒  写入 {results[name]['saves']:5d} 次  "
+              f"fsync {results[name]['fsyncs']:5d} 次")
+    print()
+    return results
+
+
+def bench_sharded_save(user_counts=(100, 1000, 5000), records_per_user: int = 10, adds: int = 20):
+    """录入一次成绩的写入延迟随学生人数的变化：单文件 vs 分片存储"""
+    print("=" * 50)
+    print(f"基准测试: 分片存储（每名学生 {records_per_user} 条记录，每种规模录入 {adds} 次）")
+    print("=" * 50)
+
+    import statistics
+    import tempfile
+    from models.user import User
+    from services.data_manager import DataManager
+    from services.sharded_data_manager import ShardedDataManager
+
+    records = make_records(records_per_user + adds)
+    layouts = [
+        ("单文件", lambda tmp_dir: DataManager(os.path.join(tmp_dir, "users.json"), fsync=False)),
+        ("分片", lambda tmp_dir: ShardedDataManager(os.path.join(tmp_dir, "users"), fsync=False)),
+    ]
+    results = {}
+    print(f"{'学生数':>8}  {'格式':<6}{'单次写入(中位数)':>16}{'加载':>12}")
+    for users_count in user_counts:
+        for name, factory in layouts:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                manager = factory(tmp_dir)
+                for i in range(users_count):
+                    user = User(f"学生{i:05d}", "male")
+                    user.records = list(records[:records_per_user])
+                    manager.users.append(user)
+                manager.save_data()
+                manager.fsync = True
+
+                latencies = []
+                for i, record in enumerate(records[records_per_user:]):
+                    user_id = manager.users[i * 7919 % users_count].id
+                    start = time.perf_counter()
+                    manager.add_score_record(user_id, record)
+                    latencies.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                manager.load_data()
+                load_seconds = time.perf_counter() - start
+
+            median_ms = statistics.median(latencies) * 1000
+            results[(users_count, name)] = {"save_ms": median_ms, "load_seconds": load_seconds}
+            print(f"{users_count:>8}  {name:<6}{median_ms:>14.2f}ms{load_seconds:>11.2f}s")
+    print()
+    return results
+
+
+def bench_api_server(clients: int = 32, requests_per_client: int = 25, users_count: int = 40):
+    """HTTP接口压测：并发录入成绩的吞吐、延迟，以及写入合并效果"""
+    print("=" * 50)
+    print(f"基准测试: HTTP接口并发录入（{clients} 个客户端 × {requests_per_client} 次）")
+    print("=" * 50)
+
+    import asyncio
+    import tempfile
+    from models.user import User
+    from services.api_server import ApiServer, ApiClient
+    from services.data_manager import DataManager
+
+    body = {"date": "2025-10-01", "required": {"1000m": "3:50"},
+            "category1": {"50m": 7.5}, "category2": {"basketball": 12}}
+
+    async def run(data_manager):
+        server = ApiServer(data_manager, "127.0.0.1", 0)
+        host, port = await server.start()
+        latencies = []
+
+        async def worker(index):
+            client = ApiClient(host, port)
+            for i in range(requests_per_client):
+                user = data_manager.users[(index * requests_per_client + i) % users_count]
+                start = time.perf_counter()
+                status, _ = await client.request("POST", f"/api/users/{user.id}/records", body)
+                latencies.append((time.perf_counter() - start) * 1000)
+                assert status == 201
+            await client.close()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+        await server.close()
+        return elapsed, latencies, server.persistence.saves
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_manager = DataManager(os.path.join(tmp_dir, "users.json"))
+        for i in range(users_count):
+            user = User(f"学生{i:02d}", "male")
+            user.records = make_records(20, seed=i)
+            data_manager.users.append(user)
+        data_manager.save_data()
+
+        # 对照：每次录入都完整写一次文件
+        start = time.perf_counter()
+        for _ in range(50):
+            data_manager.save_data()
+        save_ms = (time.perf_counter() - start) * 1000 / 50
+
+        elapsed, latencies, saves = asyncio.run(run(data_manager))
+
+    total = clients * requests_per_client
+    latencies.sort()
+    print(f"请求数:             {total:8d}")
+    print(f"吞吐:               {total / elapsed:8.0f} 次/秒")
+    print(f"延迟 p50/p99:       {latencies[total // 2]:6.1f} / {latencies[int(total * 0.99)]:.1f} ms")
+    print(f"文件写入次数:       {saves:8d}（逐次写入需 {total} 次，约 {save_ms * total / 1000:.1f} 秒）")
+    print()
+    return {"requests_per_second": total / elapsed, "saves": saves, "save_ms": save_ms,
+            "p50_ms": latencies[total // 2], "p99_ms": latencies[int(total * 0.99)]}
+
+
+def bench_chart_batch(user_count: int = 16, record_count: int = 20):
+    """批量渲染全班图表：单进程顺序渲染 vs 进程池并行渲染"""
+    print("=" * 50)
+    print(f"基准测试: 批量渲染图表（{user_count} 个用户，每人 2 张）")
+    print("=" * 50)
+
+    try:
+        from utils.chart_generator import render_charts_batch
+    except ImportError:
+        print("⚠️  未安装matplotlib，跳过\n")
+        return None
+    import tempfile
+    from models.user import User
+
+    users = []
+    for i in range(user_count):
+        user = User(f"学生{i:03d}", "male")
+        user.records = make_records(record_count, seed=i)
+        users.append(user)
+
+    results = {}
+    for name, workers in (("单进程", 1), ("进程池", None)):
+        with tempfile.TemporaryDirectory() as output_dir:
+            stats = render_charts_batch(users, output_dir, max_workers=workers)
+        results[name] = stats["charts_per_second"]
+        print(f"{name}: {stats['charts']} 张，耗时 {stats['seconds']:6.2f} 秒，{stats['charts_per_second']:6.1f} 张/秒")
+    print(f"CPU核数: {os.cpu_count()}")
+    print()
+    return results
+
+
+HEAVY_MODULES = ["matplotlib", "numpy", "openpyxl", "PIL"]
+
+# 在子进程中测量启动耗时；有图形环境时额外测量主窗口首次绘制耗时
+_STARTUP_SCRIPT = """
+import json, os, sys, time
+start = time.perf_counter()
+from ui.main_window import MainWindow
+import_ms = (time.perf_counter() - start) * 1000
+window_ms = ready_ms = None
+if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+    app = MainWindow()
+    app.window.update()
+    window_ms = (time.perf_counter() - start) * 1000
+    while not app.data_ready.wait(0.01):
+        app.window.update()
+    ready_ms = (time.perf_counter() - start) * 1000
+    app.window.destroy()
+heavy = sorted({m.split(".")[0] for m in sys.modules} & set(%r))
+print(json.dumps({"import_ms": import_ms, "window_ms": window_ms, "ready_ms": ready_ms, "heavy": heavy}))
+""" % HEAVY_MODULES
+
+
+def bench_parallel_load(users_count: int = 10000, records_per_user: int = 50, workers: int = 8):
+    """大数据量启动加载：单文件/分片 × 标准库 json/orjson × 顺序/线程池读取"""
+    print("=" * 50)
+    print(f"基准测试: 数据加载（{users_count} 名学生 × {records_per_user} 条记录）")
+    print("=" * 50)
+
+    import tempfile
+    from models.user import User
+    from services.data_manager import DataManager
+    from services.sharded_data_manager import ShardedDataManager
+    from utils import json_codec
+
+    decoders = ["json"] + (["orjson"] if json_codec.orjson is not None else [])
+    fast_decoder = json_codec.orjson
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        shard_dir = os.path.join(tmp_dir, "users")
+        source = DataManager(data_file, fsync=False)
+        for i in range(users_count):
+            user = User(f"学生{i:05d}", "male" if i % 2 else "female")
+            user.records = make_records(records_per_user, seed=i % 50)
+            source.users.append(user)
+        source.save_data()
+        sharded = ShardedDataManager(shard_dir, fsync=False)
+        sharded.users = source.users
+        sharded.save_data()
+        del source, sharded
+        print(f"单文件大小: {os.path.getsize(data_file) / 1024 / 1024:.1f} MB")
+
+        cases = [("单文件", lambda: DataManager(data_file)),
+                 ("分片 顺序读取", lambda: ShardedDataManager(shard_dir, load_workers=1)),
+                 (f"分片 {workers} 线程", lambda: ShardedDataManager(shard_dir, load_workers=workers))]
+        for decoder in decoders:
+            json_codec.orjson = fast_decoder if decoder == "orjson" else None
+            try:
+                for name, factory in cases:
+                    manager = factory()
+                    updates = []
+                    start = time.perf_counter()
+                    manager.load_data(progress=lambda done, total: updates.append(done))
+                    elapsed = time.perf_counter() - start
+                    assert len(manager.users) == users_count
+                    results[(name, decoder)] = elapsed
+                    print(f"{name:<12} {decoder:<7} {elapsed:8.2f} 秒  进度回调 {len(updates)} 次")
+                    del manager
+            finally:
+                json_codec.orjson = fast_decoder
+    print()
+    return results
+
+
+def bench_startup(rounds: int = 5):
+    """启动耗时：导入主窗口模块、主窗口首次绘制和后台数据加载完成的时间，以及是否加载了重量级依赖
+
+    可配合 python -X importtime -c "import ui.main_window" 查看各模块导入明细
+    """
+    print("=" * 50)
+    print("基准测试: 启动耗时")
+    print("=" * 50)
+
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for _ in range(rounds):
+        output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], cwd=root_dir,
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    import_ms = statistics.median(r["import_ms"] for r in results)
+    window_times = [r["window_ms"] for r in results if r["window_ms"] is not None]
+    window_ms = statistics.median(window_times) if window_times else None
+    ready_times = [r["ready_ms"] for r in results if r["ready_ms"] is not None]
+    ready_ms = statistics.median(ready_times) if ready_times else None
+    heavy = results[-1]["heavy"]
+
+    print(f"导入主窗口模块:   {import_ms:8.1f} ms（中位数）")
+    if window_ms is not None:
+        print(f"主窗口首次绘制:   {window_ms:8.1f} ms（中位数）")
+        print(f"后台数据加载完成: {ready_ms:8.1f} ms（中位数）")
+    else:
+        print("主窗口首次绘制:   无图形环境，跳过")
+    print(f"启动时加载的重量级依赖: {', '.join(heavy) or '无'}")
+    print()
+    return {"import_ms": import_ms, "window_ms": window_ms, "ready_ms": ready_ms, "heavy_modules": heavy}
+
+
+def bench_cli_startup(rounds: int = 5):
+    """命令行启动耗时：子进程执行 python -m cli --help 的总耗时（含解释器启动），
+    以及导入 cli 模块后是否加载了图形界面或重量级依赖
+    """
+    print("=" * 50)
+    print("基准测试: 命令行启动耗时")
+    print("=" * 50)
+
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+
+    def run(args):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, *args], cwd=root_dir,
+                                capture_output=True, text=True, check=True).stdout
+        return (time.perf_counter() - start) * 1000, output
+
+    bare_ms = statistics.median(run(["-c", "pass"])[0] for _ in range(rounds))
+    cli_ms = statistics.median(run(["-m", "cli", "--help"])[0] for _ in range(rounds))
+
+    script = ("import json, sys, cli; "
+              "print(json.dumps(sorted({m.split('.')[0] for m in sys.modules} & set(%r))))"
+              % (HEAVY_MODULES + ["tkinter"]))
+    heavy = json.loads(run(["-c", script])[1].strip().splitlines()[-1])
+
+    print(f"空解释器启动:       {bare_ms:8.1f} ms（中位数）")
+    print(f"python -m cli --help: {cli_ms:6.1f} ms（中位数）")
+    print(f"加载的图形/重量级依赖: {', '.join(heavy) or '无'}")
+    print()
+    return {"bare_ms": bare_ms, "cli_ms": cli_ms, "heavy_modules": heavy}
+
+
+BENCHMARKS = {
+    "logging": bench_lazy_logging,
+    "trend_chart": bench_trend_chart_refresh,
+    "downsampling": bench_downsampling,
+    "chart_batch": bench_chart_batch,
+    "analytics": bench_analytics,
+    "cohort": bench_cohort,
+    "leaderboard": bench_leaderboard,
+    "electives": bench_electives,
+    "forecast": bench_forecast,
+    "api_server": bench_api_server,
+    "group_commit": bench_group_commit,
+    "sharded_save": bench_sharded_save,
+    "parallel_load": bench_parallel_load,
+    "startup": bench_startup,
+    "cli_startup": bench_cli_startup,
+}
+
+
+def main(names=None):
+    """运行指定的基准测试（默认全部）"""
+    print("\n体育成绩评估系统 - 性能基准测试\n")
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            print(f"未知的基准测试: {name}，可选: {', '.join(BENCHMARKS)}")
+            continue
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
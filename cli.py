@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+"""
+体育成绩评估系统 - 命令行入口
+无需图形界面即可批量导入、评分、导出、备份与恢复，适合定时任务使用：
+
+    python -m cli import 成绩.csv
+    python -m cli score --gender male --required 1000m=3:40 --category1 50m=7.5 --category2 basketball=12
+    python -m cli export --format excel --output exports/
+    python -m cli backup / python -m cli restore latest
+    python -m cli stats --json
+    python -m cli electives --best
+    python -m cli serve --host 0.0.0.0
+    python -m cli bench cohort
+    python -m cli --shards data/users migrate to-sharded   # 单文件与分片格式互相迁移
+
+只在需要时导入 matplotlib（chart 子命令），不导入 tkinter，启动开销低
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+from typing import List, Optional
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.constants import DATA_FILE, PROJECT_NAMES, GRADE_STANDARDS
+from services.record_builder import (
+    CATEGORIES, RecordError, parse_gender, parse_project, parse_performance, build_record, grade_name
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 导入CSV的列名（与 DataExporter 导出的列名一致，另加姓名/性别/学号）
+IMPORT_COLUMNS = {
+    "name": "姓名",
+    "gender": "性别",
+    "student_id": "学号",
+    "date": "日期",
+    "required": ("必选项目", "必选成绩"),
+    "category1": ("第一类选考项目", "第一类成绩"),
+    "category2": ("第二类选考项目", "第二类成绩"),
+}
+
+
+class CliError(Exception):
+    """命令行参数错误"""
+
+
+def _open_data(args):
+    if args.shards:
+        from services.sharded_data_manager import ShardedDataManager
+        return ShardedDataManager(args.shards)
+    from services.data_manager import DataManager
+    return DataManager(args.data)
+
+
+def _select_users(data_manager, names: Optional[List[str]]) -> List:
+    """按姓名选择用户，未指定时返回全部用户"""
+    if not names:
+        return list(data_manager.users)
+    users = []
+    for name in names:
+        user = data_manager.find_user_by_name(name)
+        if user is None:
+            raise CliError(f"未找到用户: {name}")
+        users.append(user)
+    return users
+
+
+def cmd_import(args) -> int:
+    """从CSV批量导入成绩（不存在的学生自动创建），全部行校验通过后一次性保存"""
+    from models.user import User
+    from services.score_calculator import ScoreCalculator
+
+    calculator = ScoreCalculator()
+    data_manager = _open_data(args)
+    users = {user.name: user for user in data_manager.users}
+    created = []
+    imported = 0
+    errors = []
+
+    with open(args.file, newline="", encoding="utf-8-sig") as f:
+        for line_no, row in enumerate(csv.DictReader(f), 2):
+            try:
+                name = (row.get(IMPORT_COLUMNS["name"]) or "").strip()
+                if not name:
+                    raise CliError("缺少姓名")
+                gender = parse_gender(row.get(IMPORT_COLUMNS["gender"], ""))
+                items = {}
+                for category in CATEGORIES:
+                    project_column, value_column = IMPORT_COLUMNS[category]
+                    project = parse_project(category, row.get(project_column, ""))
+                    items[category] = (project, parse_performance(project, row.get(value_column, "")))
+
+                user = users.get(name)
+                if user is None:
+                    user = User(name, gender, (row.get(IMPORT_COLUMNS["student_id"]) or "").strip() or None)
+                    users[name] = user
+                    created.append(user)
+                elif user.gender != gender:
+                    raise CliError(f"性别与已有学生 {name} 不一致")
+
+                record = build_record(calculator, gender, items,
+                                      (row.get(IMPORT_COLUMNS["date"]) or "").strip() or None)
+                user.add_record(record)
+                imported += 1
+            except (CliError, RecordError) as e:
+                errors.append(f"第 {line_no} 行: {e}")
+
+    for message in errors:
+        print(message, file=sys.stderr)
+    if errors and not args.skip_errors:
+        print(f"发现 {len(errors)} 处错误，未保存任何数据（使用 --skip-errors 跳过错误行）", file=sys.stderr)
+        return 1
+
+    if args.dry_run:
+        print(f"校验通过: {imported} 条成绩，新建 {len(created)} 名学生（未保存）")
+        return 0
+
+    data_manager.users.extend(created)
+    data_manager.save_data()
+    print(f"已导入 {imported} 条成绩，新建 {len(created)} 名学生")
+    return 0
+
+
+def cmd_score(args) -> int:
+    """计算一次成绩，可选保存到指定学生"""
+    from services.score_calculator import ScoreCalculator
+
+    calculator = ScoreCalculator()
+    data_manager = None
+    gender = parse_gender(args.gender) if args.gender else None
+    if args.user:
+        data_manager = _open_data(args)
+        user = _select_users(data_manager, [args.user])[0]
+        gender = user.gender
+    if gender is None:
+        raise CliError("请指定 --gender 或 --user")
+
+    items = {}
+    for category in CATEGORIES:
+        project, sep, value = getattr(args, category).partition("=")
+        if not sep:
+            raise CliError(f"--{category} 格式应为 项目=成绩，如 50m=7.5")
+        project = parse_project(category, project)
+        items[category] = (project, parse_performance(project, value))
+
+    record = build_record(calculator, gender, items, args.date)
+    if args.json:
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+    else:
+        scores = record["scores"]
+        for category in CATEGORIES:
+            project, value = items[category]
+            print(f"{PROJECT_NAMES[project]:<8} {value:>8}  得分 {scores[category]:.1f}")
+        print(f"总分 {scores['total']:.1f}（{grade_name(scores['total'])}）")
+
+    if args.save:
+        if data_manager is None:
+            raise CliError("--save 需要同时指定 --user")
+        if not data_manager.add_score_record(user.id, record):
+            return 1
+        print(f"已保存到 {user.name}")
+    return 0
+
+
+def cmd_export(args) -> int:
+    """导出成绩记录为CSV或Excel"""
+    from utils.data_exporter import DataExporter
+
+    data_manager = _open_data(args)
+    users = _select_users(data_manager, args.user)
+    exporter = DataExporter()
+    export = exporter.export_to_excel if args.format == "excel" else exporter.export_to_csv
+    output_dir = args.output or os.getcwd()
+
+    failed = 0
+    for user in users:
+        if not user.records:
+            continue
+        path = export(user.get_all_records(), user.name, output_dir)
+        if path:
+            print(path)
+        else:
+            failed += 1
+    return 1 if failed else 0
+
+
+def _backup_manager(args):
+    from utils.backup_manager import BackupManager
+    return BackupManager(args.data, args.backup_dir)
+
+
+def cmd_backup(args) -> int:
+    """创建备份、列出备份或按保留策略清理"""
+    manager = _backup_manager(args)
+    if args.list:
+        for backup in manager.list_backups():
+            print(f"{backup['formatted_time']}  {backup['formatted_size']:>10}  {backup['name']}")
+        return 0
+    if args.prune:
+        plan = manager.apply_retention(dry_run=args.dry_run)
+        for backup in plan["prune"]:
+            print(f"{'将删除' if args.dry_run else '已删除'}: {backup['name']}")
+        return 0
+
+    path = manager.create_backup(args.name)
+    if path is None:
+        return 1
+    print(path)
+    return 0
+
+
+def cmd_restore(args) -> int:
+    """从备份恢复（备份路径、备份文件名或 latest）"""
+    manager = _backup_manager(args)
+    target = args.backup
+    if target == "latest":
+        backups = manager.list_backups()
+        if not backups:
+            raise CliError("没有可用的备份")
+        target = backups[0]["path"]
+    elif not os.path.exists(target):
+        target = os.path.join(manager.backup_dir, target)
+
+    if not manager.restore_backup(target):
+        return 1
+    print(f"已从 {target} 恢复")
+    return 0
+
+
+def cmd_stats(args) -> int:
+    """输出各学生的成绩统计"""
+    data_manager = _open_data(args)
+    rows = []
+    for user in _select_users(data_manager, args.user):
+        stats = user.get_stats()
+        latest = user.get_latest_record()
+        rows.append({
+            "name": user.name,
+            "gender": user.gender,
+            "records": stats.count,
+            "avg_score": round(stats.average, 2),
+            "best_score": stats.max_total,
+            "worst_score": stats.min_total,
+            "stdev": round(stats.stdev, 2),
+            "latest_date": latest["date"] if latest else None,
+            "latest_score": latest["scores"]["total"] if latest else None,
+        })
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{'姓名':<10}{'性别':<4}{'次数':>6}{'平均':>8}{'最高':>8}{'最低':>8}{'最近':>8}  等级")
+    for row in rows:
+        if not row["records"]:
+            print(f"{row['name']:<10}{'男' if row['gender'] == 'male' else '女':<4}{0:>6}")
+            continue
+        print(f"{row['name']:<10}{'男' if row['gender'] == 'male' else '女':<4}{row['records']:>6}"
+              f"{row['avg_score']:>8.1f}{row['best_score']:>8.1f}{row['worst_score']:>8.1f}"
+              f"{row['latest_score']:>8.1f}  {grade_name(row['latest_score'])}")
+    print(f"共 {len(rows)} 名学生，{sum(row['records'] for row in rows)} 条成绩")
+    return 0
+
+
+def cmd_electives(args) -> int:
+    """按已测成绩计算每名学生总分最高的选考组合"""
+    from services.elective_optimizer import ElectiveOptimizer, CATEGORIES as ELECTIVE_CATEGORIES
+
+    data_manager = _open_data(args)
+    results = ElectiveOptimizer().optimize_class(_select_users(data_manager, args.user),
+                                                 mode="best" if args.best else "latest")
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"{'姓名':<10}{'必选项':<10}{'第一类':<10}{'第二类':<10}{'最优总分':>8}{'最近总分':>8}  预计等级")
+    for result in results:
+        projects = [PROJECT_NAMES.get(item["project"], item["project"]) if item else "-"
+                    for item in (result["selection"][category] for category in ELECTIVE_CATEGORIES)]
+        current = f"{result['current_total']:.1f}" if result["current_total"] is not None else "-"
+        print(f"{result['name']:<10}{projects[0]:<10}{projects[1]:<10}{projects[2]:<10}"
+              f"{result['total']:>8.1f}{current:>8}  {GRADE_STANDARDS[result['grade']]['name']}"
+              f"{'' if result['complete'] else '（项目不全）'}")
+    return 0
+
+
+def cmd_chart(args) -> int:
+    """批量生成成绩图表（需要matplotlib）"""
+    try:
+        from utils.chart_generator import render_charts_batch
+    except ImportError:
+        raise CliError("生成图表需要安装 matplotlib")
+
+    data_manager = _open_data(args)
+    users = [user for user in _select_users(data_manager, args.user) if user.records]
+    result = render_charts_batch(users, args.output, max_workers=args.workers, dpi=args.dpi)
+    for path in result["paths"]:
+        print(path)
+    return 1 if result["failed"] else 0
+
+
+def cmd_serve(args) -> int:
+    """启动本地HTTP/JSON接口服务"""
+    from services.api_server import run_server
+
+    data_manager = _open_data(args)
+    print("接口服务运行中，按 Ctrl+C 退出")
+    run_server(data_manager, args.host, args.port)
+    return 0
+
+
+def cmd_migrate(args) -> int:
+    """在单文件格式（--data）和分片格式（--shards）之间迁移数据"""
+    from services.sharded_data_manager import default_shard_dir, migrate_to_sharded, migrate_to_single
+
+    shard_dir = args.shards or default_shard_dir()
+    try:
+        if args.direction == "to-sharded":
+            count = migrate_to_sharded(args.data, shard_dir, overwrite=args.force)
+            print(f"已迁移 {count} 名学生: {args.data} -> {shard_dir}")
+        else:
+            count = migrate_to_single(shard_dir, args.data, overwrite=args.force)
+            print(f"已迁移 {count} 名学生: {shard_dir} -> {args.data}")
+    except FileNotFoundError as e:
+        raise CliError(f"源数据不存在: {e}")
+    except ValueError as e:
+        raise CliError(f"{e}（使用 --force 覆盖）")
+    return 0
+
+
+def cmd_bench(args) -> int:
+    """运行性能基准测试"""
+    import benchmark
+    benchmark.main(args.names)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(prog="python -m cli", description="体育成绩评估系统命令行工具")
+    parser.add_argument("--data", default=DATA_FILE, help="数据文件路径（默认使用程序数据文件）")
+    parser.add_argument("--shards", help="分片数据目录（指定后使用分片格式代替 --data）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="在控制台输出INFO级别日志")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    p = subparsers.add_parser("import", help="从CSV批量导入成绩")
+    p.add_argument("file", help="CSV文件，列: 姓名,性别,[学号],[日期],必选项目,必选成绩,"
+                                "第一类选考项目,第一类成绩,第二类选考项目,第二类成绩")
+    p.add_argument("--dry-run", action="store_true", help="只校验不保存")
+    p.add_argument("--skip-errors", action="store_true", help="跳过有错误的行，导入其余数据")
+    p.set_defaults(func=cmd_import)
+
+    p = subparsers.add_parser("score", help="计算一次成绩")
+    p.add_argument("--gender", help="性别（male/female）")
+    p.add_argument("--user", help="学生姓名（使用该学生的性别）")
+    p.add_argument("--required", required=True, help="必选项，如 1000m=3:40")
+    p.add_argument("--category1", required=True, help="第一类选考，如 50m=7.5")
+    p.add_argument("--category2", required=True, help="第二类选考，如 basketball=12")
+    p.add_argument("--date", help="测试日期 YYYY-MM-DD（默认今天）")
+    p.add_argument("--save", action="store_true", help="保存到 --user 指定的学生")
+    p.add_argument("--json", action="store_true", help="以JSON格式输出")
+    p.set_defaults(func=cmd_score)
+
+    p = subparsers.add_parser("export", help="导出成绩记录")
+    p.add_argument("--user", action="append", help="学生姓名，可重复；默认导出全部学生")
+    p.add_argument("--format", choices=("csv", "excel"), default="csv")
+    p.add_argument("--output", help="输出目录（默认当前目录）")
+    p.set_defaults(func=cmd_export)
+
+    p = subparsers.add_parser("backup", help="创建或管理备份")
+    p.add_argument("--name", help="备份名称（默认按时间戳命名）")
+    p.add_argument("--backup-dir", help="备份目录")
+    p.add_argument("--list", action="store_true", help="列出已有备份")
+    p.add_argument("--prune", action="store_true", help="按保留策略清理旧备份")
+    p.add_argument("--dry-run", action="store_true", help="与 --prune 一起使用，只显示将删除的备份")
+    p.set_defaults(func=cmd_backup)
+
+    p = subparsers.add_parser("restore", help="从备份恢复数据")
+    p.add_argument("backup", help="备份文件路径、备份目录中的文件名或 latest")
+    p.add_argument("--backup-dir", help="备份目录")
+    p.set_defaults(func=cmd_restore)
+
+    p = subparsers.add_parser("stats", help="输出成绩统计")
+    p.add_argument("--user", action="append", help="学生姓名，可重复；默认全部学生")
+    p.add_argument("--json", action="store_true", help="以JSON格式输出")
+    p.set_defaults(func=cmd_stats)
+
+    p = subparsers.add_parser("electives", help="计算总分最高的选考项目组合")
+    p.add_argument("--user", action="append", help="学生姓名，可重复；默认全部学生")
+    p.add_argument("--best", action="store_true", help="各项目取历史最好成绩（默认取最近一次）")
+    p.add_argument("--json", action="store_true", help="以JSON格式输出")
+    p.set_defaults(func=cmd_electives)
+
+    p = subparsers.add_parser("chart", help="批量生成成绩图表（需要matplotlib）")
+    p.add_argument("--user", action="append", help="学生姓名，可重复；默认全部学生")
+    p.add_argument("--output", default="charts", help="输出目录")
+    p.add_argument("--workers", type=int, help="并行进程数")
+    p.add_argument("--dpi", type=int, default=150)
+    p.set_defaults(func=cmd_chart)
+
+    p = subparsers.add_parser("serve", help="启动本地HTTP/JSON接口服务")
+    p.add_argument("--host", help="监听地址（局域网访问使用 0.0.0.0）")
+    p.add_argument("--port", type=int, help="监听端口")
+    p.set_defaults(func=cmd_serve)
+
+    p = subparsers.add_parser("migrate", help="在单文件格式和分片格式之间迁移数据")
+    p.add_argument("direction", choices=("to-sharded", "to-single"),
+                   help="to-sharded: --data 迁移到 --shards；to-single: --shards 迁移到 --data")
+    p.add_argument("--force", action="store_true", help="覆盖目标位置已有的数据")
+    p.set_defaults(func=cmd_migrate)
+
+    p = subparsers.add_parser("bench", help="运行性能基准测试")
+    p.add_argument("names", nargs="*", help="基准测试名称（默认全部）")
+    p.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行主函数，返回退出码"""
+    args = build_parser().parse_args(argv)
+    args.data = os.path.abspath(args.data)
+    if args.shards:
+        args.shards = os.path.abspath(args.shards)
+    logger.set_console_level(logging.INFO if args.verbose else logging.WARNING)
+    try:
+        return args.func(args)
+    except (CliError, RecordError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+    except OSError as e:
+        logger.error('命令执行失败: %s', e)
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,26 @@ PROJECT_NAMES = {
     "volleyball": "排球垫球"
 }
 
+# 各类别可选的项目
+PROJECT_CATEGORIES = {
+    "required": ["1000m", "800m"],
+    "category1": ["50m", "sit_reach", "standing_jump", "pull_ups", "sit_ups"],
+    "category2": ["basketball", "football", "volleyball"]
+}
+
+# 成绩数值越小越好的项目（计时类）
+LOWER_IS_BETTER_PROJECTS = {"1000m", "800m", "50m", "basketball", "football"}
+
+# 各项目成绩的最小计量单位（秒、厘米或次），反查目标成绩时按此取整
+PROJECT_PERFORMANCE_STEPS = {
+    "1000m": 1, "800m": 1,
+    "50m": 0.1, "sit_reach": 0.1, "standing_jump": 1, "pull_ups": 1, "sit_ups": 1,
+    "basketball": 0.1, "football": 0.1, "volleyball": 1
+}
+
+# 训练建议中展示的单项目标得分
+SCORE_TARGETS = (8.0, 10.0)
+
 # 成绩等级评定标准
 GRADE_STANDARDS = {
     "excellent": {"min": 27.0, "max": 30.0, "name": "优秀"},
@@ -58,6 +78,16 @@ def _get_data_file_path():
 
 DATA_FILE = _get_data_file_path()
 
+# 备份保留策略（祖父-父-子轮换）
+# 每一层保留最近N个时间桶中各自最新的一个自动备份，0表示不启用该层
+BACKUP_RETENTION_POLICY = {
+    "last": 3,       # 无条件保留最新的N个
+    "hourly": 24,    # 最近24个小时桶
+    "daily": 7,      # 最近7天
+    "weekly": 4,     # 最近4周（ISO周）
+    "monthly": 12    # 最近12个月
+}
+
 # UI配置
 WINDOW_TITLE = "体育成绩评估系统"
 WINDOW_SIZE = "800x600"
@@ -114,6 +144,8 @@ CHART_CONFIG = {
     "line_width_sub": 1.5,
     "marker_size_main": 8,
     "marker_size_sub": 6,
+    "max_points": 300,        # 趋势图最多绘制的数据点数，超过时使用 LTTB 降采样
+    "max_ticks": 12,          # 横坐标最多显示的刻度数
     "colors": {
         "total": "#16a085",
         "required": "#3498db",
@@ -128,6 +160,41 @@ CHART_CONFIG = {
     }
 }
 
+# 图表渲染缓存配置（按成绩记录摘要复用已渲染的图片）
+CHART_CACHE_CONFIG = {
+    "directory": "chart_cache",              # 用户数据目录下的缓存子目录
+    "memory_max_bytes": 32 * 1024 * 1024,    # 内存缓存上限
+    "disk_max_bytes": 256 * 1024 * 1024      # 磁盘缓存上限
+}
+
+# 数据文件写入配置
+PERSISTENCE_CONFIG = {
+    "group_commit": False,                   # 合并写入：修改先累积，达到条数或时间窗口后一次写入
+    "max_pending": 20,                       # 累积多少次修改后立即写入
+    "max_delay_ms": 2000,                    # 第一次未写入的修改最多等待多久（持久化窗口）
+    "fsync": True,                           # 写入后调用 fsync，确保数据落盘
+    "shard_dir": "users",                    # 分片存储目录（相对数据文件所在目录）
+    "load_workers": None,                    # 并行读取分片的线程数，None 表示按 CPU 核数（最多4个）
+    "load_chunk": 500                        # 加载时每处理多少名学生报告一次进度
+}
+
+# 成绩趋势预测配置
+FORECAST_CONFIG = {
+    "exam_date": "05-15",        # 考试日期：MM-DD 表示每年该日（取今天及以后最近的一次），也可写 YYYY-MM-DD
+    "method": "linear",          # linear: 最小二乘线性回归；smoothing: 指数平滑（Holt 线性趋势）
+    "smoothing_alpha": 0.5,      # 指数平滑的水平平滑系数
+    "smoothing_beta": 0.3,       # 指数平滑的趋势平滑系数
+    "stable_slope": 0.1,         # 单项每30天得分变化小于该值视为稳定（总分按3倍计）
+}
+
+# 本地HTTP接口服务配置
+API_SERVER_CONFIG = {
+    "host": "127.0.0.1",                     # 局域网访问时使用 0.0.0.0
+    "port": 8765,
+    "max_body_bytes": 1024 * 1024,           # 请求体大小上限
+    "max_batch": 256                         # 一次写入合并的最大提交数
+}
+
 # 成绩评价文本
 SCORE_EVALUATION_TEXTS = {
     "excellent": {  # 27分以上
@@ -384,11 +451,15 @@ MAIN_WINDOW_CONFIG = {
     "switch_user_button_bg": "#9b59b6",  # 切换用户按钮颜色
     "input_button_bg": "#2ecc71",
     "report_button_bg": "#e67e22",
+    "loading_poll_ms": 50,  # 后台加载期间检查进度的间隔（毫秒）
 }
 
 # 通用UI文本
 UI_TEXTS = {
     "welcome": "💡 欢迎使用体育成绩评估系统",
+    "loading": "⏳ 正在加载数据...",
+    "loading_progress": "⏳ 正在加载数据... {}/{} 名学生",
+    "loading_failed": "❌ 数据加载失败，请查看日志",
     "not_logged_in": "未登录",
     "please_login": "请先登录",
     "no_records": "暂无成绩记录，请先录入成绩",
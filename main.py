@@ -12,10 +12,15 @@ from tkinter import messagebox
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from ui.main_window import MainWindow
+from utils import profiler
 
 
 def main():
     """主函数"""
+    # --profile 或环境变量 SPORTS_PERFORMANCE_PROFILE=1 开启性能剖析
+    if profiler.PROFILE_CLI_FLAG in sys.argv[1:]:
+        profiler.enable()
+    
     try:
         # 创建主窗口并运行
         app = MainWindow()
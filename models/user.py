@@ -3,9 +3,14 @@
 用户数据模型
 """
 
+import itertools
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional
+from models.user_stats import UserStats
+
+# 记录版本号序列：全局递增，不同用户对象（包括重新加载的同一学生）的版本号互不相同
+_record_versions = itertools.count(1)
 
 
 class User:
@@ -16,12 +21,48 @@ class User:
         self.name = name
         self.gender = gender
         self.student_id = student_id
-        self.records: List[Dict] = []
+        self._records: List[Dict] = []
+        # 成绩记录版本号，记录有任何增删改时更新，界面缓存据此判断是否需要重新渲染
+        self.records_version = next(_record_versions)
         self.created_at = datetime.now().isoformat()
+        # 成绩累计统计，随 add_record 增量更新
+        self.stats = UserStats()
+        self.stats.records_version = self.records_version
+    
+    @property
+    def records(self) -> List[Dict]:
+        """成绩记录列表"""
+        return self._records
+    
+    @records.setter
+    def records(self, records: List[Dict]):
+        self._records = records
+        self.mark_records_changed()
+    
+    def mark_records_changed(self):
+        """记录列表被原地修改（如替换、合并）后调用，更新记录版本号"""
+        self.records_version = next(_record_versions)
     
     def add_record(self, record: Dict):
         """添加成绩记录"""
-        self.records.append(record)
+        stats = self.get_stats()
+        self._records.append(record)
+        self.mark_records_changed()
+        stats.add(record)
+        stats.records_version = self.records_version
+    
+    def replace_record(self, index: int, record: Dict):
+        """替换一条成绩记录"""
+        self._records[index] = record
+        self.mark_records_changed()
+    
+    def get_stats(self) -> UserStats:
+        """获取成绩累计统计（统计对应的记录版本或数量与当前记录不一致时重新计算）"""
+        stats = self.stats
+        if stats.records_version != self.records_version or stats.count != len(self._records):
+            stats = self.stats = UserStats.from_records(self._records)
+            stats.records_version = self.records_version
+        return stats
     
     def get_latest_record(self) -> Optional[Dict]:
         """获取最新成绩记录"""
@@ -41,7 +82,8 @@ class User:
             "gender": self.gender,
             "student_id": self.student_id,
             "records": self.records,
-            "created_at": self.created_at
+            "created_at": self.created_at,
+            "stats": self.get_stats().to_dict()
         }
     
     @classmethod
@@ -51,4 +93,12 @@ class User:
         user.id = data["id"]
         user.records = data.get("records", [])
         user.created_at = data.get("created_at", datetime.now().isoformat())
+        # 旧数据没有保存统计，或统计损坏时由 get_stats 按记录重新计算
+        try:
+            user.stats = UserStats.from_dict(data["stats"])
+        except (KeyError, TypeError, ValueError):
+            user.stats = UserStats()
+        else:
+            # 文件中的统计与记录由 to_dict 一同写入（合并记录时会删除统计），视为与当前记录一致
+            user.stats.records_version = user.records_version
         return user
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+用户成绩累计统计模型
+随成绩记录的添加增量维护，与用户数据一起保存，
+报告可直接读取汇总结果而不必重新遍历全部历史记录
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+CATEGORIES = ("required", "category1", "category2")
+
+
+class ProjectStats:
+    """单个项目的累计统计"""
+
+    __slots__ = ("count", "score_sum", "best_score", "worst_score",
+                 "best_performance", "worst_performance", "first_score", "last_score")
+
+    def __init__(self, score: float, performance: float):
+        self.count = 1
+        self.score_sum = score
+        self.best_score = self.worst_score = self.first_score = self.last_score = score
+        # 成绩数值的最大值和最小值（时间类项目数值越小越好）
+        self.best_performance = self.worst_performance = performance
+
+    def add(self, score: float, performance: float):
+        """累计一次成绩"""
+        self.count += 1
+        self.score_sum += score
+        self.last_score = score
+        if score > self.best_score:
+            self.best_score = score
+        if score < self.worst_score:
+            self.worst_score = score
+        if performance > self.best_performance:
+            self.best_performance = performance
+        if performance < self.worst_performance:
+            self.worst_performance = performance
+
+    @property
+    def trend(self) -> str:
+        """首末两次得分比较得出的趋势"""
+        if self.count >= 2 and self.last_score > self.first_score:
+            return "improving"
+        if self.count >= 2 and self.last_score < self.first_score:
+            return "declining"
+        return "stable"
+
+    def to_dict(self) -> Dict:
+        """转换为字典格式"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProjectStats':
+        """从字典创建"""
+        stats = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(stats, name, data[name])
+        return stats
+
+
+class UserStats:
+    """用户成绩累计统计（次数、总分合计、极值、Welford 方差、各项目统计）"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_sum = 0.0
+        self.min_total: Optional[float] = None
+        self.max_total: Optional[float] = None
+        # 最佳/最差记录在记录列表中的下标，并列时取最早的一条
+        self.best_index: Optional[int] = None
+        self.worst_index: Optional[int] = None
+        # Welford 在线算法的均值和离差平方和
+        self.mean = 0.0
+        self.m2 = 0.0
+        # 各项目统计，按首次出现顺序排列
+        self.projects: Dict[str, ProjectStats] = {}
+        # 作为某一类首个项目出现过的项目（报告中展示这些项目）
+        self.listed_projects = set()
+        # 统计对应的 User.records_version（不保存到文件），记录被替换或修改后据此判断统计已过期
+        self.records_version: Optional[int] = None
+
+    def add(self, record: Dict):
+        """累计一条成绩记录，O(1)"""
+        scores = record["scores"]
+        total = scores["total"]
+        index = self.count
+
+        self.count += 1
+        self.total_sum += total
+        if self.max_total is None or total > self.max_total:
+            self.max_total = total
+            self.best_index = index
+        if self.min_total is None or total < self.min_total:
+            self.min_total = total
+            self.worst_index = index
+
+        delta = total - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (total - self.mean)
+
+        for category in CATEGORIES:
+            first = True
+            for project_key, performance in record[category].items():
+                if first:
+                    self.listed_projects.add(project_key)
+                    first = False
+                stats = self.projects.get(project_key)
+                if stats is None:
+                    self.projects[project_key] = ProjectStats(scores[category], performance)
+                else:
+                    stats.add(scores[category], performance)
+
+    def extend(self, records: Iterable[Dict]):
+        """累计多条成绩记录"""
+        for record in records:
+            self.add(record)
+
+    @property
+    def average(self) -> float:
+        """平均总分"""
+        return self.total_sum / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """总分的样本方差（少于2条记录时为0）"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """总分的样本标准差"""
+        return math.sqrt(self.variance)
+
+    def copy(self) -> 'UserStats':
+        """复制统计"""
+        return UserStats.from_dict(self.to_dict())
+
+    def to_dict(self) -> Dict:
+        """转换为字典格式"""
+        return {
+            "count": self.count,
+            "total_sum": self.total_sum,
+            "min_total": self.min_total,
+            "max_total": self.max_total,
+            "best_index": self.best_index,
+            "worst_index": self.worst_index,
+            "mean": self.mean,
+            "m2": self.m2,
+            "projects": {key: stats.to_dict() for key, stats in self.projects.items()},
+            "listed_projects": sorted(self.listed_projects)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'UserStats':
+        """从字典创建"""
+        stats = cls()
+        for name in ("count", "total_sum", "min_total", "max_total",
+                     "best_index", "worst_index", "mean", "m2"):
+            setattr(stats, name, data[name])
+        stats.projects = {key: ProjectStats.from_dict(value) for key, value in data["projects"].items()}
+        stats.listed_projects = set(data["listed_projects"])
+        return stats
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'UserStats':
+        """从成绩记录计算统计"""
+        stats = cls()
+        stats.extend(records)
+        return stats
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+成绩分析引擎
+基于用户累计统计（UserStats）生成统计概览（次数、平均分、最高/最低分、最佳/最差记录）
+和各项目的得分与成绩极值、趋势；一次遍历即可完成，新增记录时只需增量更新，
+用户已保存的累计统计与记录一致时可直接使用，无需遍历历史记录
+"""
+
+from typing import Dict, List, Optional
+
+from models.user_stats import UserStats
+
+
+class AnalyticsEngine:
+    """成绩分析引擎（单次遍历，支持增量追加）"""
+
+    def __init__(self, records: List[Dict] = (), stats: Optional[UserStats] = None):
+        """初始化引擎
+
+        Args:
+            records: 成绩记录列表
+            stats: 与 records 对应的累计统计（如用户保存的统计），数量一致时直接复用
+        """
+        self.reset()
+        self.sync(records, stats)
+
+    def reset(self):
+        """清空统计"""
+        self.stats = UserStats()
+        # 被分析的记录列表：直接引用调用方传入的列表，不复制
+        self.records: List[Dict] = []
+        self.last_record: Optional[Dict] = None
+        # 已分析记录的版本号（User.records_version），调用方未提供时为 None
+        self.version: Optional[int] = None
+
+    @property
+    def count(self) -> int:
+        """已分析的记录数"""
+        return self.stats.count
+
+    def sync(self, records: List[Dict], stats: Optional[UserStats] = None,
+             version: Optional[int] = None) -> bool:
+        """与记录列表同步：列表只在末尾新增了记录时增量追加，否则重新计算
+
+        引擎只保存列表的引用和已计入统计的记录数，末尾新增 k 条记录时的开销为 O(k)。
+        只比较末条记录无法发现中间记录被替换，提供 version 时以版本号为准：
+        版本号变化后不再增量追加，改为复用 stats 或全量重算
+
+        Args:
+            records: 成绩记录列表
+            stats: 与 records 对应的累计统计，提供时直接复用（复制一份，不修改原统计）
+            version: records 的版本号（User.records_version）
+
+        Returns:
+            是否为增量更新（或直接复用了累计统计）
+        """
+        count = self.stats.count
+        changed = version is not None and version != self.version
+        incremental = (not changed and 0 < count <= len(records)
+                       and records[count - 1] == self.last_record)
+        self.records = records
+        self.version = version
+        if incremental:
+            for index in range(count, len(records)):
+                self.stats.add(records[index])
+            self.last_record = records[-1]
+            return True
+
+        self.last_record = records[-1] if records else None
+        if stats is not None and stats.count == len(records):
+            self.stats = stats.copy()
+            return True
+
+        self.stats = UserStats.from_records(records)
+        return False
+
+    def result(self) -> Optional[Dict]:
+        """获取分析结果，无记录时返回None
+
+        Returns:
+            {"total_records", "avg_score", "highest_score", "lowest_score",
+             "best_record", "worst_record", "projects": {项目: {...}}}
+        """
+        stats = self.stats
+        if not stats.count:
+            return None
+
+        return {
+            "total_records": stats.count,
+            "avg_score": stats.average,
+            "highest_score": stats.max_total,
+            "lowest_score": stats.min_total,
+            "best_record": self.records[stats.best_index],
+            "worst_record": self.records[stats.worst_index],
+            "projects": {
+                project_key: {
+                    "avg_score": project.score_sum / project.count,
+                    "best_score": project.best_score,
+                    "worst_score": project.worst_score,
+                    "best_performance": project.best_performance,
+                    "worst_performance": project.worst_performance,
+                    "trend": project.trend
+                }
+                for project_key, project in stats.projects.items()
+                if project_key in stats.listed_projects
+            }
+        }
+
+
+def analyze_records(records: List[Dict], stats: Optional[UserStats] = None) -> Optional[Dict]:
+    """一次性分析成绩记录"""
+    return AnalyticsEngine(records, stats).result()
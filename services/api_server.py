@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+"""
+本地HTTP/JSON接口服务
+基于 asyncio 标准库实现的轻量 HTTP/1.1 服务（支持 keep-alive），
+供平板等设备在局域网内录入成绩、查询学生、记录、报告和排行榜。
+所有修改在事件循环中完成，通过 PersistenceQueue 合并写入数据文件
+
+接口:
+    GET  /api/health                    服务状态
+    GET  /api/users                     学生列表
+    POST /api/users                     新建学生 {"name", "gender", "student_id"}
+    GET  /api/users/{id}                学生信息及最近一次成绩
+    GET  /api/users/{id}/records        成绩记录
+    POST /api/users/{id}/records        录入成绩 {"date", "required": {"1000m": "3:40"}, "category1": {...}, "category2": {...}}
+    GET  /api/users/{id}/report         成绩分析与同性别群体百分位
+    POST /api/score                     只计算得分 {"gender", "required", "category1", "category2"}
+    GET  /api/leaderboard               排行榜 ?project=total&k=10&gender=&grade=&start_date=&end_date=
+"""
+
+import asyncio
+import json
+import re
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from config.constants import API_SERVER_CONFIG
+from services.persistence_queue import PersistenceQueue
+from services.record_builder import (
+    CATEGORIES, RecordError, parse_gender, parse_project, parse_performance, build_record
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class ApiError(Exception):
+    """接口错误（携带HTTP状态码）"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiServer:
+    """成绩录入与查询接口服务"""
+
+    def __init__(self, data_manager, host: str = None, port: int = None,
+                 max_body_bytes: int = None, max_batch: int = None):
+        from services.score_calculator import ScoreCalculator
+
+        self.data_manager = data_manager
+        self.host = host or API_SERVER_CONFIG["host"]
+        self.port = API_SERVER_CONFIG["port"] if port is None else port
+        self.max_body_bytes = max_body_bytes or API_SERVER_CONFIG["max_body_bytes"]
+        self.calculator = ScoreCalculator()
+        self.persistence = PersistenceQueue(data_manager, max_batch or API_SERVER_CONFIG["max_batch"])
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cohort = None
+        self._routes = [
+            ("GET", re.compile(r"/api/health"), self.get_health),
+            ("GET", re.compile(r"/api/users"), self.list_users),
+            ("POST", re.compile(r"/api/users"), self.create_user),
+            ("GET", re.compile(r"/api/users/([^/]+)"), self.get_user),
+            ("GET", re.compile(r"/api/users/([^/]+)/records"), self.list_records),
+            ("POST", re.compile(r"/api/users/([^/]+)/records"), self.create_record),
+            ("GET", re.compile(r"/api/users/([^/]+)/report"), self.get_report),
+            ("POST", re.compile(r"/api/score"), self.calculate_score),
+            ("GET", re.compile(r"/api/leaderboard"), self.get_leaderboard),
+        ]
+
+    async def start(self) -> Tuple[str, int]:
+        """启动服务，返回实际监听的 (地址, 端口)（port=0 时由系统分配）"""
+        await self.persistence.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        logger.info('接口服务已启动: http://%s:%s', self.host, self.port)
+        return self.host, self.port
+
+    async def close(self):
+        """停止接收连接并写完排队中的数据"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.persistence.stop()
+        logger.info('接口服务已停止（写入 %s 次，合并 %s 个提交）',
+                    self.persistence.saves, self.persistence.commits)
+
+    async def serve_forever(self):
+        """启动并持续运行，直到任务被取消"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # ---------- HTTP 协议处理 ----------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._send(writer, HTTPStatus.BAD_REQUEST, {"error": "请求行格式错误"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                keep_alive = (version == "HTTP/1.1" and headers.get("connection", "").lower() != "close")
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # 无法确定请求体的边界，回复后关闭连接
+                    await self._send(writer, HTTPStatus.BAD_REQUEST, {"error": "Content-Length 格式错误"}, False)
+                    break
+                if length > self.max_body_bytes:
+                    await self._send(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "请求体过大"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _send(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool):
+        status = HTTPStatus(status)
+        body = b"" if payload is None else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Access-Control-Allow-Origin: *\r\n"
+                f"Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+                f"Access-Control-Allow-Headers: Content-Type\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def dispatch(self, method: str, target: str, body: bytes = b"") -> Tuple[int, object]:
+        """分发请求，返回 (状态码, JSON数据)"""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        path = url.path.rstrip("/")
+
+        if method == "OPTIONS":
+            return HTTPStatus.NO_CONTENT, None
+
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                data = json.loads(body) if body else {}
+                if not isinstance(data, dict):
+                    raise RecordError("请求体应为JSON对象")
+                return await handler(*match.groups(), query=query, data=data)
+            except ApiError as e:
+                return e.status, {"error": str(e)}
+            except (RecordError, json.JSONDecodeError) as e:
+                return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+            except Exception as e:
+                logger.error('接口处理失败: %s %s: %s', method, path, e, exc_info=True)
+                return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "服务器内部错误"}
+
+        if path_matched:
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": f"不支持的方法: {method}"}
+        return HTTPStatus.NOT_FOUND, {"error": f"未找到: {path}"}
+
+    # ---------- 接口实现 ----------
+
+    def _find_user(self, user_id: str):
+        user = self.data_manager.find_user_by_id(user_id)
+        if user is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"未找到学生: {user_id}")
+        return user
+
+    @staticmethod
+    def _user_summary(user) -> Dict:
+        latest = user.get_latest_record()
+        return {
+            "id": user.id,
+            "name": user.name,
+            "gender": user.gender,
+            "student_id": user.student_id,
+            "records": len(user.records),
+            "latest_score": latest["scores"]["total"] if latest else None,
+        }
+
+    def _parse_items(self, data: Dict) -> Dict:
+        """解析请求中各类别的 {项目: 成绩}"""
+        items = {}
+        for category in CATEGORIES:
+            entry = data.get(category)
+            if not isinstance(entry, dict) or len(entry) != 1:
+                raise RecordError(f"{category} 应为 {{项目: 成绩}}")
+            (project, value), = entry.items()
+            project = parse_project(category, project)
+            items[category] = (project, parse_performance(project, value))
+        return items
+
+    async def get_health(self, query: Dict, data: Dict):
+        return HTTPStatus.OK, {"status": "ok", "users": len(self.data_manager.users),
+                               "saves": self.persistence.saves, "commits": self.persistence.commits}
+
+    async def list_users(self, query: Dict, data: Dict):
+        return HTTPStatus.OK, [self._user_summary(user) for user in self.data_manager.users]
+
+    async def create_user(self, query: Dict, data: Dict):
+        from models.user import User
+
+        name = str(data.get("name") or "").strip()
+        if not name:
+            raise RecordError("缺少姓名")
+        gender = parse_gender(data.get("gender", ""))
+        if self.data_manager.find_user_by_name(name):
+            raise ApiError(HTTPStatus.CONFLICT, f"学生已存在: {name}")
+
+        user = User(name, gender, data.get("student_id"))
+        self.data_manager.users.append(user)
+        await self.persistence.commit()
+        return HTTPStatus.CREATED, self._user_summary(user)
+
+    async def get_user(self, user_id: str, query: Dict, data: Dict):
+        user = self._find_user(user_id)
+        return HTTPStatus.OK, dict(self._user_summary(user), latest_record=user.get_latest_record())
+
+    async def list_records(self, user_id: str, query: Dict, data: Dict):
+        return HTTPStatus.OK, self._find_user(user_id).get_all_records()
+
+    async def create_record(self, user_id: str, query: Dict, data: Dict):
+        user = self._find_user(user_id)
+        record = build_record(self.calculator, user.gender, self._parse_items(data), data.get("date"))
+        user.add_record(record)
+        await self.persistence.commit()
+        return HTTPStatus.CREATED, record
+
+    async def get_report(self, user_id: str, query: Dict, data: Dict):
+        from services.analytics_engine import analyze_records
+        from services.cohort_service import CohortService
+
+        user = self._find_user(user_id)
+        if self._cohort is None:
+            self._cohort = CohortService(self.data_manager.users)
+        else:
+            self._cohort.refresh(self.data_manager.users)
+        return HTTPStatus.OK, {
+            "user": self._user_summary(user),
+            "analysis": analyze_records(user.records, user.get_stats()),
+            "percentiles": self._cohort.user_percentiles(user),
+        }
+
+    async def calculate_score(self, query: Dict, data: Dict):
+        gender = parse_gender(data.get("gender", ""))
+        return HTTPStatus.OK, build_record(self.calculator, gender, self._parse_items(data), data.get("date"))
+
+    async def get_leaderboard(self, query: Dict, data: Dict):
+        from services.leaderboard_service import LeaderboardService, TOTAL_PROJECT
+
+        project = query.pop("project", TOTAL_PROJECT)
+        try:
+            k = int(query.pop("k", 10))
+        except ValueError:
+            raise RecordError("k 应为整数")
+        filters = {key: query[key] for key in ("gender", "grade", "start_date", "end_date") if query.get(key)}
+        service = LeaderboardService(self.data_manager.users)
+        return HTTPStatus.OK, {"top": service.top(project, k, **filters),
+                               "bottom": service.bottom(project, k, **filters)}
+
+
+class ApiClient:
+    """简易异步接口客户端（单个 keep-alive 连接），用于本地测试和压测"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, data=None) -> Tuple[int, object]:
+        """发送请求，返回 (状态码, JSON数据)"""
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = b"" if data is None else json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self._writer.write((f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+                            ).encode("latin-1") + body)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        payload = await self._reader.readexactly(length) if length else b""
+        return status, json.loads(payload) if payload else None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+def run_server(data_manager, host: str = None, port: int = None):
+    """阻塞运行接口服务，Ctrl+C 退出"""
+    server = ApiServer(data_manager, host, port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
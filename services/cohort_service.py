@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+群体统计与百分位排名服务
+按（性别, 项目）维护全体学生最新得分的有序数组，
+百分位查询使用二分查找，新增成绩时增量更新有序数组，无需重新排序；
+同步用户数据时按记录版本号（User.records_version）只更新记录有变化的学生
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.metrics import timed, annotate
+
+logger = get_logger()
+
+CATEGORIES = ("required", "category1", "category2")
+# 总分使用的项目键
+TOTAL_PROJECT = "total"
+
+
+class CohortService:
+    """群体百分位排名服务
+
+    每个学生在每个项目上只计入最近一次成绩，
+    一个数据文件中的全部用户视为同一群体（班级）
+    """
+
+    def __init__(self, users: Iterable = ()):
+        self._arrays: Dict[Tuple[str, str], List[float]] = {}
+        # {用户ID: {项目: (性别, 最近一次得分)}}
+        self._latest: Dict[str, Dict[str, Tuple[str, float]]] = {}
+        # {用户ID: 已计入的记录版本号}
+        self._versions: Dict[str, int] = {}
+        self.rebuild(users)
+
+    @timed('cohort_rebuild')
+    def rebuild(self, users: Iterable):
+        """按全部用户重新构建有序数组"""
+        self._latest = {}
+        self._versions = {}
+        record_count = 0
+        for user in users:
+            for record in user.records:
+                self._collect(user, record)
+            self._versions[user.id] = user.records_version
+            record_count += len(user.records)
+
+        arrays: Dict[Tuple[str, str], List[float]] = {}
+        for latest in self._latest.values():
+            for project, (gender, score) in latest.items():
+                arrays.setdefault((gender, project), []).append(score)
+        for values in arrays.values():
+            values.sort()
+        self._arrays = arrays
+
+        annotate(users=len(self._versions), records=record_count)
+        logger.debug('群体统计已重建: %s 个用户，%s 个分组', len(self._versions), len(arrays))
+
+    def _collect(self, user, record: Dict) -> List[Tuple[str, Optional[Tuple[str, float]], float]]:
+        """记录一条成绩中各项目的最新得分，返回 [(项目, 旧值, 新得分), ...]"""
+        changes = []
+        scores = record["scores"]
+        items = [(TOTAL_PROJECT, scores["total"])]
+        for category in CATEGORIES:
+            for project in record[category]:
+                items.append((project, scores[category]))
+
+        latest = self._latest.setdefault(user.id, {})
+        for project, score in items:
+            changes.append((project, latest.get(project), score))
+            latest[project] = (user.gender, score)
+        return changes
+
+    def add_record(self, user, record: Dict):
+        """新增一条成绩后增量更新（每个项目 O(log n) 查找 + 一次插入）"""
+        for project, old, score in self._collect(user, record):
+            if old is not None:
+                old_gender, old_score = old
+                values = self._arrays[(old_gender, project)]
+                del values[bisect_left(values, old_score)]
+            insort(self._arrays.setdefault((user.gender, project), []), score)
+        self._versions[user.id] = user.records_version
+
+    def _remove_user(self, user_id: str):
+        """从有序数组中移除学生已计入的各项目得分"""
+        for project, (gender, score) in self._latest.pop(user_id, {}).items():
+            values = self._arrays[(gender, project)]
+            del values[bisect_left(values, score)]
+            if not values:
+                del self._arrays[(gender, project)]
+        self._versions.pop(user_id, None)
+
+    def _refresh_user(self, user):
+        """按学生的全部记录重新计入其各项目最新得分"""
+        self._remove_user(user.id)
+        for record in user.records:
+            self._collect(user, record)
+        for project, (gender, score) in self._latest.get(user.id, {}).items():
+            insort(self._arrays.setdefault((gender, project), []), score)
+        self._versions[user.id] = user.records_version
+
+    def refresh(self, users: Iterable) -> int:
+        """与用户数据同步，只更新记录版本号有变化的学生
+
+        记录的新增、替换和删除都会改变版本号；变化的学生先移除旧得分再按全部记录重新计入，
+        已删除的学生直接移除。
+
+        Returns:
+            重新计入的学生数
+        """
+        users = list(users)
+        current = {user.id for user in users}
+        for user_id in [user_id for user_id in self._versions if user_id not in current]:
+            self._remove_user(user_id)
+
+        updated = 0
+        for user in users:
+            if self._versions.get(user.id) != user.records_version:
+                self._refresh_user(user)
+                updated += 1
+        return updated
+
+    def cohort_size(self, gender: str, project: str) -> int:
+        """群体人数"""
+        return len(self._arrays.get((gender, project), ()))
+
+    def percentile(self, gender: str, project: str, score: float) -> Optional[float]:
+        """得分在群体中的百分位（0-100，并列按一半计入）
+
+        Returns:
+            百分位，群体为空时返回None
+        """
+        values = self._arrays.get((gender, project))
+        if not values:
+            return None
+        below = bisect_left(values, score)
+        equal = bisect_right(values, score) - below
+        return (below + equal / 2) / len(values) * 100
+
+    def user_percentiles(self, user) -> Dict[str, float]:
+        """学生各项目（含总分）最近一次得分在同性别群体中的百分位"""
+        return {
+            project: self.percentile(gender, project, score)
+            for project, (gender, score) in self._latest.get(user.id, {}).items()
+        }
@@ -1,90 +1,405 @@
 # -*- coding: utf-8 -*-
 """
 JSON数据存储管理模块
+多个进程（或同一进程中的多个 DataManager）可以同时读写同一数据文件：
+保存时持有跨进程文件锁，并用数据文件中的修订号检测其他写入者的修改，
+检测到冲突时把本地新增的学生和成绩合并到磁盘上的最新数据中，而不是直接覆盖
 """
 
+import atexit
 import json
 import os
-from typing import List, Optional, Dict
+import threading
+import uuid
+import weakref
+from typing import Callable, List, Optional, Dict
 from models.user import User
-from config.constants import DATA_FILE
+from config.constants import DATA_FILE, PERSISTENCE_CONFIG
+from utils import json_codec
+from utils.file_lock import FileLock
 from utils.logger import get_logger
+from utils.metrics import timed, annotate
 
 # 获取日志实例
 logger = get_logger()
 
+# 合并时逐个比较的学生基本信息字段
+META_FIELDS = ("name", "gender", "student_id")
+
+
+def _meta(user_data: Dict) -> tuple:
+    return tuple(user_data.get(field) for field in META_FIELDS)
+
 
 class DataManager:
     """数据管理器"""
     
-    def __init__(self, data_file: str = DATA_FILE):
+    def __init__(self, data_file: str = DATA_FILE, group_commit: Optional[bool] = None,
+                 max_pending: Optional[int] = None, max_delay_ms: Optional[int] = None,
+                 fsync: Optional[bool] = None, autoload: bool = True):
+        """初始化数据管理器
+        
+        Args:
+            data_file: 数据文件路径
+            group_commit: 是否合并写入（默认使用 PERSISTENCE_CONFIG），
+                开启后修改只标记为待写入，累积 max_pending 次修改、
+                距第一次未写入的修改超过 max_delay_ms 毫秒、调用 flush() 或程序退出时写入
+            max_pending: 触发写入的待写入修改数
+            max_delay_ms: 持久化窗口（毫秒）
+            fsync: 写入后是否调用 fsync
+            autoload: 是否立即加载数据；为 False 时由调用方稍后调用 load_data（如在后台线程中）
+        """
         self.data_file = data_file
         self.users: List[User] = []
-        self.load_data()
+        self.group_commit = PERSISTENCE_CONFIG["group_commit"] if group_commit is None else group_commit
+        self.max_pending = max_pending or PERSISTENCE_CONFIG["max_pending"]
+        self.max_delay_ms = PERSISTENCE_CONFIG["max_delay_ms"] if max_delay_ms is None else max_delay_ms
+        self.fsync = PERSISTENCE_CONFIG["fsync"] if fsync is None else fsync
+        # 待写入的修改数与延迟写入定时器
+        self.pending = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        # 定时写入在后台线程中遍历用户和记录，所有修改用户数据的方法都要持有此锁
+        self._lock = threading.RLock()
+        # 写入统计
+        self.save_count = 0
+        self.fsync_count = 0
+        # 乐观并发控制：上次读取/写入时的修订号、版本号和文件状态，
+        # 以及当时各学生的记录数（据此区分本地新增与其他写入者新增的记录）
+        self.lock_file = f'{data_file}.lock'
+        self.version = 0
+        self.revision: Optional[str] = None
+        self.merge_count = 0
+        self._disk_stat = None
+        self._baseline: Dict[str, int] = {}
+        # 上次读取/写入时各学生的基本信息（据此区分本地修改与其他写入者的修改）
+        self._baseline_meta: Dict[str, tuple] = {}
+        if self.group_commit:
+            self_ref = weakref.ref(self)
+            atexit.register(lambda: self_ref() and self_ref().flush())
+        if autoload:
+            self.load_data()
     
-    def load_data(self):
-        """从JSON文件加载数据"""
-        logger.info(f'开始加载数据文件: {self.data_file}')
+    @timed('load_data')
+    def load_data(self, progress: Optional[Callable[[int, int], None]] = None):
+        """从JSON文件加载数据（先写入尚未保存的修改）
         
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.users = [User.from_dict(user_data) for user_data in data.get("users", [])]
-                    logger.info(f'成功加载 {len(self.users)} 个用户数据')
-            except json.JSONDecodeError as e:
-                logger.error(f'JSON解析错误: {e}', exc_info=True)
-                self.users = []
-            except (KeyError, ValueError) as e:
-                logger.error(f'数据格式错误: {e}', exc_info=True)
-                self.users = []
-            except Exception as e:
-                logger.error(f'加载数据文件时发生未知错误: {e}', exc_info=True)
+        Args:
+            progress: 进度回调 progress(已加载学生数, 学生总数)，在调用 load_data 的线程中
+                分批调用（启动画面据此显示进度）
+        """
+        logger.info('开始加载数据文件: %s', self.data_file)
+        # 读取和替换用户数据期间持有锁：后台定时写入和其他线程的修改不会与替换交错，
+        # 写入未保存的修改后、重新读取前也不会有新的修改被丢弃
+        with self._lock:
+            if not self._flush_before_reload():
+                return
+            
+            if os.path.exists(self.data_file):
+                try:
+                    with json_codec.paused_gc():
+                        data = self._read_disk()
+                        self.users = self._build_users(data.get("users", []), progress)
+                    self._baseline = {user.id: len(user.records) for user in self.users}
+                    self._baseline_meta = {user.id: (user.name, user.gender, user.student_id)
+                                           for user in self.users}
+                    logger.info('成功加载 %s 个用户数据', len(self.users))
+                    annotate(users=len(self.users),
+                             records=sum(len(user.records) for user in self.users),
+                             bytes=os.path.getsize(self.data_file))
+                except json.JSONDecodeError as e:
+                    logger.error('JSON解析错误: %s', e, exc_info=True)
+                    annotate(status='error')
+                    self.users = []
+                except (KeyError, ValueError) as e:
+                    logger.error('数据格式错误: %s', e, exc_info=True)
+                    annotate(status='error')
+                    self.users = []
+                except Exception as e:
+                    logger.error('加载数据文件时发生未知错误: %s', e, exc_info=True)
+                    annotate(status='error')
+                    self.users = []
+            else:
+                logger.info('数据文件不存在，创建新文件')
                 self.users = []
-        else:
-            logger.info('数据文件不存在，创建新文件')
-            self.users = []
-            self.save_data()  # 创建空的数据文件
+                self.save_data()  # 创建空的数据文件
     
-    def save_data(self):
-        """保存数据到JSON文件"""
+    @staticmethod
+    def _build_users(users_data: List[Dict], progress: Optional[Callable[[int, int], None]]) -> List[User]:
+        """由用户字典创建用户对象，每批 load_chunk 个报告一次进度"""
+        total = len(users_data)
+        if progress is None:
+            return [User.from_dict(user_data) for user_data in users_data]
+        chunk = PERSISTENCE_CONFIG["load_chunk"]
+        users = []
+        progress(0, total)
+        for start in range(0, total, chunk):
+            users.extend(User.from_dict(user_data) for user_data in users_data[start:start + chunk])
+            progress(len(users), total)
+        return users
+    
+    def _read_disk(self) -> Dict:
+        """读取数据文件，并记录其修订号和文件状态（安装了 orjson 时用它解析）"""
+        with open(self.data_file, 'rb') as f:
+            data = json_codec.loads(f.read())
+            self._disk_stat = self._stat_key(os.fstat(f.fileno()))
+        self.version = data.get("version", 0)
+        self.revision = data.get("revision")
+        return data
+    
+    @staticmethod
+    def _stat_key(stat: os.stat_result) -> tuple:
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    
+    def _disk_changed(self) -> bool:
+        """数据文件是否已被其他写入者修改（文件状态未变时不必读取内容）"""
+        try:
+            stat_key = self._stat_key(os.stat(self.data_file))
+        except FileNotFoundError:
+            return False
+        if stat_key == self._disk_stat:
+            return False
         try:
-            logger.debug(f'开始保存数据到: {self.data_file}')
+            revision = json_codec.load_file(self.data_file).get("revision")
+        except ValueError:
+            # 文件已损坏，无法合并，直接覆盖
+            logger.warning('数据文件无法解析，将被覆盖: %s', self.data_file)
+            return False
+        if revision == self.revision:
+            self._disk_stat = stat_key
+            return False
+        return True
+    
+    def _merge_with_disk(self, data: Dict) -> Dict:
+        """把本地修改合并到磁盘上的最新数据中，并同步更新内存中的用户
+        
+        本地修改按读取时的记录数（_baseline）和基本信息（_baseline_meta）判断：
+        - 学生记录数超出基线的部分为本地新增记录，追加到磁盘上该学生的记录之后
+        - 基本信息（姓名、性别、学号）与基线不同时为本地修改，保留本地的值，
+          否则采用磁盘上的值（其他写入者可能修改过）；双方都修改且不一致时保留本地修改并记录警告
+        - 基线中没有的学生为本地新增学生
+        - 基线中有、本地已没有的学生为本地删除
+        磁盘上其他写入者新增的学生和记录全部保留
+        """
+        disk = self._read_disk()
+        local_by_id = {user["id"]: user for user in data["users"]}
+        disk_ids = set()
+        merged_users = []
+        # (内存中的用户对象, 本地快照中的记录数, 合并后的记录)
+        record_updates = []
+        # (内存中的用户对象, 其他写入者修改后的基本信息)
+        meta_updates = []
+        conflicts = 0
+        remote_users = []
+        added_records = 0
+        
+        for disk_user in disk.get("users", []):
+            user_id = disk_user["id"]
+            disk_ids.add(user_id)
+            local = local_by_id.get(user_id)
+            if local is None:
+                if user_id not in self._baseline:
+                    # 其他写入者新增的学生
+                    merged_users.append(disk_user)
+                    remote_users.append(disk_user)
+                continue
             
+            local_new = local["records"][self._baseline.get(user_id, 0):]
+            records = disk_user["records"] + local_new
+            added_records += len(disk_user["records"]) - self._baseline.get(user_id, 0)
+            merged = dict(disk_user, records=records)
+            # 记录已变化，统计在加载时重新计算
+            merged.pop("stats", None)
+            base_meta, local_meta, disk_meta = self._baseline_meta.get(user_id), _meta(local), _meta(disk_user)
+            if local_meta != base_meta:
+                if disk_meta != base_meta and disk_meta != local_meta:
+                    conflicts += 1
+                    logger.warning('学生 %s 的基本信息同时被其他写入者修改为 %s，保留本地修改',
+                                   local["name"], disk_meta)
+                merged.update(zip(META_FIELDS, local_meta))
+            merged_users.append(merged)
+            user = self.find_user_by_id(user_id)
+            if user is not None and len(records) != len(local["records"]):
+                record_updates.append((user, len(local["records"]), records))
+            if user is not None and local_meta == base_meta and disk_meta != local_meta:
+                meta_updates.append((user, disk_meta))
+        
+        removed = []
+        for local in data["users"]:
+            user_id = local["id"]
+            if user_id in disk_ids:
+                continue
+            if user_id in self._baseline and len(local["records"]) <= self._baseline[user_id]:
+                # 其他写入者已删除且本地没有新增记录
+                removed.append(user_id)
+                continue
+            merged_users.append(local)
+        
+        # 同步内存：插入其他写入者新增的记录，加入新增学生，移除已删除的学生
+        for user, local_count, records in record_updates:
+            user.records[:local_count] = records
+            user.mark_records_changed()
+        for user, meta in meta_updates:
+            user.name, user.gender, user.student_id = meta
+        for user_data in remote_users:
+            self.users.append(User.from_dict(user_data))
+        for user_id in removed:
+            user = self.find_user_by_id(user_id)
+            if user is not None:
+                self.users.remove(user)
+        
+        self.merge_count += 1
+        logger.info('检测到其他写入者的修改，已合并: 新增 %s 名学生、%s 条记录，删除 %s 名学生，'
+                    '更新 %s 名学生的基本信息，%s 处冲突',
+                    len(remote_users), added_records, len(removed), len(meta_updates), conflicts)
+        return dict(data, users=merged_users)
+    
+    def snapshot(self) -> Dict:
+        """生成当前数据的快照（复制各用户的记录列表）
+        
+        快照与后续的内存修改互不影响，可交给其他线程调用 save_data(snapshot) 写入文件
+        """
+        with self._lock:
+            users = []
+            for user in self.users:
+                data = user.to_dict()
+                data["records"] = list(user.records)
+                users.append(data)
+        return {"users": users}
+    
+    @timed('save_data')
+    def save_data(self, snapshot: Optional[Dict] = None):
+        """保存数据到JSON文件
+        
+        Args:
+            snapshot: 由 snapshot() 生成的数据快照，默认保存当前数据
+        """
+        try:
             # 确保目录存在
             os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
             
-            data = {
-                "users": [user.to_dict() for user in self.users]
-            }
+            with self._lock, FileLock(self.lock_file):
+                data = snapshot if snapshot is not None else {
+                    "users": [user.to_dict() for user in self.users]
+                }
+                if self._disk_changed():
+                    data = self._merge_with_disk(data)
+                
+                users = data["users"]
+                record_count = sum(len(user["records"]) for user in users)
+                logger.debug('开始保存数据到: %s (%s 条成绩记录)', self.data_file, record_count)
+                
+                version = self.version + 1
+                revision = uuid.uuid4().hex
+                data = {"version": version, "revision": revision, "users": users}
+                
+                # 先写临时文件再替换，写入中途出错不会损坏原文件
+                temp_file = f'{self.data_file}.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                        self.fsync_count += 1
+                os.replace(temp_file, self.data_file)
+                self.save_count += 1
+                
+                self.version = version
+                self.revision = revision
+                self._disk_stat = self._stat_key(os.stat(self.data_file))
+                self._baseline = {user["id"]: len(user["records"]) for user in users}
+                self._baseline_meta = {user["id"]: _meta(user) for user in users}
             
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            logger.info(f'成功保存 {len(self.users)} 个用户数据')
+            annotate(users=len(users),
+                     records=record_count,
+                     bytes=self._disk_stat[1])
+            logger.info('成功保存 %s 个用户数据', len(users))
         except IOError as e:
-            logger.error(f"文件IO错误: {e}", exc_info=True)
+            logger.error('文件IO错误: %s', e, exc_info=True)
             raise
         except Exception as e:
-            logger.error(f"保存数据文件失败: {e}", exc_info=True)
+            logger.error('保存数据文件失败: %s', e, exc_info=True)
             raise
     
+    def _mark_dirty(self):
+        """记录一次修改：未开启合并写入时立即保存，否则按条数/时间窗口合并写入"""
+        if not self.group_commit:
+            self.save_data()
+            return
+        
+        with self._lock:
+            self.pending += 1
+            if self.pending >= self.max_pending:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.max_delay_ms / 1000, self._flush_on_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def _flush_before_reload(self) -> bool:
+        """重新加载前写入合并窗口内尚未保存的修改
+        
+        Returns:
+            是否可以重新加载；写入失败时保留内存中的数据，不重新加载
+        """
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error('重新加载前写入 %s 次未保存的修改失败，保留内存中的数据: %s',
+                         self.pending, e, exc_info=True)
+            annotate(status='error')
+            return False
+        return True
+    
+    def _reset_pending(self):
+        self.pending = 0
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+    
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            # save_data 已记录错误，待写入的修改保留到下次写入
+            pass
+        finally:
+            # 写入失败时定时器不会被 _reset_pending 清除，需在此清除，下次修改才会重新计时
+            with self._lock:
+                if self._flush_timer is threading.current_thread():
+                    self._flush_timer = None
+    
+    def flush(self) -> bool:
+        """立即写入尚未保存的修改
+        
+        Returns:
+            是否执行了写入
+        """
+        with self._lock:
+            if not self.pending:
+                return False
+            pending = self.pending
+            self.save_data()
+            self._reset_pending()
+            logger.debug('合并写入 %s 次修改', pending)
+            return True
+    
     def add_user(self, user: User) -> bool:
         """添加用户"""
         try:
-            logger.info(f'尝试添加用户: {user.name} ({user.gender})')
+            logger.info('尝试添加用户: %s (%s)', user.name, user.gender)
             
-            # 检查是否已存在同名用户
-            if self.find_user_by_name(user.name):
-                logger.warning(f'用户已存在: {user.name}')
-                return False
-            
-            self.users.append(user)
-            self.save_data()
-            logger.info(f'成功添加用户: {user.name}')
+            with self._lock:
+                # 检查是否已存在同名用户
+                if self.find_user_by_name(user.name):
+                    logger.warning('用户已存在: %s', user.name)
+                    return False
+                
+                self.users.append(user)
+                self._mark_dirty()
+            logger.info('成功添加用户: %s', user.name)
             return True
         except Exception as e:
-            logger.error(f"添加用户失败: {e}", exc_info=True)
+            logger.error('添加用户失败: %s', e, exc_info=True)
             return False
     
     def find_user_by_name(self, name: str) -> Optional[User]:
@@ -108,29 +423,31 @@ class DataManager:
     def update_user(self, user: User) -> bool:
         """更新用户信息"""
         try:
-            logger.debug(f'尝试更新用户: {user.name} (ID: {user.id})')
+            logger.debug('尝试更新用户: %s (ID: %s)', user.name, user.id)
             
-            for i, existing_user in enumerate(self.users):
-                if existing_user.id == user.id:
-                    self.users[i] = user
-                    self.save_data()
-                    logger.info(f'成功更新用户: {user.name}')
-                    return True
+            with self._lock:
+                for i, existing_user in enumerate(self.users):
+                    if existing_user.id == user.id:
+                        self.users[i] = user
+                        self._mark_dirty()
+                        logger.info('成功更新用户: %s', user.name)
+                        return True
             
-            logger.warning(f'未找到用户: ID={user.id}')
+            logger.warning('未找到用户: ID=%s', user.id)
             return False
         except Exception as e:
-            logger.error(f"更新用户失败: {e}", exc_info=True)
+            logger.error('更新用户失败: %s', e, exc_info=True)
             return False
     
     def delete_user(self, user_id: str) -> bool:
         """删除用户"""
         try:
-            for i, user in enumerate(self.users):
-                if user.id == user_id:
-                    del self.users[i]
-                    self.save_data()
-                    return True
+            with self._lock:
+                for i, user in enumerate(self.users):
+                    if user.id == user_id:
+                        del self.users[i]
+                        self._mark_dirty()
+                        return True
             return False
         except Exception as e:
             print(f"删除用户失败: {e}")
@@ -139,19 +456,20 @@ class DataManager:
     def add_score_record(self, user_id: str, record: Dict) -> bool:
         """为用户添加成绩记录"""
         try:
-            logger.debug(f'为用户添加成绩记录: user_id={user_id}')
+            logger.debug('为用户添加成绩记录: user_id=%s', user_id)
             
-            user = self.find_user_by_id(user_id)
-            if user:
-                user.add_record(record)
-                self.save_data()
-                logger.info(f'成功为用户 {user.name} 添加成绩记录')
-                return True
+            with self._lock:
+                user = self.find_user_by_id(user_id)
+                if user:
+                    user.add_record(record)
+                    self._mark_dirty()
+                    logger.info('成功为用户 %s 添加成绩记录', user.name)
+                    return True
             
-            logger.warning(f'未找到用户: ID={user_id}')
+            logger.warning('未找到用户: ID=%s', user_id)
             return False
         except Exception as e:
-            logger.error(f"添加成绩记录失败: {e}", exc_info=True)
+            logger.error('添加成绩记录失败: %s', e, exc_info=True)
             return False
     
     def get_user_records(self, user_id: str) -> List[Dict]:
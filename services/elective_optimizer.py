@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+选考项目最优组合
+总分是必选项、第一类选考、第二类选考三项得分之和，各类别互不影响，
+因此分别在每个类别中选出得分最高的已测项目即为总分最高的组合。
+班级批量计算在安装了 NumPy 时按（性别, 项目）整列插值评分，否则逐个学生计算
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from config.constants import PROJECT_CATEGORIES, GRADE_STANDARDS
+from services.leaderboard_service import grade_of
+from services.score_calculator import ScoreCalculator
+from utils.logger import get_logger
+from utils.metrics import timed, annotate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = get_logger()
+
+CATEGORIES = ("required", "category1", "category2")
+# 各项目取哪次成绩：最近一次或历史最好
+PERFORMANCE_MODES = ("latest", "best")
+
+
+class ElectiveOptimizer:
+    """选考项目最优组合求解器"""
+
+    def __init__(self, calculator: Optional[ScoreCalculator] = None):
+        self.calculator = calculator or ScoreCalculator()
+        # 向量化评分表 {(性别, 项目): (成绩数组, 得分数组)}
+        self._vector_tables = {}
+
+    def collect_performances(self, user, mode: str = "latest") -> Dict[str, float]:
+        """汇总学生各项目的成绩 {项目: 成绩}
+
+        Args:
+            mode: "latest" 取每个项目最近一次成绩，"best" 取得分最高的一次
+        """
+        if mode not in PERFORMANCE_MODES:
+            raise ValueError(f"不支持的成绩选取方式: {mode}")
+        performances = {}
+        best_scores = {}
+        for record in user.records:
+            for category in CATEGORIES:
+                for project, performance in record.get(category, {}).items():
+                    if mode == "latest":
+                        performances[project] = performance
+                        continue
+                    try:
+                        score = self.calculator.calculate_score(user.gender, project, performance)
+                    except ValueError:
+                        continue
+                    if score > best_scores.get(project, -1.0):
+                        best_scores[project] = score
+                        performances[project] = performance
+        return performances
+
+    def optimize(self, gender: str, performances: Dict[str, float]) -> Dict:
+        """求总分最高的项目组合
+
+        Args:
+            gender: 性别
+            performances: {项目: 成绩}，未测的项目不参与选择
+
+        Returns:
+            {"selection": {类别: {"project", "performance", "score"} 或 None},
+             "total", "grade", "complete"}，complete 表示三个类别都有已测项目
+        """
+        selection = {}
+        for category in CATEGORIES:
+            best = None
+            for project in PROJECT_CATEGORIES[category]:
+                if project not in performances:
+                    continue
+                try:
+                    score = self.calculator.calculate_score(gender, project, performances[project])
+                except ValueError:
+                    # 该性别没有此项目（如男生的仰卧起坐）
+                    continue
+                if best is None or score > best["score"]:
+                    best = {"project": project, "performance": performances[project], "score": score}
+            selection[category] = best
+        return self._result(selection)
+
+    def optimize_user(self, user, mode: str = "latest") -> Dict:
+        """按学生的已测成绩求最优组合，并与最近一次记录的总分比较"""
+        result = self.optimize(user.gender, self.collect_performances(user, mode))
+        return self._with_user(result, user)
+
+    @staticmethod
+    def _result(selection: Dict) -> Dict:
+        total = round(sum(item["score"] for item in selection.values() if item), 1)
+        return {"selection": selection, "total": total, "grade": grade_of(total),
+                "complete": all(selection.values())}
+
+    @staticmethod
+    def _with_user(result: Dict, user) -> Dict:
+        latest = user.get_latest_record()
+        current = latest["scores"]["total"] if latest else None
+        result.update(user_id=user.id, name=user.name, gender=user.gender, current_total=current,
+                      gain=round(result["total"] - current, 1) if current is not None else None)
+        return result
+
+    @timed('elective_optimize_class')
+    def optimize_class(self, users: Iterable, mode: str = "latest") -> List[Dict]:
+        """批量求全班每名学生的最优组合，按最优总分从高到低排序
+
+        安装了 NumPy 时每个（性别, 项目）整列插值评分、每个类别整列取最大值
+        """
+        users = list(users)
+        if np is None:
+            results = [self.optimize_user(user, mode) for user in users]
+        else:
+            results = []
+            for gender in ("male", "female"):
+                group = [user for user in users if user.gender == gender]
+                if group:
+                    results.extend(self._optimize_group(gender, group, mode))
+        results.sort(key=lambda result: result["total"], reverse=True)
+        annotate(users=len(users), vectorized=np is not None)
+        logger.debug('已计算 %s 名学生的最优选考组合', len(users))
+        return results
+
+    def _vector_table(self, gender: str, project: str):
+        """评分表转为按成绩升序的数组（与 calculate_score 使用同一张表，同一成绩值的多个得分全部保留）"""
+        key = (gender, project)
+        table = self._vector_tables.get(key)
+        if table is None:
+            pairs = self.calculator.get_score_table(gender, project)
+            table = (np.array([p for p, _ in pairs], dtype=float), np.array([s for _, s in pairs], dtype=float))
+            self._vector_tables[key] = table
+        return table
+
+    def _score_column(self, gender: str, project: str, column):
+        """整列成绩评分（NaN 表示未测，结果也为 NaN）"""
+        xs, ys = self._vector_table(gender, project)
+        # 与 calculate_score 相同的区间选择（第一个满足 x[i] <= 成绩 <= x[i+1] 的区间，
+        # 同一成绩值重复出现时落在最后一个重复点之后的区间）和插值公式，保证浮点结果逐位一致
+        index = np.clip(np.searchsorted(xs, column, side='left') - 1, 0, len(xs) - 2)
+        x1, x2, y1, y2 = xs[index], xs[index + 1], ys[index], ys[index + 1]
+        # 边界外和重复成绩值的区间会得到 NaN/inf，这些位置最后取边界得分
+        with np.errstate(invalid='ignore', divide='ignore'):
+            raw = y1 + (y2 - y1) * (column - x1) / (x2 - x1)
+            # np.round 先乘10再取整，恰在 .x5 附近时可能与 round() 的结果不同，这些值逐个修正
+            ties = np.abs(raw * 10 % 1 - 0.5) < 1e-6
+        scores = np.round(raw, 1)
+        scores[ties] = [round(float(value), 1) for value in raw[ties]]
+        # 超出评分表范围时取边界得分
+        scores = np.where(column <= xs[0], ys[0], np.where(column >= xs[-1], ys[-1], scores))
+        return np.where(np.isnan(column), np.nan, scores)
+
+    def _best_performances(self, gender: str, users: List, scoring: Dict) -> List[Dict[str, float]]:
+        """"best" 模式的批量版本：按项目整列评分全部记录，取每名学生第一次达到最高分的成绩"""
+        entries = {}
+        for i, user in enumerate(users):
+            for record in user.records:
+                for category in CATEGORIES:
+                    for project, performance in record.get(category, {}).items():
+                        if project in scoring:
+                            owners, values = entries.setdefault(project, ([], []))
+                            owners.append(i)
+                            values.append(performance)
+
+        performances = [{} for _ in users]
+        for project, (owners, values) in entries.items():
+            owners = np.array(owners)
+            scores = self._score_column(gender, project, np.array(values, dtype=float))
+            best = np.full(len(users), -np.inf)
+            np.maximum.at(best, owners, scores)
+            reached = np.flatnonzero(scores == best[owners])
+            _, first = np.unique(owners[reached], return_index=True)
+            for position in reached[first]:
+                performances[owners[position]][project] = values[position]
+        return performances
+
+    def _optimize_group(self, gender: str, users: List, mode: str) -> List[Dict]:
+        scoring = self.calculator.male_scoring if gender == "male" else self.calculator.female_scoring
+        if mode == "best":
+            performances = self._best_performances(gender, users, scoring)
+        else:
+            performances = [self.collect_performances(user, mode) for user in users]
+
+        # 每个类别: (项目列表, 得分矩阵[学生, 项目])
+        category_scores = {}
+        for category in CATEGORIES:
+            projects = [project for project in PROJECT_CATEGORIES[category] if project in scoring]
+            matrix = np.full((len(users), len(projects)), np.nan)
+            for j, project in enumerate(projects):
+                column = np.array([p.get(project, np.nan) for p in performances], dtype=float)
+                matrix[:, j] = self._score_column(gender, project, column)
+            category_scores[category] = (projects, matrix)
+
+        best = {}
+        for category, (projects, matrix) in category_scores.items():
+            tested = ~np.all(np.isnan(matrix), axis=1)
+            index = np.argmax(np.where(np.isnan(matrix), -np.inf, matrix), axis=1)
+            best[category] = (projects, matrix, tested, index)
+        totals = np.round(sum(np.where(tested, matrix[np.arange(len(users)), index], 0.0)
+                              for _, matrix, tested, index in best.values()), 1)
+        # 与 grade_level 一致：按下限从低到高依次覆盖，得到下限不高于总分的最高等级
+        grades = np.full(len(users), "fail", dtype=object)
+        for grade, standard in sorted(GRADE_STANDARDS.items(), key=lambda item: item[1]["min"]):
+            grades[totals >= standard["min"]] = grade
+
+        results = []
+        for i, user in enumerate(users):
+            selection = {}
+            for category, (projects, matrix, tested, index) in best.items():
+                if not tested[i]:
+                    selection[category] = None
+                    continue
+                project = projects[index[i]]
+                selection[category] = {"project": project, "performance": performances[i][project],
+                                       "score": float(matrix[i, index[i]])}
+            result = {"selection": selection, "total": float(totals[i]), "grade": grades[i],
+                      "complete": all(selection.values())}
+            results.append(self._with_user(result, user))
+        return results
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+成绩趋势预测
+按测试日期对每个项目（及总分）的得分序列做最小二乘线性回归，或用 Holt 指数平滑，
+外推到考试日期得到预计得分，趋势按每30天的得分变化判定。
+批量预测在安装了 NumPy 时把所有学生的全部序列拼成一列、按序列编号分组求和一次完成回归；
+结果按学生缓存，学生的记录版本号（User.records_version）变化后才重新计算
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config.constants import FORECAST_CONFIG
+from utils.logger import get_logger
+from utils.metrics import timed, annotate
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = get_logger()
+
+CATEGORIES = ("required", "category1", "category2")
+FORECAST_METHODS = ("linear", "smoothing")
+# 总分序列的键
+TOTAL_SERIES = "total"
+# 各序列得分上限：单项10分，总分30分
+MAX_SCORE = {TOTAL_SERIES: 30.0}
+PROJECT_MAX_SCORE = 10.0
+
+
+def resolve_exam_date(exam_date: Optional[str] = None, today: Optional[date] = None) -> date:
+    """解析考试日期
+
+    Args:
+        exam_date: "YYYY-MM-DD"，或 "MM-DD" 表示今天及以后最近的该日；默认取配置
+        today: 计算 "MM-DD" 时的基准日期，默认今天
+    """
+    exam_date = exam_date or FORECAST_CONFIG["exam_date"]
+    today = today or date.today()
+    try:
+        if exam_date.count("-") == 2:
+            return date.fromisoformat(exam_date)
+        month, day = (int(part) for part in exam_date.split("-"))
+        candidate = date(today.year, month, day)
+        return candidate if candidate >= today else date(today.year + 1, month, day)
+    except ValueError:
+        raise ValueError(f"考试日期格式错误: {exam_date}") from None
+
+
+@lru_cache(maxsize=4096)
+def _day_number(text: str) -> int:
+    """日期字符串转为日序数（同一班级的测试日期大量重复，缓存解析结果）"""
+    return date.fromisoformat(text).toordinal()
+
+
+def iter_points(records: Iterable[Dict]) -> Iterator[Tuple[str, int, float]]:
+    """按记录顺序逐个产出 (项目或 "total", 日期序数, 得分)，日期无效的记录跳过"""
+    for record in records:
+        try:
+            day = _day_number(record["date"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        scores = record["scores"]
+        yield TOTAL_SERIES, day, scores["total"]
+        for category in CATEGORIES:
+            for project in record.get(category, {}):
+                yield project, day, scores[category]
+
+
+def collect_series(records: Iterable[Dict]) -> Dict[str, List[Tuple[int, float]]]:
+    """整理各项目及总分的得分序列 {项目或 "total": [(日期序数, 得分), ...]}，按日期排序"""
+    series = {}
+    for key, day, score in iter_points(records):
+        series.setdefault(key, []).append((day, score))
+    for points in series.values():
+        # 同一天的多次测试保持录入顺序
+        points.sort(key=lambda point: point[0])
+    return series
+
+
+class ForecastEngine:
+    """成绩趋势预测器"""
+
+    def __init__(self, exam_date: Optional[str] = None, method: Optional[str] = None,
+                 alpha: Optional[float] = None, beta: Optional[float] = None):
+        """
+        Args:
+            exam_date: 考试日期，格式见 resolve_exam_date
+            method: "linear" 线性回归，"smoothing" 指数平滑；默认取配置
+            alpha, beta: 指数平滑的水平、趋势平滑系数
+        """
+        self.method = method or FORECAST_CONFIG["method"]
+        if self.method not in FORECAST_METHODS:
+            raise ValueError(f"不支持的预测方法: {self.method}")
+        self.exam_date = resolve_exam_date(exam_date)
+        self.alpha = FORECAST_CONFIG["smoothing_alpha"] if alpha is None else alpha
+        self.beta = FORECAST_CONFIG["smoothing_beta"] if beta is None else beta
+        # {用户ID: (记录版本号, 预测结果)}
+        self._cache: Dict[str, Tuple[int, Dict]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def forecast_user(self, user) -> Dict[str, Dict]:
+        """预测单个学生各项目及总分 {项目或 "total": 预测结果}，结果字段见 _summary"""
+        return self.forecast_class([user])[user.id]
+
+    @timed('forecast_class')
+    def forecast_class(self, users: Iterable) -> Dict[str, Dict[str, Dict]]:
+        """批量预测 {用户ID: {项目或 "total": 预测结果}}，只重新计算记录有变化的学生"""
+        users = list(users)
+        results = {}
+        stale = []
+        for user in users:
+            cached = self._cache.get(user.id)
+            # 与 User.get_stats 相同，以记录版本号判断记录是否有增删改
+            if cached is not None and cached[0] == user.records_version:
+                results[user.id] = cached[1]
+                self.cache_hits += 1
+            else:
+                stale.append(user)
+
+        if stale:
+            self.cache_misses += len(stale)
+            for user, forecast in zip(stale, self._fit_users(stale)):
+                self._cache[user.id] = (user.records_version, forecast)
+                results[user.id] = forecast
+        annotate(users=len(users), fitted=len(stale), method=self.method)
+        logger.debug('已预测 %s 名学生的成绩趋势（重新计算 %s 名）', len(users), len(stale))
+        return results
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """清除缓存（不指定用户时全部清除）"""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(user_id, None)
+
+    def _fit_users(self, users: List) -> List[Dict[str, Dict]]:
+        if self.method == "linear" and np is not None:
+            return self._fit_users_batch(users)
+
+        fit = self._linear if self.method == "linear" else self._smooth
+        exam_day = self.exam_date.toordinal()
+        forecasts = []
+        for user in users:
+            forecast = {}
+            for key, points in collect_series(user.records).items():
+                latest_day, latest_score = points[-1]
+                forecast[key] = self._summary(key, len(points), latest_day, latest_score,
+                                              fit(points), exam_day)
+            forecasts.append(forecast)
+        return forecasts
+
+    def _fit_users_batch(self, users: List) -> List[Dict[str, Dict]]:
+        """线性回归的批量版本：全部学生的全部得分点拼成一列，按序列编号 bincount 分组求和"""
+        index = {}
+        owners, days, scores = [], [], []
+        for i, user in enumerate(users):
+            for key, day, score in iter_points(user.records):
+                series = index.get((i, key))
+                if series is None:
+                    series = index[(i, key)] = len(index)
+                owners.append(series)
+                days.append(day)
+                scores.append(score)
+
+        forecasts = [{} for _ in users]
+        if not index:
+            return forecasts
+        owners = np.array(owners, dtype=np.intp)
+        xs = np.array(days, dtype=float)
+        ys = np.array(scores, dtype=float)
+        counts = np.bincount(owners)
+
+        mean_x = np.bincount(owners, xs) / counts
+        mean_y = np.bincount(owners, ys) / counts
+        dx = xs - mean_x[owners]
+        sxx = np.bincount(owners, dx * dx)
+        sxy = np.bincount(owners, dx * (ys - mean_y[owners]))
+        # 只有一个测试日期时无法估计斜率，按持平处理
+        slopes = np.divide(sxy, sxx, out=np.zeros_like(sxy), where=sxx > 0)
+
+        # 最近一次：日期最大的点中录入顺序最靠后的一个（与 collect_series 排序后的末项一致）
+        latest_day = np.full(len(index), -np.inf)
+        np.maximum.at(latest_day, owners, xs)
+        on_latest = np.flatnonzero(xs == latest_day[owners])
+        latest = np.zeros(len(index), dtype=np.intp)
+        np.maximum.at(latest, owners[on_latest], on_latest)
+
+        exam_day = self.exam_date.toordinal()
+        fits = zip(mean_x.tolist(), mean_y.tolist(), slopes.tolist())
+        for ((i, key), series), fit, count, position in zip(index.items(), fits, counts.tolist(),
+                                                            latest.tolist()):
+            forecasts[i][key] = self._summary(key, count, days[position], scores[position], fit, exam_day)
+        return forecasts
+
+    @staticmethod
+    def _linear(points: List[Tuple[int, float]]) -> Tuple[float, float, float]:
+        """最小二乘直线，返回 (锚点日期, 锚点得分, 每天得分变化)，锚点取日期均值"""
+        n = len(points)
+        mean_x = sum(x for x, _ in points) / n
+        mean_y = sum(y for _, y in points) / n
+        sxx = sum((x - mean_x) ** 2 for x, _ in points)
+        sxy = sum((x - mean_x) * (y - mean_y) for x, y in points)
+        return mean_x, mean_y, sxy / sxx if sxx > 0 else 0.0
+
+    def _smooth(self, points: List[Tuple[int, float]]) -> Tuple[float, float, float]:
+        """Holt 线性趋势指数平滑（按实际间隔天数外推），返回 (最后日期, 平滑水平, 每天得分变化)"""
+        previous, level = points[0]
+        trend = None
+        for day, score in points[1:]:
+            interval = day - previous
+            if interval <= 0:
+                # 同一天的多次测试只更新水平
+                level = self.alpha * score + (1 - self.alpha) * level
+                continue
+            if trend is None:
+                # 以前两个测试日期的变化率作为初始趋势
+                trend = (score - level) / interval
+                level = score
+                previous = day
+                continue
+            new_level = self.alpha * score + (1 - self.alpha) * (level + trend * interval)
+            trend = self.beta * (new_level - level) / interval + (1 - self.beta) * trend
+            level = new_level
+            previous = day
+        return previous, level, trend or 0.0
+
+    def _summary(self, key: str, count: int, latest_day: int, latest_score: float,
+                 fit: Tuple[float, float, float], exam_day: int) -> Dict:
+        """
+        Returns:
+            {"points": 测试次数, "latest_score": 最近一次得分, "slope_per_30d": 每30天得分变化,
+             "projected": 考试日预计得分, "days_to_exam": 最近一次测试距考试的天数,
+             "trend": "improving"/"declining"/"stable", "method": 预测方法}
+        """
+        anchor, value, slope = fit
+        upper = MAX_SCORE.get(key, PROJECT_MAX_SCORE)
+        projected = min(max(value + slope * (exam_day - anchor), 0.0), upper)
+        per_30_days = slope * 30
+        threshold = FORECAST_CONFIG["stable_slope"] * (3 if key == TOTAL_SERIES else 1)
+        if per_30_days >= threshold:
+            trend = "improving"
+        elif per_30_days <= -threshold:
+            trend = "declining"
+        else:
+            trend = "stable"
+        return {"points": count, "latest_score": latest_score,
+                "slope_per_30d": round(per_30_days, 3), "projected": round(projected, 1),
+                "days_to_exam": exam_day - latest_day, "trend": trend, "method": self.method}
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+班级排行榜服务
+按项目（或总分）、性别、日期范围和等级筛选，查询前K名和后K名。
+每个学生取筛选范围内的最好成绩参与排名，使用堆选择（heapq.nlargest/nsmallest），
+复杂度为 O(n log K)，不必每次对全部学生排序
+"""
+
+import heapq
+from typing import Dict, Iterable, List, Optional
+
+from config.constants import LOWER_IS_BETTER_PROJECTS
+from services.score_calculator import grade_level
+
+CATEGORIES = ("required", "category1", "category2")
+# 按总分排名时使用的项目键
+TOTAL_PROJECT = "total"
+
+
+def grade_of(total_score: float) -> str:
+    """总分对应的等级键"""
+    return grade_level(total_score)
+
+
+class LeaderboardService:
+    """班级排行榜"""
+
+    def __init__(self, users: Iterable = ()):
+        self.users = list(users)
+
+    def set_users(self, users: Iterable):
+        """更新参与排名的学生"""
+        self.users = list(users)
+
+    @staticmethod
+    def _score_of(record: Dict, project: str):
+        """取出记录中指定项目的 (得分, 成绩数值)，记录中没有该项目时返回None"""
+        if project == TOTAL_PROJECT:
+            return record["scores"]["total"], None
+        for category in CATEGORIES:
+            if project in record[category]:
+                return record["scores"][category], record[category][project]
+        return None
+
+    def _best_entries(self, project: str, gender: Optional[str] = None,
+                      start_date: Optional[str] = None, end_date: Optional[str] = None,
+                      grade: Optional[str] = None):
+        """逐个学生产出筛选范围内的最好成绩 (排名键, 用户, 记录)"""
+        start_date = str(start_date) if start_date else None
+        end_date = str(end_date) if end_date else None
+        # 得分相同时比较成绩数值（计时类项目越小越好）
+        sign = -1 if project in LOWER_IS_BETTER_PROJECTS else 1
+
+        for user in self.users:
+            if gender and user.gender != gender:
+                continue
+
+            best = None
+            for record in user.records:
+                date = record["date"]
+                if (start_date and date < start_date) or (end_date and date > end_date):
+                    continue
+                if grade and grade_of(record["scores"]["total"]) != grade:
+                    continue
+                value = self._score_of(record, project)
+                if value is None:
+                    continue
+                score, performance = value
+                rank_key = (score, 0 if performance is None else sign * performance)
+                if best is None or rank_key > best[0]:
+                    best = (rank_key, user, record)
+            if best is not None:
+                yield best
+
+    def _entry(self, user, record: Dict, project: str) -> Dict:
+        """生成排行榜条目"""
+        score, performance = self._score_of(record, project)
+        total = record["scores"]["total"]
+        return {
+            "user_id": user.id,
+            "name": user.name,
+            "gender": user.gender,
+            "project": project,
+            "date": record["date"],
+            "score": score,
+            "performance": performance,
+            "total_score": total,
+            "grade": grade_of(total)
+        }
+
+    def top(self, project: str = TOTAL_PROJECT, k: int = 10, **filters) -> List[Dict]:
+        """前K名
+
+        Args:
+            project: 项目键，"total" 表示按总分
+            k: 名次数量
+            **filters: gender（"male"/"female"）、start_date、end_date（"YYYY-MM-DD"）、
+                       grade（GRADE_STANDARDS 中的等级键）
+
+        Returns:
+            按名次排列的条目列表，条目包含 rank、name、date、score、performance、grade 等
+        """
+        best = heapq.nlargest(k, self._best_entries(project, **filters), key=lambda item: item[0])
+        return self._ranked(best, project)
+
+    def bottom(self, project: str = TOTAL_PROJECT, k: int = 10, **filters) -> List[Dict]:
+        """后K名（从最后一名开始），参数同 top"""
+        worst = heapq.nsmallest(k, self._best_entries(project, **filters), key=lambda item: item[0])
+        return self._ranked(worst, project)
+
+    def _ranked(self, items: List, project: str) -> List[Dict]:
+        entries = []
+        for rank, (_, user, record) in enumerate(items, 1):
+            entry = self._entry(user, record, project)
+            entry["rank"] = rank
+            entries.append(entry)
+        return entries
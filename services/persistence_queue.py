@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+单写入者持久化队列（asyncio）
+请求处理协程在事件循环中直接修改内存数据，再 await commit() 等待落盘；
+后台写入协程每次取出排队中的全部提交，生成一次数据快照并在线程中写入文件，
+并发提交因此合并为一次 save_data
+"""
+
+import asyncio
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class PersistenceQueue:
+    """合并并发提交的单写入者持久化队列"""
+
+    def __init__(self, data_manager, max_batch: int = 256):
+        """
+        Args:
+            data_manager: DataManager 实例
+            max_batch: 一次写入合并的最大提交数
+        """
+        self.data_manager = data_manager
+        self.max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # 统计：写入次数与已落盘的提交数
+        self.saves = 0
+        self.commits = 0
+
+    async def start(self):
+        """启动后台写入协程（需在事件循环中调用）"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    async def commit(self):
+        """等待此前对内存数据的修改写入文件，写入失败时抛出异常"""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(future)
+        await future
+
+    async def stop(self):
+        """写完已排队的提交后停止"""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _writer(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+
+            # 写入进行期间到达的提交都在队列中等待，下一轮一次取出
+            batch = [first]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            snapshot = self.data_manager.snapshot()
+            try:
+                await loop.run_in_executor(None, self.data_manager.save_data, snapshot)
+            except Exception as e:
+                logger.error('批量写入失败（%s 个提交）: %s', len(batch), e)
+                for future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.saves += 1
+            self.commits += len(batch)
+            logger.debug('批量写入完成: %s 个提交', len(batch))
+            for future in batch:
+                if not future.done():
+                    future.set_result(None)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+成绩记录构建模块
+解析性别、项目和成绩文本并计算得分，生成与录入界面保存格式一致的成绩记录，
+供命令行和 HTTP 接口等非图形界面入口共用
+"""
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from config.constants import PROJECT_NAMES, PROJECT_CATEGORIES, GRADE_STANDARDS
+from config.scoring_standards import parse_time_to_seconds
+from services.score_calculator import grade_level
+
+CATEGORIES = ("required", "category1", "category2")
+
+GENDER_ALIASES = {"male": "male", "m": "male", "男": "male", "男生": "male",
+                  "female": "female", "f": "female", "女": "female", "女生": "female"}
+
+# 项目显示名称到项目键的映射
+PROJECT_KEYS = {name: key for key, name in PROJECT_NAMES.items()}
+
+
+class RecordError(ValueError):
+    """成绩输入数据错误"""
+
+
+def parse_gender(value: str) -> str:
+    """解析性别"""
+    gender = GENDER_ALIASES.get(str(value).strip().lower())
+    if gender is None:
+        raise RecordError(f"无法识别的性别: {value}")
+    return gender
+
+
+def parse_project(category: str, value: str) -> str:
+    """解析项目（项目键或中文名称），并检查是否属于该类别"""
+    value = str(value).strip()
+    project = value if value in PROJECT_NAMES else PROJECT_KEYS.get(value)
+    if project not in PROJECT_CATEGORIES.get(category, ()):
+        raise RecordError(f"{category} 不支持的项目: {value}")
+    return project
+
+
+def parse_performance(project: str, value) -> float:
+    """解析成绩数值（长跑支持 3'40" 或 3:40 格式）"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    value = str(value).strip()
+    try:
+        if project in ("1000m", "800m"):
+            return parse_time_to_seconds(value)
+        if project in ("pull_ups", "sit_ups"):
+            return int(value)
+        return float(value)
+    except (ValueError, IndexError):
+        raise RecordError(f"{PROJECT_NAMES.get(project, project)} 成绩格式错误: {value}")
+
+
+def build_record(calculator, gender: str, items: Dict[str, Tuple[str, float]],
+                 date: Optional[str] = None) -> Dict:
+    """按各类别 (项目, 成绩) 计算得分并生成成绩记录
+
+    Args:
+        calculator: ScoreCalculator 实例
+        gender: 性别
+        items: {类别: (项目键, 成绩数值)}，三个类别都必须提供
+        date: 测试日期 YYYY-MM-DD，默认今天
+    """
+    missing = [category for category in CATEGORIES if category not in items]
+    if missing:
+        raise RecordError(f"缺少类别: {', '.join(missing)}")
+    if date:
+        try:
+            datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            raise RecordError(f"日期格式错误: {date}")
+
+    performances = {category: {items[category][0]: items[category][1]} for category in CATEGORIES}
+    scores = calculator.calculate_total_score(
+        gender, performances["required"], performances["category1"], performances["category2"])
+    return {
+        "date": date or datetime.now().strftime("%Y-%m-%d"),
+        **performances,
+        "scores": scores,
+        "total_score": scores["total"]
+    }
+
+
+def grade_name(total_score: float) -> str:
+    """总分对应的等级名称"""
+    return GRADE_STANDARDS[grade_level(total_score)]["name"]
@@ -3,9 +3,40 @@
 成绩计算与评分逻辑模块
 """
 
-from typing import Dict, Tuple, Optional
+import math
+from typing import Dict, List, Tuple, Optional
 from config.scoring_standards import get_scoring_data, parse_time_to_seconds
-from config.constants import GRADE_STANDARDS, PROJECT_IMPROVEMENT_SUGGESTIONS
+from config.constants import (
+    GRADE_STANDARDS, PROJECT_IMPROVEMENT_SUGGESTIONS, LOWER_IS_BETTER_PROJECTS, PROJECT_PERFORMANCE_STEPS
+)
+
+# 等级键按下限从高到低排列
+_GRADES_BY_MIN = sorted(GRADE_STANDARDS, key=lambda grade: GRADE_STANDARDS[grade]["min"], reverse=True)
+
+
+def grade_level(total_score: float) -> str:
+    """总分对应的等级键（如 "good"）
+
+    取下限不高于总分的最高等级，两档之间的总分（如 26.8，介于良好上限和优秀下限之间）归入较低一档
+    """
+    for grade in _GRADES_BY_MIN:
+        if total_score >= GRADE_STANDARDS[grade]["min"]:
+            return grade
+    return "fail"
+
+
+def format_performance(project_key: str, performance_value: float) -> str:
+    """按项目计量单位格式化成绩显示（如 4'5"、7.8秒、210.0厘米、12次）"""
+    if project_key in ["1000m", "800m"]:
+        minutes = int(performance_value // 60)
+        seconds = int(performance_value % 60)
+        return f"{minutes}'{seconds}\""
+    elif project_key in ["50m", "basketball", "football"]:
+        return f"{performance_value:.1f}秒"
+    elif project_key in ["sit_reach", "standing_jump"]:
+        return f"{performance_value:.1f}厘米"
+    else:
+        return f"{int(performance_value)}次"
 
 
 class ScoreCalculator:
@@ -14,6 +45,9 @@ class ScoreCalculator:
     def __init__(self):
         self.male_scoring = get_scoring_data("male")
         self.female_scoring = get_scoring_data("female")
+        # 反查用的评分表 {(性别, 项目): [(得分, 成绩), ...]}（按得分升序）与反查结果缓存
+        self._inverse_tables: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+        self._inverse_cache: Dict[Tuple[str, str, float], Optional[float]] = {}
     
     def calculate_score(self, gender: str, project: str, performance: float) -> float:
         """计算单项得分
@@ -36,6 +70,16 @@ class ScoreCalculator:
         # 线性插值计算得分
         return self._interpolate_score(score_table, performance)
     
+    def get_score_table(self, gender: str, project: str) -> List[Tuple[float, float]]:
+        """按成绩值排序的评分表 [(成绩值, 得分), ...]
+        
+        与 calculate_score 插值时使用的表相同（稳定排序，同一成绩值的多个得分保留原顺序）
+        """
+        scoring_data = self.male_scoring if gender == "male" else self.female_scoring
+        if project not in scoring_data:
+            raise ValueError(f"不支持的项目: {project}")
+        return sorted(scoring_data[project], key=lambda x: x[0])
+    
     def _interpolate_score(self, score_table: list, performance: float) -> float:
         """使用线性插值计算得分
         
@@ -114,11 +158,7 @@ class ScoreCalculator:
         Returns:
             等级名称
         """
-        for grade, standard in GRADE_STANDARDS.items():
-            if standard["min"] <= total_score <= standard["max"]:
-                return standard["name"]
-        
-        return "不及格"
+        return GRADE_STANDARDS[grade_level(total_score)]["name"]
     
     def get_weakest_item(self, scores: Dict[str, float]) -> Optional[str]:
         """获取最弱项
@@ -169,3 +209,121 @@ class ScoreCalculator:
                 return suggestions_dict[gender]
         
         return "建议加强该项训练，提高技术水平。"
+    
+    def _inverse_table(self, gender: str, project: str) -> List[Tuple[float, float]]:
+        """按得分升序排列的 (得分, 成绩) 表，同一成绩值只保留最高得分"""
+        key = (gender, project)
+        table = self._inverse_tables.get(key)
+        if table is None:
+            scoring_data = self.male_scoring if gender == "male" else self.female_scoring
+            if project not in scoring_data:
+                raise ValueError(f"不支持的项目: {project}")
+            best = {}
+            for performance, score in scoring_data[project]:
+                best[performance] = max(score, best.get(performance, score))
+            table = sorted((score, performance) for performance, score in best.items())
+            self._inverse_tables[key] = table
+        return table
+    
+    def required_performance(self, gender: str, project: str, target_score: float) -> Optional[float]:
+        """反查达到目标得分所需的成绩（评分表反向线性插值，结果缓存）
+        
+        Args:
+            gender: 性别
+            project: 项目名称
+            target_score: 目标单项得分 (0-10分)
+            
+        Returns:
+            按项目计量单位取整后、能达到目标得分的最差成绩；目标超过满分时返回None
+        """
+        # 按原目标得分计算和缓存，不做取整（取整后得到的是另一个得分所需的成绩）
+        target = float(target_score)
+        key = (gender, project, target)
+        if key in self._inverse_cache:
+            return self._inverse_cache[key]
+        
+        table = self._inverse_table(gender, project)
+        if target > table[-1][0]:
+            performance = None
+        elif target <= table[0][0]:
+            performance = table[0][1]
+        else:
+            performance = table[-1][1]
+            for (y1, x1), (y2, x2) in zip(table, table[1:]):
+                if y1 < target <= y2:
+                    performance = x1 + (x2 - x1) * (target - y1) / (y2 - y1)
+                    break
+            performance = self._snap_performance(gender, project, performance, target)
+        
+        self._inverse_cache[key] = performance
+        return performance
+    
+    def _snap_performance(self, gender: str, project: str, performance: float, target: float) -> float:
+        """把插值得到的成绩按计量单位向“更好”的方向取整，并确保正向计算不低于目标得分"""
+        step = PROJECT_PERFORMANCE_STEPS.get(project, 0.1)
+        direction = -1 if project in LOWER_IS_BETTER_PROJECTS else 1
+        units = performance / step
+        units = math.floor(units + 1e-9) if direction < 0 else math.ceil(units - 1e-9)
+        performance = round(units * step, 6)
+        while self.calculate_score(gender, project, performance) < target - 1e-9:
+            performance = round(performance + direction * step, 6)
+        return performance
+    
+    def score_gradient(self, gender: str, project: str, performance: float) -> float:
+        """当前成绩每提高一个单位（1秒、1厘米或1次）可增加的得分（所在评分区间的斜率）"""
+        table = self._inverse_table(gender, project)
+        direction = -1 if project in LOWER_IS_BETTER_PROJECTS else 1
+        for (y1, x1), (y2, x2) in zip(table, table[1:]):
+            # 成绩向“更好”方向移动时所在的区间
+            low, high = sorted((x1, x2))
+            in_segment = low <= performance < high if direction > 0 else low < performance <= high
+            if in_segment and x1 != x2:
+                return abs((y2 - y1) / (x2 - x1))
+        # 已达满分，或成绩差于评分表最低档
+        worst = table[0][1]
+        if (performance - worst) * direction < 0 and len(table) > 1:
+            (y1, x1), (y2, x2) = table[0], table[1]
+            return abs((y2 - y1) / (x2 - x1)) if x1 != x2 else 0.0
+        return 0.0
+    
+    def gradient_table(self, gender: str, performances: Dict[str, float],
+                       target_step: float = 0.5) -> List[Dict]:
+        """批量计算各项目的提分代价，按代价从低到高排序
+        
+        Args:
+            gender: 性别
+            performances: {项目: 当前成绩}
+            target_step: 下一目标得分的间隔（默认提高到下一个0.5分档）
+            
+        Returns:
+            [{"project", "performance", "score", "points_per_unit", "target_score",
+              "target_performance", "improvement", "cost"}, ...]
+            improvement 为达到目标需要提高的成绩量；cost 为每提高1分所需的成绩提高量
+            占满分标准成绩的百分比，已满分的项目 cost 为 None、排在最后
+        """
+        rows = []
+        for project, performance in performances.items():
+            score = self.calculate_score(gender, project, performance)
+            table = self._inverse_table(gender, project)
+            target_score = min(table[-1][0], (math.floor(score / target_step + 1e-9) + 1) * target_step)
+            row = {
+                "project": project,
+                "performance": performance,
+                "score": score,
+                "points_per_unit": round(self.score_gradient(gender, project, performance), 3),
+                "target_score": None,
+                "target_performance": None,
+                "improvement": None,
+                "cost": None,
+            }
+            if score < target_score:
+                target_performance = self.required_performance(gender, project, target_score)
+                improvement = round(abs(target_performance - performance), 6)
+                full_marks = abs(table[-1][1]) or 1.0
+                row.update(target_score=target_score, target_performance=target_performance,
+                           improvement=improvement,
+                           cost=round(improvement / full_marks * 100 / (target_score - score), 2))
+            rows.append(row)
+        rows.sort(key=lambda row: (row["cost"] is None, row["cost"] or 0.0))
+        return rows
+
@@ -0,0 +1,382 @@
+# -*- coding: utf-8 -*-
+"""
+分片数据存储
+每名学生的数据保存在单独的分片文件中，另有一个只含学生基本信息的索引文件：
+
+    <分片目录>/index.json           {"format": "sharded", "version", "revision", "users": [{id, name, ...}]}
+    <分片目录>/shards/<用户ID>.json  {"revision", ...User.to_dict()}
+
+保存时只重写记录数或基本信息发生变化的学生分片，只有增删学生或修改基本信息时才重写索引，
+录入一次成绩的写入量与全校人数无关。
+多进程写入与单文件格式相同：持有分片目录的文件锁，按修订号检测其他写入者的修改并合并；
+只有本次要写入的分片和索引会与磁盘合并，其他学生的最新数据需重新 load_data 才能看到
+"""
+
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from models.user import User
+from config.constants import DATA_FILE, PERSISTENCE_CONFIG
+from services.data_manager import DataManager
+from utils import json_codec
+from utils.file_lock import FileLock
+from utils.logger import get_logger
+from utils.metrics import timed, annotate
+
+logger = get_logger()
+
+INDEX_FILE = "index.json"
+SHARDS_DIR = "shards"
+# 索引中保存的学生基本信息字段
+INDEX_FIELDS = ("id", "name", "gender", "student_id", "created_at")
+
+
+def default_shard_dir() -> str:
+    """默认分片目录（与数据文件位于同一目录）"""
+    return os.path.join(os.path.dirname(DATA_FILE), PERSISTENCE_CONFIG["shard_dir"])
+
+
+class _UserView:
+    """保存时统一访问内存用户对象或快照中的用户字典"""
+
+    __slots__ = ("id", "meta", "records", "version", "user", "data")
+
+    def __init__(self, user: Optional[User] = None, data: Optional[Dict] = None):
+        self.user = user
+        self.data = data
+        if user is not None:
+            self.id = user.id
+            self.meta = (user.name, user.gender, user.student_id)
+            self.records = user.records
+            self.version = user.records_version
+        else:
+            self.id = data["id"]
+            self.meta = (data["name"], data["gender"], data.get("student_id"))
+            self.records = data["records"]
+            # 快照中的用户字典没有记录版本号
+            self.version = None
+
+    def to_dict(self) -> Dict:
+        data = self.user.to_dict() if self.user is not None else dict(self.data)
+        data["records"] = list(self.records)
+        return data
+
+    def index_entry(self) -> Dict:
+        if self.user is not None:
+            return {field: getattr(self.user, field) for field in INDEX_FIELDS}
+        return {field: self.data.get(field) for field in INDEX_FIELDS}
+
+
+class ShardedDataManager(DataManager):
+    """按学生分片存储的数据管理器，接口与 DataManager 相同"""
+
+    def __init__(self, shard_dir: Optional[str] = None, load_workers: Optional[int] = None, **kwargs):
+        """
+        Args:
+            shard_dir: 分片目录（默认使用 default_shard_dir()）
+            load_workers: 并行读取分片的线程数（默认使用 PERSISTENCE_CONFIG，未配置时按 CPU 核数），
+                1 表示顺序读取
+            **kwargs: 传给 DataManager 的合并写入参数（group_commit、max_pending 等）
+        """
+        self.shard_dir = shard_dir or default_shard_dir()
+        self.load_workers = (load_workers or PERSISTENCE_CONFIG["load_workers"]
+                             or min(4, os.cpu_count() or 1))
+        # 各分片上次读取/写入时的修订号，以及当时各学生的基本信息
+        self._shard_revisions: Dict[str, Optional[str]] = {}
+        self._saved_meta: Dict[str, tuple] = {}
+        # 各学生上次读取/写入时的记录版本号（User.records_version），据此发现记录数不变的修改
+        self._saved_versions: Dict[str, Optional[int]] = {}
+        self.shard_writes = 0
+        super().__init__(os.path.join(self.shard_dir, INDEX_FILE), **kwargs)
+
+    def _shard_path(self, user_id: str) -> str:
+        return os.path.join(self.shard_dir, SHARDS_DIR, f'{user_id}.json')
+
+    @staticmethod
+    def _read_json(path: str) -> Optional[Dict]:
+        """读取 JSON 文件（安装了 orjson 时用它解析），不存在时返回 None"""
+        try:
+            return json_codec.load_file(path)
+        except FileNotFoundError:
+            return None
+
+    def _write_json(self, path: str, data: Dict):
+        """先写临时文件再替换，写入中途出错不会损坏原文件"""
+        temp_file = f'{path}.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+                self.fsync_count += 1
+        os.replace(temp_file, path)
+        self.shard_writes += 1
+
+    def _read_shard(self, entry: Dict) -> Dict:
+        """读取一名学生的分片（可在工作线程中调用）；分片缺失或损坏时只保留索引中的基本信息"""
+        try:
+            data = self._read_json(self._shard_path(entry["id"]))
+        except ValueError as e:
+            logger.error('分片文件损坏: %s (%s)', entry["id"], e)
+            data = None
+        if data is None:
+            logger.warning('学生 %s 的分片缺失，成绩记录为空', entry.get("name"))
+            data = dict(entry, records=[])
+        return data
+
+    def _load_shard(self, entry: Dict) -> User:
+        data = self._read_shard(entry)
+        self._shard_revisions[entry["id"]] = data.get("revision")
+        return User.from_dict(data)
+
+    def _load_shards(self, entries: List[Dict],
+                     progress: Optional[Callable[[int, int], None]] = None) -> List[User]:
+        """用线程池并行读取并解析分片，按索引顺序返回用户对象
+
+        文件读取期间释放 GIL，多个线程可以重叠磁盘等待（冷缓存、网络盘时收益明显），
+        解析仍受 GIL 限制；用户对象在调用线程中创建，每批 load_chunk 个报告一次进度
+        """
+        total = len(entries)
+        workers = min(self.load_workers, total)
+        if progress is not None:
+            progress(0, total)
+        if workers <= 1:
+            shards = map(self._read_shard, entries)
+            executor = None
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shard-loader')
+            shards = executor.map(self._read_shard, entries)
+
+        chunk = PERSISTENCE_CONFIG["load_chunk"]
+        users = []
+        try:
+            for entry, data in zip(entries, shards):
+                self._shard_revisions[entry["id"]] = data.get("revision")
+                users.append(User.from_dict(data))
+                if progress is not None and (len(users) % chunk == 0 or len(users) == total):
+                    progress(len(users), total)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return users
+
+    def _remember(self, user: User):
+        self._baseline[user.id] = len(user.records)
+        self._saved_meta[user.id] = (user.name, user.gender, user.student_id)
+        self._saved_versions[user.id] = user.records_version
+
+    def _records_changed(self, view: _UserView) -> bool:
+        """学生的记录是否有增删改：内存用户按记录版本号判断（替换记录、先删后增时记录数不变），
+        快照中的用户字典按记录数判断"""
+        if view.version is not None:
+            return view.version != self._saved_versions.get(view.id)
+        return len(view.records) != self._baseline[view.id]
+
+    @timed('load_data')
+    def load_data(self, progress: Optional[Callable[[int, int], None]] = None):
+        """读取索引和全部分片（先写入尚未保存的修改）
+
+        Args:
+            progress: 进度回调 progress(已加载学生数, 学生总数)
+        """
+        logger.info('开始加载分片数据: %s', self.shard_dir)
+        with self._lock:
+            if not self._flush_before_reload():
+                return
+
+            try:
+                index = self._read_json(self.data_file)
+            except ValueError as e:
+                logger.error('索引文件解析错误: %s', e, exc_info=True)
+                annotate(status='error')
+                index = {"users": []}
+            self._shard_revisions = {}
+            self._baseline = {}
+            self._saved_meta = {}
+            self._saved_versions = {}
+            if index is None:
+                logger.info('分片目录不存在，创建新索引')
+                self.users = []
+                self.save_data()
+                return
+
+            self.version = index.get("version", 0)
+            self.revision = index.get("revision")
+            with json_codec.paused_gc():
+                self.users = self._load_shards(index.get("users", []), progress)
+            for user in self.users:
+                self._remember(user)
+            logger.info('成功加载 %s 个用户数据（分片）', len(self.users))
+            annotate(users=len(self.users),
+                     records=sum(len(user.records) for user in self.users),
+                     shards=len(self.users))
+
+    def _merge_index(self, disk: Dict, views: Dict[str, _UserView], deleted: set) -> List[Dict]:
+        """合并其他写入者对索引的修改（增删学生），同步内存并返回合并后的索引条目"""
+        entries = []
+        disk_ids = set()
+        remote_users = []
+        for entry in disk.get("users", []):
+            user_id = entry["id"]
+            disk_ids.add(user_id)
+            if user_id in deleted:
+                continue
+            view = views.get(user_id)
+            if view is not None:
+                entries.append(view.index_entry())
+            elif user_id not in self._baseline:
+                # 其他写入者新增的学生
+                entries.append(entry)
+                remote_users.append(entry)
+
+        removed = []
+        for user_id, view in views.items():
+            if user_id in disk_ids:
+                continue
+            if user_id in self._baseline and len(view.records) <= self._baseline[user_id]:
+                # 其他写入者已删除且本地没有新增记录
+                removed.append(user_id)
+                continue
+            entries.append(view.index_entry())
+
+        for entry in remote_users:
+            user = self._load_shard(entry)
+            self.users.append(user)
+            self._remember(user)
+        for user_id in removed:
+            views.pop(user_id)
+            user = self.find_user_by_id(user_id)
+            if user is not None:
+                self.users.remove(user)
+            self._baseline.pop(user_id, None)
+            self._saved_meta.pop(user_id, None)
+            self._saved_versions.pop(user_id, None)
+            self._shard_revisions.pop(user_id, None)
+
+        self.merge_count += 1
+        logger.info('检测到其他写入者修改了索引，已合并: 新增 %s 名学生，删除 %s 名学生',
+                    len(remote_users), len(removed))
+        return entries
+
+    def _save_shard(self, view: _UserView):
+        """写入一名学生的分片；分片已被其他写入者修改时先合并记录"""
+        path = self._shard_path(view.id)
+        data = view.to_dict()
+        if os.path.exists(path):
+            disk = self._read_json(path)
+            if disk.get("revision") != self._shard_revisions.get(view.id):
+                local_new = data["records"][self._baseline.get(view.id, 0):]
+                data["records"] = disk.get("records", []) + local_new
+                # 记录已变化，统计在加载时重新计算
+                data.pop("stats", None)
+                user = view.user or self.find_user_by_id(view.id)
+                if user is not None:
+                    user.records[:len(view.records)] = data["records"]
+                    user.mark_records_changed()
+                self.merge_count += 1
+                logger.info('学生 %s 的分片已被其他写入者修改，已合并记录', data["name"])
+
+        data["revision"] = uuid.uuid4().hex
+        self._write_json(path, data)
+        self._shard_revisions[view.id] = data["revision"]
+        self._baseline[view.id] = len(data["records"])
+        self._saved_meta[view.id] = view.meta
+        # 快照可能早于内存中的最新修改，不记录版本号，下次按内存数据保存时再写一次
+        self._saved_versions[view.id] = view.user.records_version if view.user is not None else None
+
+    @timed('save_data')
+    def save_data(self, snapshot: Optional[Dict] = None):
+        """只写入发生变化的学生分片，学生增删或基本信息变化时再写入索引
+
+        Args:
+            snapshot: 由 snapshot() 生成的数据快照，默认保存当前数据
+        """
+        try:
+            os.makedirs(os.path.join(self.shard_dir, SHARDS_DIR), exist_ok=True)
+
+            with self._lock, FileLock(self.lock_file):
+                if snapshot is not None:
+                    views = {data["id"]: _UserView(data=data) for data in snapshot["users"]}
+                else:
+                    views = {user.id: _UserView(user=user) for user in self.users}
+                deleted = set(self._baseline) - set(views)
+                index_changed = bool(deleted) or not os.path.exists(self.data_file)
+
+                changed = []
+                for user_id, view in views.items():
+                    if user_id not in self._baseline or self._saved_meta.get(user_id) != view.meta:
+                        index_changed = True
+                        changed.append(view)
+                    elif self._records_changed(view):
+                        changed.append(view)
+
+                entries = None
+                disk = self._read_json(self.data_file) if os.path.exists(self.data_file) else None
+                if disk is not None and disk.get("revision") != self.revision:
+                    entries = self._merge_index(disk, views, deleted)
+                    self.version = disk.get("version", 0)
+                    self.revision = disk.get("revision")
+                    changed = [view for view in changed if view.id in views]
+                elif index_changed:
+                    entries = [view.index_entry() for view in views.values()]
+
+                # 先写分片再写索引，索引不会指向不存在的分片
+                for view in changed:
+                    self._save_shard(view)
+
+                if index_changed:
+                    version = self.version + 1
+                    revision = uuid.uuid4().hex
+                    self._write_json(self.data_file, {"format": "sharded", "version": version,
+                                                      "revision": revision, "users": entries})
+                    self.version = version
+                    self.revision = revision
+
+                for user_id in deleted:
+                    try:
+                        os.remove(self._shard_path(user_id))
+                    except FileNotFoundError:
+                        pass
+                    self._baseline.pop(user_id, None)
+                    self._saved_meta.pop(user_id, None)
+                    self._saved_versions.pop(user_id, None)
+                    self._shard_revisions.pop(user_id, None)
+                self.save_count += 1
+
+            annotate(users=len(views), shards=len(changed), index=index_changed)
+            logger.info('成功保存 %s 个分片%s', len(changed), '和索引' if index_changed else '')
+        except IOError as e:
+            logger.error('文件IO错误: %s', e, exc_info=True)
+            raise
+        except Exception as e:
+            logger.error('保存分片数据失败: %s', e, exc_info=True)
+            raise
+
+
+def _copy_users(source: DataManager, target: DataManager, overwrite: bool) -> int:
+    if target.users and not overwrite:
+        raise ValueError(f'目标位置已有 {len(target.users)} 名学生的数据')
+    target.users = list(source.users)
+    target.save_data()
+    return len(target.users)
+
+
+def migrate_to_sharded(data_file: str, shard_dir: str, overwrite: bool = False) -> int:
+    """把单文件格式的数据迁移为分片格式，返回迁移的学生数（原文件保持不变）"""
+    if not os.path.exists(data_file):
+        raise FileNotFoundError(data_file)
+    count = _copy_users(DataManager(data_file), ShardedDataManager(shard_dir), overwrite)
+    logger.info('已迁移 %s 名学生到分片目录: %s', count, shard_dir)
+    return count
+
+
+def migrate_to_single(shard_dir: str, data_file: str, overwrite: bool = False) -> int:
+    """把分片格式的数据合并为单文件格式，返回迁移的学生数（分片目录保持不变）"""
+    if not os.path.exists(os.path.join(shard_dir, INDEX_FILE)):
+        raise FileNotFoundError(os.path.join(shard_dir, INDEX_FILE))
+    count = _copy_users(ShardedDataManager(shard_dir), DataManager(data_file), overwrite)
+    logger.info('已迁移 %s 名学生到数据文件: %s', count, data_file)
+    return count
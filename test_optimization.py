@@ -6,6 +6,8 @@
 
 import sys
 import os
+import tempfile
+from datetime import datetime, timedelta
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -35,6 +37,1045 @@ def test_logger():
     print("📁 日志文件位置请查看控制台输出或logs目录\n")
 
 
+def test_logger_queue_drop_policy():
+    """测试日志队列满时的丢弃策略"""
+    import logging
+    import queue
+    from utils.logger import DroppingQueueHandler
+    
+    log_queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+    
+    def make_record(level, msg):
+        return logging.LogRecord('test', level, __file__, 0, msg, None, None)
+    
+    handler.handle(make_record(logging.INFO, 'info-1'))
+    handler.handle(make_record(logging.INFO, 'info-2'))
+    handler.handle(make_record(logging.DEBUG, 'debug-dropped'))
+    handler.handle(make_record(logging.ERROR, 'error-kept'))
+    
+    messages = [log_queue.get_nowait().getMessage() for _ in range(log_queue.qsize())]
+    assert messages == ['info-2', 'error-kept']
+    assert handler.dropped_count == 2
+    print(f"✅ 队列满时丢弃 {handler.dropped_count} 条，保留: {messages}")
+
+
+def test_operation_metrics():
+    """测试操作耗时指标的记录与汇总"""
+    from utils import metrics
+    
+    recorded = []
+    original_metric = logger.metric
+    logger.metric = lambda operation, **fields: recorded.append(dict(fields, operation=operation))
+    try:
+        @metrics.timed('sample_op')
+        def sample_op(count):
+            metrics.annotate(records=count, bytes=count * 10)
+            return count
+        
+        for count in range(1, 101):
+            sample_op(count)
+        
+        # 自行捕获异常的操作失败时也应记为 error
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            corrupt_file = os.path.join(tmp_dir, 'corrupt.json')
+            with open(corrupt_file, 'w', encoding='utf-8') as f:
+                f.write('{"users": [')
+            DataManager(corrupt_file)
+            exported = DataExporter().export_to_csv([{}], 'x', output_dir=corrupt_file)
+    finally:
+        logger.metric = original_metric
+    
+    failures = recorded[100:]
+    recorded = recorded[:100]
+    assert len(recorded) == 100
+    assert recorded[0]['records'] == 1 and recorded[0]['status'] == 'ok'
+    assert exported is None
+    assert [(f['operation'], f['status']) for f in failures] == [
+        ('load_data', 'error'), ('export_to_csv', 'error')]
+    assert metrics.summarize(failures)['load_data']['errors'] == 1
+    
+    # 构造已知分布验证分位数
+    entries = [{'operation': 'op', 'duration_ms': float(i)} for i in range(1, 101)]
+    summary = metrics.summarize(entries + recorded)
+    assert summary['op']['count'] == 100
+    assert abs(summary['op']['p50'] - 50.5) < 1e-9
+    assert abs(summary['op']['p99'] - 99.01) < 1e-9
+    assert summary['sample_op']['records'] == sum(range(1, 101))
+    print(metrics.format_report(summary))
+
+
+def test_profiler_hooks():
+    """测试剖析模式的回调计时与结果输出"""
+    from utils import profiler
+    
+    @profiler.profile_callback('sample.callback')
+    def callback():
+        return sum(range(1000))
+    
+    was_enabled = profiler.is_enabled()
+    profiler.reset_stats()
+    profiler.enable()
+    try:
+        for _ in range(3):
+            callback()
+        with profiler.measure('sample.block'):
+            sum(range(1000))
+        
+        stats = profiler.get_callback_stats()
+        assert stats['sample.callback']['count'] == 3
+        assert stats['sample.block']['count'] == 1
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prefix = profiler.dump_results(None, output_dir=tmp_dir)
+            assert os.path.exists(f'{prefix}_callbacks.json')
+        
+        # 关闭后不再记录
+        profiler.disable()
+        callback()
+        assert profiler.get_callback_stats()['sample.callback']['count'] == 3
+    finally:
+        if was_enabled:
+            profiler.enable()
+        else:
+            profiler.disable()
+        profiler.reset_stats()
+    assert profiler.get_callback_stats() == {}
+    print(f"✅ 回调耗时统计: {stats['sample.callback']}")
+
+
+def test_records_version():
+    """测试记录版本号：记录增加、替换或整体替换后都会变化（报告标签页缓存以此为键）"""
+    from models.user import User
+
+    user = User("版本", "male")
+    other = User("版本", "male")
+    assert user.records_version != other.records_version
+    versions = [user.records_version]
+    records = _make_varied_records(3)
+    user.add_record(records[0])
+    versions.append(user.records_version)
+    # 日期和总分不变、只改了项目成绩的记录也视为变化
+    edited = dict(records[0], required={"1000m": 199})
+    user.replace_record(0, edited)
+    versions.append(user.records_version)
+    user.records = records[1:]
+    versions.append(user.records_version)
+    assert len(set(versions)) == len(versions)
+    print(f"✅ 记录版本号: {versions}")
+
+
+def test_chart_batch_render():
+    """测试批量渲染图表（进程池 + Agg 后端）"""
+    try:
+        from utils.chart_generator import render_charts_batch
+    except ImportError:
+        print("⚠️  未安装matplotlib，跳过")
+        return
+    from models.user import User
+
+    users = []
+    for i in range(3):
+        user = User(f"学生/{i}", "male")
+        for day in range(1, 4):
+            scores = {"required": 8.0, "category1": 7.5, "category2": 6.0 + day}
+            scores["total"] = sum(scores.values())
+            user.add_record({"date": f"2025-10-0{day}", "required": {"1000m": 230},
+                             "category1": {"50m": 7.5}, "category2": {"basketball": 10.0},
+                             "scores": scores, "total_score": scores["total"]})
+        users.append(user)
+    users.append(User("无记录", "female"))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result = render_charts_batch(users, tmp_dir, max_workers=2, dpi=40)
+        assert result["users"] == 3
+        assert result["charts"] == 6 and not result["failed"]
+        assert all(os.path.dirname(p) == tmp_dir and os.path.exists(p) for p in result["paths"])
+    print(f"✅ 批量渲染 {result['charts']} 张图表，{result['charts_per_second']:.1f} 张/秒")
+
+
+def test_lttb_downsampling():
+    """测试 LTTB 降采样与刻度抽稀"""
+    from utils.downsample import lttb_indices, thin_ticks
+
+    ys = [20.0] * 1000
+    ys[437] = 29.5  # 单个峰值
+    indices = lttb_indices(range(1000), ys, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert indices == sorted(set(indices))
+    assert 437 in indices
+    assert lttb_indices(range(10), ys[:10], 50) == list(range(10))
+
+    assert thin_ticks(5, 12) == [0, 1, 2, 3, 4]
+    ticks = thin_ticks(1000, 12)
+    assert len(ticks) == 12 and ticks[0] == 0 and ticks[-1] == 999
+    print(f"✅ 1000 点降采样为 {len(indices)} 点，刻度: {ticks}")
+
+
+def _legacy_analyze_all_data(records):
+    """原 AnalysisTab.analyze_all_data 的分析逻辑（作为对照）"""
+    import statistics
+    best_record = max(records, key=lambda x: x["scores"]["total"])
+    worst_record = min(records, key=lambda x: x["scores"]["total"])
+    total_scores = [r["scores"]["total"] for r in records]
+
+    projects_data = {}
+    all_projects = set()
+    for record in records:
+        for category in ["required", "category1", "category2"]:
+            all_projects.add(list(record[category].keys())[0])
+
+    for project_key in all_projects:
+        project_scores = []
+        project_performances = []
+        for record in records:
+            for category in ["required", "category1", "category2"]:
+                if project_key in record[category]:
+                    project_scores.append(record["scores"][category])
+                    project_performances.append(record[category][project_key])
+        projects_data[project_key] = {
+            "avg_score": statistics.mean(project_scores),
+            "best_score": max(project_scores),
+            "worst_score": min(project_scores),
+            "best_performance": max(project_performances),
+            "worst_performance": min(project_performances),
+            "trend": "improving" if len(project_scores) >= 2 and project_scores[-1] > project_scores[0] else "declining" if len(project_scores) >= 2 and project_scores[-1] < project_scores[0] else "stable"
+        }
+
+    return {
+        "total_records": len(records),
+        "avg_score": statistics.mean(total_scores),
+        "highest_score": max(total_scores),
+        "lowest_score": min(total_scores),
+        "best_record": best_record,
+        "worst_record": worst_record,
+        "projects": projects_data
+    }
+
+
+def _make_varied_records(count, seed=0):
+    """生成项目各不相同的模拟成绩记录"""
+    import random
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        scores = {c: rng.choice([6.0, 7.5, 8.0, 9.5, 10.0]) for c in ("required", "category1", "category2")}
+        scores["total"] = sum(scores.values())
+        records.append({
+            "date": f"2025-{i % 12 + 1:02d}-01",
+            "required": {rng.choice(["1000m", "800m"]): rng.randint(200, 300)},
+            "category1": {rng.choice(["50m", "sit_reach", "pull_ups"]): round(rng.uniform(5, 20), 1)},
+            "category2": {rng.choice(["basketball", "football", "volleyball"]): round(rng.uniform(8, 40), 1)},
+            "scores": scores,
+            "total_score": scores["total"],
+        })
+    return records
+
+
+def _assert_analysis_equal(actual, expected):
+    """比较分析结果（平均分允许浮点误差）"""
+    assert actual.keys() == expected.keys()
+    for key in expected:
+        if key == "projects":
+            assert actual[key].keys() == expected[key].keys()
+            for project_key, data in expected[key].items():
+                for field, value in data.items():
+                    if field == "avg_score":
+                        assert abs(actual[key][project_key][field] - value) < 1e-9
+                    else:
+                        assert actual[key][project_key][field] == value, (project_key, field)
+        elif key == "avg_score":
+            assert abs(actual[key] - expected[key]) < 1e-9
+        else:
+            assert actual[key] is expected[key] or actual[key] == expected[key], key
+
+
+def test_analytics_engine_parity():
+    """测试分析引擎与原分析逻辑结果一致（含增量追加）"""
+    from services.analytics_engine import AnalyticsEngine, analyze_records
+    from models.user import User
+
+    records = _make_varied_records(300)
+    _assert_analysis_equal(analyze_records(records), _legacy_analyze_all_data(records))
+    assert analyze_records([]) is None
+
+    # 逐条追加与每次全量分析一致
+    engine = AnalyticsEngine()
+    for count in range(1, 41):
+        assert engine.sync(records[:count]) == (count > 1)
+        _assert_analysis_equal(engine.result(), _legacy_analyze_all_data(records[:count]))
+
+    # 引擎只引用记录列表，不复制
+    assert engine.sync(records) is True
+    assert engine.records is records and engine.count == len(records)
+
+    # 记录被替换（如重新加载了其他数据）时全量重算
+    assert engine.sync(records[100:120]) is False
+    _assert_analysis_equal(engine.result(), _legacy_analyze_all_data(records[100:120]))
+
+    # 末条以外的记录被替换：记录数和末条记录都不变，按版本号发现并重算
+    user = User("测试", "male")
+    for record in records[:20]:
+        user.add_record(record)
+    engine = AnalyticsEngine()
+    engine.sync(user.records, version=user.records_version)
+    best = dict(records[0], scores=dict(records[0]["scores"], total=30.5))
+    user.replace_record(0, best)
+    assert engine.sync(user.records, version=user.records_version) is False
+    assert engine.result()["highest_score"] == 30.5
+    _assert_analysis_equal(engine.result(), _legacy_analyze_all_data(user.records))
+    print(f"✅ 分析结果一致，共 {len(engine.result()['projects'])} 个项目")
+
+
+def test_user_running_stats():
+    """测试用户累计统计的增量维护与持久化"""
+    import json
+    import statistics
+    from models.user import User
+    from services.analytics_engine import analyze_records
+
+    records = _make_varied_records(200, seed=1)
+    totals = [r["scores"]["total"] for r in records]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        data_manager = DataManager(data_file)
+        user = User("统计测试", "male")
+        data_manager.add_user(user)
+        for record in records:
+            assert data_manager.add_score_record(user.id, record)
+
+        stats = user.get_stats()
+        assert stats.count == 200
+        assert stats.min_total == min(totals) and stats.max_total == max(totals)
+        assert abs(stats.average - statistics.mean(totals)) < 1e-9
+        assert abs(stats.variance - statistics.variance(totals)) < 1e-9
+
+        # 统计随用户一起保存，重新加载后直接使用
+        reloaded = DataManager(data_file).find_user_by_id(user.id)
+        assert reloaded.stats.count == 200
+        assert reloaded.stats.to_dict() == stats.to_dict()
+        loaded_stats = reloaded.stats
+        _assert_analysis_equal(analyze_records(reloaded.records, reloaded.get_stats()),
+                               _legacy_analyze_all_data(records))
+        assert reloaded.get_stats() is loaded_stats
+
+        # 替换记录后记录数不变，统计仍按新记录重新计算
+        best = dict(records[0], scores=dict(records[0]["scores"], total=30.5))
+        reloaded.replace_record(0, best)
+        assert reloaded.get_stats() is not loaded_stats
+        assert reloaded.get_stats().count == 200 and reloaded.get_stats().max_total == 30.5
+
+        # 旧数据文件没有统计时按记录重新计算
+        with open(data_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        del data["users"][0]["stats"]
+        legacy_user = User.from_dict(data["users"][0])
+        assert legacy_user.get_stats().to_dict() == stats.to_dict()
+    print(f"✅ 累计统计: 平均 {stats.average:.2f}，标准差 {stats.stdev:.2f}")
+
+
+def test_cohort_percentiles():
+    """测试群体百分位排名与增量刷新"""
+    from models.user import User
+    from services.cohort_service import CohortService
+
+    records = _make_varied_records(400, seed=2)
+    users = []
+    for i in range(40):
+        user = User(f"学生{i}", "male" if i % 2 else "female")
+        for record in records[i * 5:i * 5 + 5]:
+            user.add_record(record)
+        users.append(user)
+
+    service = CohortService(users)
+    male_totals = sorted(u.records[-1]["scores"]["total"] for u in users if u.gender == "male")
+    assert service.cohort_size("male", "total") == len(male_totals)
+    score = male_totals[7]
+    expected = (sum(t < score for t in male_totals) + sum(t == score for t in male_totals) / 2) / len(male_totals) * 100
+    assert abs(service.percentile("male", "total", score) - expected) < 1e-9
+    assert service.percentile("female", "unknown", 20.0) is None
+
+    # 新增记录后增量刷新，结果与重新构建一致
+    for i, user in enumerate(users):
+        for record in records[200 + i * 5:200 + i * 5 + (i % 3)]:
+            user.add_record(record)
+    assert service.refresh(users) == sum(1 for i in range(40) if i % 3)
+    rebuilt = CohortService(users)
+    assert service._arrays == rebuilt._arrays
+    assert service.user_percentiles(users[3]) == rebuilt.user_percentiles(users[3])
+
+    # 替换、删除记录（记录数不变或减少）后只更新该学生，结果与重新构建一致
+    latest = users[4].records[-1]
+    users[4].replace_record(-1, dict(latest, scores=dict(latest["scores"], total=30.0)))
+    users[5].records = users[5].records[:-1]
+    assert service.refresh(users) == 2
+    rebuilt = CohortService(users)
+    assert service._arrays == rebuilt._arrays
+    assert service.user_percentiles(users[4])["total"] == rebuilt.user_percentiles(users[4])["total"]
+
+    # 删除用户后移除其得分
+    assert service.refresh(users[1:]) == 0
+    assert service.cohort_size("female", "total") == 19
+    assert service._arrays == CohortService(users[1:])._arrays
+    print(f"✅ 学生3百分位: { {k: round(v, 1) for k, v in service.user_percentiles(users[3]).items()} }")
+
+
+def test_leaderboard():
+    """测试排行榜前K名/后K名与全量排序结果一致"""
+    from models.user import User
+    from services.leaderboard_service import LeaderboardService, grade_of
+
+    records = _make_varied_records(600, seed=3)
+    users = []
+    for i in range(60):
+        user = User(f"学生{i}", "male" if i % 2 else "female")
+        for record in records[i * 10:i * 10 + 10]:
+            user.add_record(record)
+        users.append(user)
+    service = LeaderboardService(users)
+
+    def brute_force(project, gender=None, start_date=None, end_date=None, grade=None):
+        sign = -1 if project in ("1000m", "800m", "50m", "basketball", "football") else 1
+        best = []
+        for user in users:
+            if gender and user.gender != gender:
+                continue
+            keys = []
+            for record in user.records:
+                if (start_date and record["date"] < start_date) or (end_date and record["date"] > end_date):
+                    continue
+                if grade and grade_of(record["scores"]["total"]) != grade:
+                    continue
+                if project == "total":
+                    keys.append((record["scores"]["total"], 0))
+                for category in ("required", "category1", "category2"):
+                    if project in record[category]:
+                        keys.append((record["scores"][category], sign * record[category][project]))
+            if keys:
+                best.append((max(keys), user.id))
+        best.sort(key=lambda item: item[0], reverse=True)
+        return best
+
+    cases = [
+        ("total", {}),
+        ("50m", {"gender": "male"}),
+        ("volleyball", {"start_date": "2025-03-01", "end_date": "2025-08-01"}),
+        ("total", {"grade": "good", "gender": "female"}),
+    ]
+    for project, filters in cases:
+        expected = brute_force(project, **filters)
+        top = service.top(project, 5, **filters)
+        assert [e["rank"] for e in top] == list(range(1, len(top) + 1))
+        assert [(e["score"], e["user_id"]) for e in top] == [(key[0], uid) for key, uid in expected[:5]]
+        bottom = service.bottom(project, 5, **filters)
+        assert [e["score"] for e in bottom] == [key[0] for key, _ in expected[::-1][:5]]
+        if filters.get("gender"):
+            assert all(e["gender"] == filters["gender"] for e in top + bottom)
+
+    # K 超过参与人数时返回全部
+    assert len(service.top("total", 1000)) == len(users)
+    assert service.top("unknown") == []
+    print(f"✅ 总分第一: {service.top('total', 1)[0]['name']}")
+
+
+def test_cli_commands():
+    """测试命令行导入、评分、统计、备份与恢复，且不加载图形界面模块"""
+    import contextlib
+    import io
+    import json
+    import subprocess
+    import sys
+    import cli
+    from services.data_manager import DataManager
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        csv_file = os.path.join(tmp_dir, "scores.csv")
+        with open(csv_file, "w", encoding="utf-8") as f:
+            f.write("姓名,性别,日期,必选项目,必选成绩,第一类选考项目,第一类成绩,第二类选考项目,第二类成绩\n"
+                    "张三,男,2025-09-01,1000m,\"3'45\"\"\",50m,7.6,篮球运球,12.5\n"
+                    "张三,男,2025-10-01,1000米跑,3:40,立定跳远,240,basketball,11.8\n"
+                    "李四,女,2025-10-01,800m,3:30,仰卧起坐,45,排球垫球,35\n"
+                    "王五,男,2025-10-01,1000m,3:30,50m,abc,足球运球,9\n")
+
+        def run(*argv):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(io.StringIO()):
+                code = cli.main(["--data", data_file, *argv])
+            return code, output.getvalue()
+
+        # 有错误行时默认不保存
+        assert run("import", csv_file)[0] == 1
+        assert DataManager(data_file).users == []
+        assert run("import", csv_file, "--skip-errors")[0] == 0
+        users = {u.name: u for u in DataManager(data_file).users}
+        assert sorted(users) == ["张三", "李四"]
+        assert users["张三"].records[0]["required"] == {"1000m": 225}
+        assert users["李四"].records[0]["category2"] == {"volleyball": 35.0}
+
+        code, output = run("score", "--gender", "male", "--required", "1000m=3:50",
+                           "--category1", "50m=7.5", "--category2", "basketball=12", "--json")
+        assert code == 0 and json.loads(output)["scores"]["required"] == 9.0
+        assert run("score", "--required", "1000m=3:40", "--category1", "50m=7.5",
+                   "--category2", "basketball=12")[0] == 2
+
+        code, output = run("stats", "--json")
+        assert {row["name"]: row["records"] for row in json.loads(output)} == {"张三": 2, "李四": 1}
+
+        backup_dir = os.path.join(tmp_dir, "backups")
+        assert run("backup", "--backup-dir", backup_dir)[0] == 0
+        assert run("score", "--user", "李四", "--required", "800m=3:20", "--category1", "sit_ups=50",
+                   "--category2", "volleyball=40", "--save")[0] == 0
+        assert len(DataManager(data_file).find_user_by_name("李四").records) == 2
+        assert run("restore", "latest", "--backup-dir", backup_dir)[0] == 0
+        assert len(DataManager(data_file).find_user_by_name("李四").records) == 1
+
+    # 命令行入口不导入 tkinter / matplotlib
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, cli; print(sorted({'tkinter', 'matplotlib'} & set(sys.modules)))"],
+        cwd=root_dir, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1]
+    assert loaded == "[]"
+    print("✅ 命令行导入/评分/统计/备份/恢复正常")
+
+
+def test_api_server():
+    """测试HTTP接口：录入、查询、错误处理，以及并发提交合并写入"""
+    import asyncio
+    from services.api_server import ApiServer, ApiClient
+
+    record_body = {"date": "2025-10-01", "required": {"1000m": "3:50"},
+                   "category1": {"50m": 7.5}, "category2": {"篮球运球": "12"}}
+
+    async def scenario(data_manager):
+        server = ApiServer(data_manager, "127.0.0.1", 0)
+        host, port = await server.start()
+        client = ApiClient(host, port)
+        try:
+            status, user = await client.request("POST", "/api/users", {"name": "张三", "gender": "男"})
+            assert status == 201 and user["gender"] == "male"
+            assert (await client.request("POST", "/api/users", {"name": "张三", "gender": "male"}))[0] == 409
+            assert (await client.request("POST", "/api/users", {"name": "李四"}))[0] == 400
+            assert (await client.request("GET", "/api/users/unknown"))[0] == 404
+            assert (await client.request("DELETE", "/api/users"))[0] == 405
+
+            status, record = await client.request("POST", "/api/score", dict(record_body, gender="male"))
+            assert status == 200 and record["scores"]["required"] == 9.0
+
+            # 40 个客户端并发录入，提交合并为少量写入
+            clients = [ApiClient(host, port) for _ in range(40)]
+            path = f"/api/users/{user['id']}/records"
+            results = await asyncio.gather(*(c.request("POST", path, record_body) for c in clients))
+            for c in clients:
+                await c.close()
+            assert all(status == 201 for status, _ in results)
+            assert server.persistence.commits == 41
+            assert server.persistence.saves < 41
+
+            status, report = await client.request("GET", f"/api/users/{user['id']}/report")
+            assert status == 200 and report["analysis"]["total_records"] == 40
+            assert report["percentiles"]["total"] == 50.0
+            status, board = await client.request("GET", "/api/leaderboard?k=3")
+            assert status == 200 and board["top"][0]["name"] == "张三"
+            bad = dict(record_body, category1={"football": 9})
+            assert (await client.request("POST", path, bad))[0] == 400
+
+            # Content-Length 不是非负整数时回复 400 并关闭连接
+            for length in ("abc", "-5"):
+                reader, writer = await asyncio.open_connection(host, port)
+                writer.write(f"POST /api/users HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+                await writer.drain()
+                response = await reader.read()
+                writer.close()
+                assert response.startswith(b"HTTP/1.1 400 "), response
+            return server.persistence.saves
+        finally:
+            await client.close()
+            await server.close()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        saves = asyncio.run(scenario(DataManager(data_file)))
+        reloaded = DataManager(data_file)
+        assert len(reloaded.users) == 1 and len(reloaded.users[0].records) == 40
+    print(f"✅ 41 次提交合并为 {saves} 次写入")
+
+
+def test_group_commit():
+    """测试合并写入：按条数、时间窗口和 flush() 写入，重新加载前先写入未保存的修改"""
+    import time
+    from models.user import User
+
+    record = _make_varied_records(1)[0]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        manager = DataManager(data_file, group_commit=True, max_pending=5, max_delay_ms=60000)
+        base_saves = manager.save_count
+        manager.add_user(User("张三", "male"))
+        user_id = manager.users[0].id
+        for _ in range(11):
+            manager.add_score_record(user_id, record)
+        # 12 次修改：第 5、10 次时写入，剩余 2 次待写入
+        assert manager.save_count - base_saves == 2 and manager.pending == 2
+        assert len(DataManager(data_file).users[0].records) == 9
+        assert manager.flush() and not manager.flush()
+        assert len(DataManager(data_file).users[0].records) == 11
+        assert manager.fsync_count == manager.save_count
+
+        # 时间窗口到期后由后台定时器写入
+        timed_manager = DataManager(data_file, group_commit=True, max_pending=100, max_delay_ms=50)
+        timed_manager.add_score_record(user_id, record)
+        deadline = time.time() + 5
+        while timed_manager.pending and time.time() < deadline:
+            time.sleep(0.02)
+        assert timed_manager.pending == 0
+        assert len(DataManager(data_file).users[0].records) == 12
+
+        # 定时写入失败后，之后的修改仍会重新计时写入
+        original_save = timed_manager.save_data
+        def failing_save(snapshot=None):
+            raise OSError("磁盘已满")
+        timed_manager.save_data = failing_save
+        timed_manager.add_score_record(user_id, record)
+        deadline = time.time() + 5
+        while timed_manager._flush_timer is not None and time.time() < deadline:
+            time.sleep(0.02)
+        assert timed_manager.pending == 1 and timed_manager._flush_timer is None
+        timed_manager.save_data = original_save
+        timed_manager.add_score_record(user_id, record)
+        deadline = time.time() + 5
+        while timed_manager.pending and time.time() < deadline:
+            time.sleep(0.02)
+        assert timed_manager.pending == 0
+        assert len(DataManager(data_file).users[0].records) == 14
+
+        # 未开启时每次修改立即写入
+        immediate = DataManager(data_file, group_commit=False)
+        saves = immediate.save_count
+        immediate.add_score_record(user_id, record)
+        assert immediate.save_count == saves + 1 and immediate.pending == 0
+
+        manager.load_data()
+        manager.add_score_record(user_id, record)
+        manager.load_data()
+        # 重新加载（如打开报告窗口）不会丢失尚在合并窗口内的成绩
+        assert manager.pending == 0 and len(manager.users[0].records) == 16
+        assert len(DataManager(data_file).users[0].records) == 16
+        assert not os.path.exists(data_file + ".tmp")
+
+        # 写入期间（持有锁）的修改要等写入完成，不会与后台定时写入同时遍历用户数据
+        import threading
+        with manager._lock:
+            worker = threading.Thread(target=manager.add_score_record, args=(user_id, record))
+            worker.start()
+            worker.join(0.2)
+            assert worker.is_alive() and len(manager.users[0].records) == 16
+        worker.join()
+        assert len(manager.users[0].records) == 17 and manager.flush()
+
+        # 重新加载期间（读取到替换用户数据）的修改要等替换完成，不会写到被替换掉的旧对象上
+        adders = []
+        def progress(done, total):
+            if not adders:
+                adder = threading.Thread(target=manager.add_score_record, args=(user_id, record))
+                adder.start()
+                adder.join(0.2)
+                adders.append((adder, adder.is_alive()))
+        manager.load_data(progress=progress)
+        adder, blocked = adders[0]
+        adder.join()
+        assert blocked
+        assert len(manager.users[0].records) == 18 and manager.flush()
+    print("✅ 合并写入按条数/时间窗口/flush 正常")
+
+
+def _concurrent_writer(data_file, worker, count, shared_id):
+    """并发写入测试的子进程：新增一名学生，并交替为自己和共享学生添加成绩"""
+    from models.user import User
+    manager = DataManager(data_file, fsync=False)
+    user = User(f"进程{worker}", "male")
+    manager.add_user(user)
+    record = _make_varied_records(1, seed=worker)[0]
+    for i in range(count):
+        target = shared_id if i % 2 else user.id
+        manager.add_score_record(target, dict(record, note=f"{worker}-{i}"))
+
+
+def test_concurrent_writers():
+    """测试多个写入者同时保存时合并新增的学生和记录，不丢失数据"""
+    import multiprocessing
+    from models.user import User
+
+    record = _make_varied_records(1)[0]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        first = DataManager(data_file)
+        first.add_user(User("共享", "female"))
+        first.add_user(User("待删除", "male"))
+        shared_id = first.users[0].id
+
+        # 两个实例交替修改：各自新增记录和学生，其中一个删除学生
+        second = DataManager(data_file)
+        first.add_score_record(shared_id, dict(record, note="a"))
+        second.add_score_record(shared_id, dict(record, note="b"))
+        second.add_user(User("新同学", "male"))
+        first.delete_user(second.find_user_by_name("待删除").id)
+        assert second.merge_count == 1 and first.merge_count == 1
+        assert [r["note"] for r in first.find_user_by_id(shared_id).records] == ["a", "b"]
+        assert first.find_user_by_name("新同学") is not None
+        reloaded = DataManager(data_file)
+        assert sorted(u.name for u in reloaded.users) == ["共享", "新同学"]
+        assert [r["note"] for r in reloaded.users[0].records] == ["a", "b"]
+        assert reloaded.users[0].get_stats().count == 2
+
+        # 一个实例修改基本信息、另一个实例录入成绩，先后顺序不同时都不丢失修改
+        for rename_first in (False, True):
+            meta_file = os.path.join(tmp_dir, f"meta_{rename_first}.json")
+            student = User("改名前", "male")
+            DataManager(meta_file).add_user(student)
+            editor, recorder = DataManager(meta_file), DataManager(meta_file)
+            renamed = User.from_dict(student.to_dict())
+            renamed.name, renamed.student_id = "改名后", "S001"
+            if rename_first:
+                assert editor.update_user(renamed)
+                assert recorder.add_score_record(student.id, dict(record, note="c"))
+                # 录入成绩的实例同步了其他写入者修改的基本信息
+                assert recorder.users[0].name == "改名后"
+            else:
+                assert recorder.add_score_record(student.id, dict(record, note="c"))
+                assert editor.update_user(renamed)
+            merged = DataManager(meta_file).users[0]
+            assert (merged.name, merged.student_id) == ("改名后", "S001")
+            assert [r["note"] for r in merged.records] == ["c"]
+
+        # 多进程压力测试
+        workers, count = 4, 30
+        context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+        processes = [context.Process(target=_concurrent_writer, args=(data_file, w, count, shared_id))
+                     for w in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(120)
+            assert process.exitcode == 0
+
+        final = DataManager(data_file)
+        notes = [r.get("note") for user in final.users for r in user.records]
+        expected = {f"{w}-{i}" for w in range(workers) for i in range(count)} | {"a", "b"}
+        assert len(notes) == len(expected) and set(notes) == expected
+        assert sorted(u.name for u in final.users) == sorted(
+            ["共享", "新同学"] + [f"进程{w}" for w in range(workers)])
+        assert len(final.find_user_by_id(shared_id).records) == 2 + workers * count // 2
+    print(f"✅ {workers} 个进程并发写入 {workers * count} 条记录，无丢失")
+
+
+def test_sharded_storage():
+    """测试分片存储只重写受影响的分片、合并并发修改，并与单文件格式互相迁移"""
+    from models.user import User
+    from services.sharded_data_manager import (
+        ShardedDataManager, migrate_to_sharded, migrate_to_single, INDEX_FILE, SHARDS_DIR
+    )
+
+    record = _make_varied_records(1)[0]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        shard_dir = os.path.join(tmp_dir, "users")
+        manager = ShardedDataManager(shard_dir, fsync=False)
+        for name in ("甲", "乙", "丙"):
+            manager.add_user(User(name, "male"))
+        target = manager.find_user_by_name("乙")
+
+        # 录入成绩只写该学生的分片，不写索引
+        index_path = os.path.join(shard_dir, INDEX_FILE)
+        index_mtime = os.stat(index_path).st_mtime_ns
+        writes = manager.shard_writes
+        manager.add_score_record(target.id, dict(record, note="a"))
+        assert manager.shard_writes == writes + 1
+        assert os.stat(index_path).st_mtime_ns == index_mtime
+
+        # 替换记录（记录数不变）也会写入该学生的分片
+        target.replace_record(0, dict(record, note="a", edited=True))
+        manager.update_user(target)
+        assert manager.shard_writes == writes + 2
+        assert ShardedDataManager(shard_dir).find_user_by_id(target.id).records[0].get("edited")
+        manager.update_user(target)
+        assert manager.shard_writes == writes + 2
+
+        # 两个实例同时修改同一学生和索引
+        other = ShardedDataManager(shard_dir, fsync=False)
+        manager.add_score_record(target.id, dict(record, note="b"))
+        other.add_score_record(target.id, dict(record, note="c"))
+        other.add_user(User("丁", "female"))
+        manager.delete_user(manager.find_user_by_name("甲").id)
+        assert [r["note"] for r in other.find_user_by_id(target.id).records] == ["a", "b", "c"]
+        assert manager.find_user_by_name("丁") is not None
+
+        reloaded = ShardedDataManager(shard_dir)
+        assert sorted(u.name for u in reloaded.users) == ["丁", "丙", "乙"]
+        assert [r["note"] for r in reloaded.find_user_by_id(target.id).records] == ["a", "b", "c"]
+        assert reloaded.find_user_by_id(target.id).get_stats().count == 3
+        assert len(os.listdir(os.path.join(shard_dir, SHARDS_DIR))) == 3
+
+        # 单文件 <-> 分片迁移
+        data_file = os.path.join(tmp_dir, "users.json")
+        assert migrate_to_single(shard_dir, data_file) == 3
+        single = DataManager(data_file)
+        assert sorted(u.name for u in single.users) == ["丁", "丙", "乙"]
+        try:
+            migrate_to_single(shard_dir, data_file)
+            assert False, "目标已有数据时应拒绝迁移"
+        except ValueError:
+            pass
+        second_dir = os.path.join(tmp_dir, "users2")
+        assert migrate_to_sharded(data_file, second_dir) == 3
+        migrated = ShardedDataManager(second_dir)
+        assert [r["note"] for r in migrated.find_user_by_id(target.id).records] == ["a", "b", "c"]
+    print("✅ 分片存储：单分片写入、并发合并与格式迁移正确")
+
+
+def test_parallel_load():
+    """测试线程池读取分片、进度回调，以及 orjson 与标准库解析结果一致"""
+    from models.user import User
+    from services.sharded_data_manager import ShardedDataManager
+    from utils import json_codec
+
+    records = _make_varied_records(3)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        manager = DataManager(data_file, fsync=False)
+        for i in range(25):
+            user = User(f"学生{i:02d}", "male")
+            user.records = list(records)
+            manager.users.append(user)
+        manager.save_data()
+        sharded = ShardedDataManager(os.path.join(tmp_dir, "users"), fsync=False)
+        sharded.users = manager.users
+        sharded.save_data()
+
+        fast_decoder = json_codec.orjson
+        try:
+            for decoder in {None, fast_decoder}:
+                json_codec.orjson = decoder
+                for loader in (DataManager(data_file),
+                               ShardedDataManager(sharded.shard_dir, load_workers=1),
+                               ShardedDataManager(sharded.shard_dir, load_workers=4)):
+                    updates = []
+                    loader.load_data(progress=lambda done, total: updates.append((done, total)))
+                    assert [u.name for u in loader.users] == [u.name for u in manager.users]
+                    assert loader.users[-1].records == records
+                    assert updates[0] == (0, 25) and updates[-1] == (25, 25)
+        finally:
+            json_codec.orjson = fast_decoder
+    print(f"✅ 并行加载与进度回调正确（解码器: {json_codec.DECODER}）")
+
+
+def test_deferred_load():
+    """测试延迟加载：创建时不读取文件，之后在后台线程中加载并报告进度"""
+    import threading
+    from models.user import User
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, "users.json")
+        manager = DataManager(data_file, fsync=False)
+        for i in range(3):
+            manager.add_user(User(f"学生{i}", "female"))
+
+        deferred = DataManager(data_file, autoload=False)
+        assert deferred.users == []
+        updates = []
+        loader = threading.Thread(target=deferred.load_data,
+                                  kwargs={"progress": lambda done, total: updates.append((done, total))})
+        loader.start()
+        loader.join(10)
+        assert [u.name for u in deferred.users] == ["学生0", "学生1", "学生2"]
+        assert updates[-1] == (3, 3)
+    print("✅ 延迟加载与后台加载进度正确")
+
+
+def test_inverse_scoring():
+    """测试目标得分反查成绩、缓存和提分代价排序"""
+    from services.score_calculator import ScoreCalculator
+    from config.scoring_standards import get_scoring_data
+
+    calculator = ScoreCalculator()
+    for gender in ("male", "female"):
+        for project in get_scoring_data(gender):
+            # 含百分位的目标得分按原值反查，不取整到 0.1 分
+            for hundredth in list(range(50, 1001, 50)) + list(range(55, 1000, 50)):
+                target = hundredth / 100
+                performance = calculator.required_performance(gender, project, target)
+                assert calculator.calculate_score(gender, project, performance) >= target, (project, target)
+            assert calculator.required_performance(gender, project, 10.5) is None
+    assert calculator.required_performance("male", "1000m", 8.0) == 240
+    assert calculator.required_performance("female", "800m", 10.0) == 205
+    assert calculator.required_performance("male", "50m", 8.0) == 7.7
+    cached = len(calculator._inverse_cache)
+    calculator.required_performance("male", "1000m", 8.0)
+    assert len(calculator._inverse_cache) == cached
+
+    rows = calculator.gradient_table("male", {"1000m": 245, "50m": 7.8, "pull_ups": 15})
+    assert [row["project"] for row in rows] == ["50m", "1000m", "pull_ups"]
+    assert rows[0]["target_score"] == 8.0 and rows[0]["target_performance"] == 7.7
+    assert rows[1]["points_per_unit"] == 0.1 and rows[1]["improvement"] == 5
+    assert rows[2]["cost"] is None
+
+    # 各标签页共用的成绩显示格式
+    from services.score_calculator import format_performance
+    assert format_performance("1000m", 245) == "4'5\""
+    assert format_performance("50m", 7.7) == "7.7秒" and format_performance("pull_ups", 15) == "15次"
+    print("✅ 成绩反查与提分代价排序正确")
+
+
+def test_elective_optimizer():
+    """测试选考项目最优组合，以及班级批量（向量化）结果与逐个计算一致"""
+    from models.user import User
+    from services import elective_optimizer
+    from services.elective_optimizer import ElectiveOptimizer
+
+    optimizer = ElectiveOptimizer()
+    result = optimizer.optimize("male", {"1000m": 240, "50m": 7.5, "pull_ups": 15,
+                                         "basketball": 12.4, "volleyball": 40, "sit_ups": 50})
+    assert [result["selection"][c]["project"] for c in ("required", "category1", "category2")] == \
+        ["1000m", "pull_ups", "volleyball"]
+    assert result["total"] == 28.0 and result["grade"] == "excellent" and result["complete"]
+    partial = optimizer.optimize("female", {"50m": 8.3})
+    assert partial["selection"]["required"] is None and not partial["complete"]
+    assert partial["total"] == 8.0
+    # 两档之间的总分归入较低一档
+    assert optimizer.optimize("male", {"1000m": 226, "pull_ups": 14, "basketball": 11.8})["grade"] == "good"
+    from config.constants import GRADE_STANDARDS
+    from services.leaderboard_service import grade_of
+    from services.record_builder import grade_name
+    for total, grade in ((14.8, "fail"), (15.0, "pass"), (17.8, "pass"), (23.8, "medium"),
+                         (26.8, "good"), (27.0, "excellent"), (30.0, "excellent")):
+        assert grade_of(total) == grade, total
+        assert grade_name(total) == optimizer.calculator.get_grade_level(total) == GRADE_STANDARDS[grade]["name"]
+
+    # 整列评分与逐个计算一致：每个（性别, 项目）的随机非整数成绩，含评分表中成绩值重复的位置
+    import random
+    rng = random.Random(7)
+    if elective_optimizer.np is not None:
+        for gender in ("male", "female"):
+            for project in (optimizer.calculator.male_scoring if gender == "male"
+                            else optimizer.calculator.female_scoring):
+                table = optimizer.calculator.get_score_table(gender, project)
+                low, high = table[0][0], table[-1][0]
+                margin = (high - low) * 0.05
+                values = [round(rng.uniform(low - margin, high + margin), 2) for _ in range(3000)]
+                values += [performance for performance, _ in table]
+                column = optimizer._score_column(gender, project, elective_optimizer.np.array(values))
+                for value, score in zip(values, column.tolist()):
+                    assert score == optimizer.calculator.calculate_score(gender, project, value), \
+                        (gender, project, value)
+        assert optimizer.calculator.calculate_score("female", "volleyball", 1.38) == \
+            optimizer._score_column("female", "volleyball", elective_optimizer.np.array([1.38]))[0]
+
+    users = []
+    for i in range(40):
+        user = User(f"学生{i:02d}", "male" if i % 2 else "female")
+        user.records = _make_varied_records(i % 5, seed=i)
+        users.append(user)
+    for mode in ("latest", "best"):
+        batch = {r["user_id"]: r for r in optimizer.optimize_class(users, mode)}
+        for user in users:
+            assert batch[user.id] == optimizer.optimize_user(user, mode), (user.name, mode)
+    ranked = optimizer.optimize_class(users)
+    assert [r["total"] for r in ranked] == sorted((r["total"] for r in ranked), reverse=True)
+    print("✅ 选考项目最优组合与班级批量计算正确")
+
+
+def test_forecast_engine():
+    """测试成绩趋势预测：回归/平滑外推、批量回归与逐条计算一致、按记录版本缓存"""
+    from datetime import date
+    from models.user import User
+    from services.forecast_engine import ForecastEngine, resolve_exam_date
+
+    assert resolve_exam_date("05-15", today=date(2026, 10, 19)) == date(2027, 5, 15)
+    assert resolve_exam_date("05-15", today=date(2026, 5, 15)) == date(2026, 5, 15)
+    assert resolve_exam_date("2026-06-01") == date(2026, 6, 1)
+
+    user = User("预测", "male")
+    for day, score in (("2026-01-01", 6.0), ("2026-01-31", 7.0), ("2026-03-02", 8.0)):
+        user.add_record({"date": day, "required": {"1000m": 240}, "category1": {"pull_ups": 10},
+                         "category2": {"basketball": 12.0},
+                         "scores": {"required": score, "category1": 8.0, "category2": 9.0,
+                                    "total": score + 17.0}})
+
+    engine = ForecastEngine(exam_date="2026-04-01", method="linear")
+    forecast = engine.forecast_user(user)
+    assert forecast["1000m"]["slope_per_30d"] == 1.0 and forecast["1000m"]["projected"] == 9.0
+    assert forecast["1000m"]["trend"] == "improving" and forecast["pull_ups"]["trend"] == "stable"
+    assert forecast["total"]["projected"] == 26.0 and forecast["1000m"]["days_to_exam"] == 30
+    # 外推结果不超过满分
+    assert ForecastEngine(exam_date="2027-01-01").forecast_user(user)["1000m"]["projected"] == 10.0
+    smoothed = ForecastEngine(exam_date="2026-04-01", method="smoothing").forecast_user(user)
+    assert smoothed["1000m"]["trend"] == "improving" and 8.0 < smoothed["1000m"]["projected"] <= 10.0
+
+    # 缓存：记录未变化时复用，新增或替换记录后重新计算
+    assert engine.forecast_user(user) is forecast and engine.cache_hits == 1
+    user.add_record({"date": "2026-03-05", "required": {"1000m": 260}, "category1": {"pull_ups": 10},
+                     "category2": {"basketball": 12.0},
+                     "scores": {"required": 5.0, "category1": 8.0, "category2": 9.0, "total": 22.0}})
+    assert engine.forecast_user(user)["1000m"]["points"] == 4 and engine.cache_misses == 2
+    # 记录数不变、只替换了记录也重新计算
+    user.replace_record(3, dict(user.records[3], scores=dict(user.records[3]["scores"], required=9.0)))
+    assert engine.forecast_user(user)["1000m"]["latest_score"] == 9.0 and engine.cache_misses == 3
+
+    # 批量回归与逐条计算一致
+    from services import forecast_engine
+    users = []
+    for i in range(30):
+        student = User(f"学生{i:02d}", "male" if i % 2 else "female")
+        student.records = _make_varied_records(i % 6, seed=i)
+        users.append(student)
+    batch = ForecastEngine(exam_date="2026-05-15").forecast_class(users)
+    numpy_module, forecast_engine.np = forecast_engine.np, None
+    try:
+        scalar = ForecastEngine(exam_date="2026-05-15").forecast_class(users)
+    finally:
+        forecast_engine.np = numpy_module
+    for student in users:
+        assert batch[student.id].keys() == scalar[student.id].keys()
+        for key, expected in scalar[student.id].items():
+            actual = batch[student.id][key]
+            assert abs(actual["slope_per_30d"] - expected["slope_per_30d"]) <= 0.001, (student.name, key)
+            assert abs(actual["projected"] - expected["projected"]) <= 0.1, (student.name, key)
+            assert [actual[k] for k in ("points", "latest_score", "days_to_exam")] == \
+                [expected[k] for k in ("points", "latest_score", "days_to_exam")]
+    print("✅ 成绩趋势预测与缓存正确")
+
+
+def test_chart_cache():
+    """测试图表缓存的摘要键、LRU淘汰和磁盘复用"""
+    from utils.chart_cache import ChartCache
+
+    records = [{"date": "2025-10-01", "scores": {"total": 20.0}}]
+    key = ChartCache.make_key(records, "trend", (9, 4, 100), "teal")
+    assert key == ChartCache.make_key([dict(records[0])], "trend", (9, 4, 100), "teal")
+    assert key != ChartCache.make_key(records, "trend", (12, 8, 300), "teal")
+    assert key != ChartCache.make_key(records, "distribution", (9, 4, 100), "teal")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = ChartCache(tmp_dir, memory_max_bytes=250, disk_max_bytes=250)
+        for name in ("a", "b", "c"):
+            cache.put(name, name.encode() * 100)
+        # 访问 b 后写入 d，最久未使用的 c 被淘汰
+        assert cache.get("a") is None
+        assert cache.get("b") == b"b" * 100
+        cache.put("d", b"d" * 100)
+        assert cache.get("c") is None
+        assert sorted(os.listdir(tmp_dir)) == ["b.png", "d.png"]
+
+        # 新实例（如程序重启后）从磁盘读取
+        renders = []
+        reopened = ChartCache(tmp_dir)
+        assert reopened.get_or_render("b", lambda: renders.append(1) or b"") == b"b" * 100
+        assert reopened.get_or_render("e", lambda: renders.append(1) or b"e") == b"e"
+        assert renders == [1]
+        print(f"✅ 缓存统计: {reopened.get_stats()}")
+
+
 def test_data_export():
     """测试数据导出功能"""
     print("=" * 50)
@@ -123,10 +1164,52 @@ def test_backup_manager():
     print()
 
 
+def test_backup_retention():
+    """测试分层备份保留策略"""
+    print("=" * 50)
+    print("测试4: 备份保留策略")
+    print("=" * 50)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = os.path.join(tmp_dir, 'users.json')
+        backup_dir = os.path.join(tmp_dir, 'backups')
+        backup_manager = BackupManager(data_file, backup_dir=backup_dir)
+        
+        # 模拟60天内每小时一个自动备份，外加一个手动备份
+        start = datetime(2025, 1, 1)
+        for hour in range(60 * 24):
+            stamp = (start + timedelta(hours=hour)).strftime('%Y%m%d_%H%M%S')
+            with open(os.path.join(backup_dir, f'backup_{stamp}.json'), 'w') as f:
+                f.write('{"users": []}')
+        with open(os.path.join(backup_dir, 'manual.json'), 'w') as f:
+            f.write('{"users": []}')
+        
+        policy = {"last": 2, "hourly": 6, "daily": 7, "weekly": 4, "monthly": 3}
+        report = backup_manager.apply_retention(policy, dry_run=True)
+        print(f"试运行: 保留 {len(report['keep'])} 个，清理 {len(report['prune'])} 个")
+        
+        # 试运行不删除文件
+        assert len(os.listdir(backup_dir)) == 60 * 24 + 1
+        
+        # 最新的6个小时各保留一个，且最新的一个同时满足所有层级
+        newest = report['keep'][0]
+        assert newest['name'] == 'backup_20250301_230000.json'
+        assert set(newest['tiers']) == {'last', 'hourly', 'daily', 'weekly', 'monthly'}
+        assert len(report['keep']) + len(report['prune']) == 60 * 24
+        assert all(b['name'].startswith('backup_') for b in report['prune'])
+        
+        backup_manager.apply_retention(policy)
+        remaining = set(os.listdir(backup_dir))
+        assert remaining == {b['name'] for b in report['keep']} | {'manual.json'}
+        print(f"✅ 清理后剩余 {len(remaining)} 个备份文件")
+    
+    print()
+
+
 def test_exception_handling():
     """测试异常处理"""
     print("=" * 50)
-    print("测试4: 异常处理")
+    print("测试5: 异常处理")
     print("=" * 50)
     
     data_manager = DataManager()
@@ -158,8 +1241,30 @@ def main():
     try:
         # 运行各项测试
         test_logger()
+        test_logger_queue_drop_policy()
+        test_operation_metrics()
+        test_profiler_hooks()
+        test_records_version()
+        test_chart_batch_render()
+        test_lttb_downsampling()
+        test_analytics_engine_parity()
+        test_user_running_stats()
+        test_cohort_percentiles()
+        test_leaderboard()
+        test_cli_commands()
+        test_api_server()
+        test_group_commit()
+        test_concurrent_writers()
+        test_sharded_storage()
+        test_parallel_load()
+        test_deferred_load()
+        test_inverse_scoring()
+        test_elective_optimizer()
+        test_forecast_engine()
+        test_chart_cache()
         test_data_export()
         test_backup_manager()
+        test_backup_retention()
         test_exception_handling()
         
         print("=" * 50)
@@ -12,6 +12,7 @@ from models.score import ScoreRecord
 from services.score_calculator import ScoreCalculator
 from services.data_manager import DataManager
 from utils.validator import DataValidator
+from utils import profiler
 from config.constants import (
     GENDER_MALE, GENDER_FEMALE, PROJECT_NAMES,
     INPUT_WINDOW_CONFIG, WINDOW_SIZES, WINDOW_TITLES,
@@ -23,11 +24,12 @@ from ui.custom_button import CustomButton
 class InputWindow:
     """成绩录入窗口类"""
     
-    def __init__(self, user: User, parent=None):
+    def __init__(self, user: User, parent=None, data_manager: Optional[DataManager] = None):
         self.user = user
         self.parent = parent
         self.score_calculator = ScoreCalculator()
-        self.data_manager = DataManager()
+        # 与主窗口共用数据管理器，避免重复读取数据文件
+        self.data_manager = data_manager or DataManager()
         self.on_save_success: Optional[Callable] = None
         
         self.setup_ui()
@@ -732,7 +734,10 @@ class InputWindow:
             }
             
             # 使用DataManager保存记录（会自动添加到用户对象并保存到文件）
-            if self.data_manager.add_score_record(self.user.id, record_data):
+            with profiler.measure('score.save'):
+                saved = self.data_manager.add_score_record(self.user.id, record_data)
+            
+            if saved:
                 messagebox.showinfo(UI_TEXTS["save_success"], f"成绩已保存！\n总分: {scores['total']:.1f}")
                 
                 if self.on_save_success:
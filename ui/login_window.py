@@ -20,9 +20,10 @@ from ui.custom_button import CustomButton
 class LoginWindow:
     """登录窗口类"""
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, data_manager: Optional[DataManager] = None):
         self.parent = parent
-        self.data_manager = DataManager()
+        # 与主窗口共用数据管理器，避免重复读取数据文件
+        self.data_manager = data_manager or DataManager()
         self.current_user: Optional[User] = None
         self.on_login_success: Optional[Callable] = None
         
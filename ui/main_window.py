@@ -7,16 +7,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
 import os
+import queue
+import threading
+import time
 from typing import Optional
 from models.user import User
 from ui.login_window import LoginWindow
 from ui.input_window import InputWindow
-from ui.report_window import ReportWindow
 from ui.custom_button import CustomButton
 from services.data_manager import DataManager
 from utils.data_exporter import DataExporter
 from utils.backup_manager import BackupManager
 from utils.logger import get_logger
+from utils import profiler
 from config.constants import (
     MAIN_WINDOW_CONFIG, WINDOW_SIZES, WINDOW_TITLES,
     BUTTON_TEXTS, LABEL_FRAME_TITLES, UI_TEXTS, DATA_FILE
@@ -42,15 +45,93 @@ class MainWindow:
     
     def __init__(self):
         logger.info('初始化主窗口')
-        self.data_manager = DataManager()
+        self._started_at = time.perf_counter()
+        # 合并写入：连续录入多名学生成绩时不必每次都重写整个数据文件，退出时写入剩余修改
+        # 数据在窗口显示后由后台线程加载
+        self.data_manager = DataManager(group_commit=True, autoload=False)
         self.data_exporter = DataExporter()
         self.backup_manager = BackupManager(DATA_FILE)
         self.current_user: Optional[User] = None
         self.report_window_instance = None  # 追踪报告窗口实例
+        # 后台加载线程发给界面线程的消息，以及数据加载完成事件
+        self._load_queue: queue.Queue = queue.Queue()
+        self.data_ready = threading.Event()
         
         self.setup_ui()
-        self.load_last_user()  # 启动时自动加载上次登录的用户
-        self.backup_manager.auto_backup()  # 自动备份
+        self.start_loading()
+    
+    def start_loading(self):
+        """在后台线程加载数据并执行自动备份，期间显示加载进度、禁用依赖数据的按钮
+        
+        加载完成后再恢复上次登录的用户；Tk 不是线程安全的，后台线程只向队列发送消息，
+        由界面线程定时取出处理
+        """
+        self.login_button.config(state=tk.DISABLED)
+        self.backup_button.config(state=tk.DISABLED)
+        self.status_var.set(UI_TEXTS["loading"])
+        self.loading_bar.pack(fill=tk.X, pady=(8, 0))
+        self.window.after_idle(self._on_first_paint)
+        
+        threading.Thread(target=self._load_in_background, name='data-loader', daemon=True).start()
+        self.window.after(MAIN_WINDOW_CONFIG["loading_poll_ms"], self._poll_loading)
+    
+    def _on_first_paint(self):
+        logger.info('主窗口首次绘制: %.1f ms', (time.perf_counter() - self._started_at) * 1000)
+    
+    def _load_in_background(self):
+        """后台线程：加载数据，随后执行自动备份"""
+        try:
+            self.data_manager.load_data(
+                progress=lambda done, total: self._load_queue.put(("progress", done, total)))
+        except Exception as e:
+            logger.error('后台加载数据失败: %s', e, exc_info=True)
+            self._load_queue.put(("failed", str(e)))
+            return
+        self._load_queue.put(("loaded",))
+        
+        try:
+            self.backup_manager.auto_backup()
+        except Exception as e:
+            logger.error('自动备份失败: %s', e, exc_info=True)
+        self._load_queue.put(("backup_done",))
+    
+    def _poll_loading(self):
+        """界面线程：处理后台加载线程的消息"""
+        finished = False
+        while True:
+            try:
+                message = self._load_queue.get_nowait()
+            except queue.Empty:
+                break
+            kind = message[0]
+            if kind == "progress":
+                _, done, total = message
+                self.loading_bar.config(maximum=max(total, 1), value=done)
+                self.status_var.set(UI_TEXTS["loading_progress"].format(done, total))
+            elif kind == "loaded":
+                self.on_data_loaded()
+            elif kind == "failed":
+                self.loading_bar.pack_forget()
+                self.status_var.set(UI_TEXTS["loading_failed"])
+                # 仍可从备份恢复数据
+                self.backup_button.config(state=tk.NORMAL)
+                messagebox.showerror("错误", f"加载数据时发生错误:\n{message[1]}")
+                finished = True
+            elif kind == "backup_done":
+                self.backup_button.config(state=tk.NORMAL)
+                finished = True
+        
+        if not finished:
+            self.window.after(MAIN_WINDOW_CONFIG["loading_poll_ms"], self._poll_loading)
+    
+    def on_data_loaded(self):
+        """数据加载完成：隐藏进度条，启用登录并恢复上次登录的用户"""
+        self.loading_bar.pack_forget()
+        self.login_button.config(state=tk.NORMAL)
+        self.data_ready.set()
+        logger.info('数据加载完成: %.1f ms，%s 名学生',
+                    (time.perf_counter() - self._started_at) * 1000, len(self.data_manager.users))
+        self.load_last_user()  # 自动加载上次登录的用户
     
     def setup_ui(self):
         """设置用户界面"""
@@ -163,6 +244,9 @@ class MainWindow:
                                font=MAIN_WINDOW_CONFIG["status_font"],
                                bg=MAIN_WINDOW_CONFIG["bg_color"], fg=MAIN_WINDOW_CONFIG["label_hint_color"])
         status_label.pack(pady=(20, 0))
+        
+        # 后台加载数据时显示的进度条（加载完成后隐藏）
+        self.loading_bar = ttk.Progressbar(main_frame, mode='determinate')
     
     def center_window(self):
         """窗口居中显示"""
@@ -175,7 +259,7 @@ class MainWindow:
     
     def show_login_window(self):
         """显示登录窗口"""
-        login_window = LoginWindow(self.window)
+        login_window = LoginWindow(self.window, self.data_manager)
         login_window.set_login_callback(self.on_login_success)
         login_window.show()
     
@@ -225,14 +309,16 @@ class MainWindow:
             messagebox.showerror(UI_TEXTS["input_error"], UI_TEXTS["please_login"])
             return
         
-        input_window = InputWindow(self.current_user, self.window)
+        input_window = InputWindow(self.current_user, self.window, self.data_manager)
         input_window.set_save_callback(self.on_score_saved)
         input_window.show()
     
     def on_score_saved(self, record_data):
         """成绩保存成功回调"""
-        # 重新加载用户数据以获取最新记录
-        self.reload_current_user()
+        # 录入窗口与主窗口共用数据管理器，新记录已在内存中，无需重新读取文件
+        updated_user = self.data_manager.find_user_by_id(self.current_user.id)
+        if updated_user:
+            self.current_user = updated_user
         
         # 更新用户信息显示
         self.update_ui_after_login()
@@ -245,6 +331,7 @@ class MainWindow:
         if messagebox.askyesno(UI_TEXTS["save_success"], UI_TEXTS["view_report_prompt"].format(total_score)):
             self.show_report_window()
     
+    @profiler.profile_callback('report.open')
     def show_report_window(self):
         """显示成绩报告窗口"""
         if not self.current_user:
@@ -272,8 +359,9 @@ class MainWindow:
                 # 窗口已销毁，清除引用
                 self.report_window_instance = None
         
-        # 创建新的报告窗口
-        self.report_window_instance = ReportWindow(self.current_user, self.window)
+        # 创建新的报告窗口（延迟导入，启动时不加载报告和图表相关模块）
+        from ui.report_window import ReportWindow
+        self.report_window_instance = ReportWindow(self.current_user, self.window, self.data_manager)
         
         # 绑定窗口关闭事件，清除引用
         def on_close():
@@ -327,7 +415,7 @@ class MainWindow:
             messagebox.showwarning("警告", "暂无成绩记录可导出")
             return
         
-        logger.info(f'用户 {self.current_user.name} 准备导出数据')
+        logger.info('用户 %s 准备导出数据', self.current_user.name)
         
         # 创建菜单窗口
         menu_window = tk.Toplevel(self.window)
@@ -378,7 +466,7 @@ class MainWindow:
             if not output_dir:
                 return
             
-            logger.info(f'导出{format_type.upper()}到: {output_dir}')
+            logger.info('导出%s到: %s', format_type.upper(), output_dir)
             
             # 执行导出
             if format_type == 'csv':
@@ -394,7 +482,7 @@ class MainWindow:
                 messagebox.showerror("导出失败", "导出数据时发生错误")
                 
         except Exception as e:
-            logger.error(f'导出数据失败: {e}', exc_info=True)
+            logger.error('导出数据失败: %s', e, exc_info=True)
             messagebox.showerror("导出失败", f"导出数据时发生错误:\n{str(e)}")
     
     def show_backup_menu(self):
@@ -496,6 +584,7 @@ class MainWindow:
     def create_new_backup(self, backup_window):
         """创建新备份"""
         try:
+            self.data_manager.flush()
             backup_path = self.backup_manager.create_backup()
             if backup_path:
                 messagebox.showinfo("成功", f"备份创建成功!\n{os.path.basename(backup_path)}")
@@ -504,7 +593,7 @@ class MainWindow:
             else:
                 messagebox.showerror("失败", "创建备份失败")
         except Exception as e:
-            logger.error(f'创建备份失败: {e}', exc_info=True)
+            logger.error('创建备份失败: %s', e, exc_info=True)
             messagebox.showerror("错误", f"创建备份时发生错误:\n{str(e)}")
     
     def refresh_backup_list(self, backup_window):
@@ -527,10 +616,10 @@ class MainWindow:
                     backup['formatted_time']
                 ), tags=(backup['path'],))
             
-            logger.debug(f'刷新备份列表，共 {len(backups)} 个备份')
+            logger.debug('刷新备份列表，共 %s 个备份', len(backups))
             
         except Exception as e:
-            logger.error(f'刷新备份列表失败: {e}', exc_info=True)
+            logger.error('刷新备份列表失败: %s', e, exc_info=True)
     
     def restore_selected_backup(self, backup_window):
         """恢复选中的备份"""
@@ -551,9 +640,10 @@ class MainWindow:
                                       "恢复备份将覆盖当前数据!\n当前数据会自动备份到'pre_restore_backup'\n\n确定要继续吗?"):
                 return
             
-            logger.info(f'恢复备份: {backup_path}')
+            logger.info('恢复备份: %s', backup_path)
             
-            # 执行恢复
+            # 执行恢复（先写入未保存的修改，使恢复前的安全备份包含最新数据）
+            self.data_manager.flush()
             if self.backup_manager.restore_backup(backup_path):
                 messagebox.showinfo("成功", "备份恢复成功!\n请重新登录以查看恢复的数据")
                 self.status_var.set("✅ 备份已恢复")
@@ -568,7 +658,7 @@ class MainWindow:
                 messagebox.showerror("失败", "恢复备份失败")
                 
         except Exception as e:
-            logger.error(f'恢复备份失败: {e}', exc_info=True)
+            logger.error('恢复备份失败: %s', e, exc_info=True)
             messagebox.showerror("错误", f"恢复备份时发生错误:\n{str(e)}")
     
     def delete_selected_backup(self, backup_window):
@@ -590,7 +680,7 @@ class MainWindow:
             if not messagebox.askyesno("确认删除", f"确定要删除备份吗?\n{backup_name}"):
                 return
             
-            logger.info(f'删除备份: {backup_path}')
+            logger.info('删除备份: %s', backup_path)
             
             # 执行删除
             if self.backup_manager.delete_backup(backup_path):
@@ -601,7 +691,7 @@ class MainWindow:
                 messagebox.showerror("失败", "删除备份失败")
                 
         except Exception as e:
-            logger.error(f'删除备份失败: {e}', exc_info=True)
+            logger.error('删除备份失败: %s', e, exc_info=True)
             messagebox.showerror("错误", f"删除备份时发生错误:\n{str(e)}")
     
 
@@ -611,8 +701,15 @@ class MainWindow:
             # 退出时保存当前用户（如果已登录）
             if self.current_user:
                 self.save_last_user(self.current_user.id)
+            logger.info('退出应用程序')
+            self.data_manager.flush()
             self.window.destroy()
+            # 写出日志队列中剩余的日志
+            logger.shutdown()
     
     def run(self):
-        """运行主窗口"""
-        self.window.mainloop()
+        """运行主窗口（剖析模式下在 cProfile 中运行主循环）"""
+        if profiler.is_enabled():
+            profiler.run_profiled(self.window.mainloop)
+        else:
+            self.window.mainloop()
@@ -8,9 +8,9 @@ from tkinter import ttk
 from typing import Optional
 from models.user import User
 from services.score_calculator import ScoreCalculator
-from utils.chart_generator import ChartGenerator
 from config.constants import THEME_COLORS, FONTS, REPORT_WINDOW_SIZE
-from ui.tabs import CurrentScoreTab, AnalysisTab, TrendTab, SuggestionsTab
+from ui import tabs
+from utils import profiler
 
 
 class ReportWindow:
@@ -21,17 +21,27 @@ class ReportWindow:
     THEME_BG = THEME_COLORS["bg"]
     THEME_COLORS = THEME_COLORS  # 新增：保存完整的颜色配置供样式使用
     
-    def __init__(self, user: User, parent=None):
+    def __init__(self, user: User, parent=None, data_manager=None):
         self.user = user
         self.parent = parent
+        # 数据管理器（排行榜需要全部学生数据，未提供时只显示当前学生）
+        self.data_manager = data_manager
         self.score_calculator = ScoreCalculator()
-        self.chart_generator = ChartGenerator()
+        self._chart_generator = None
         
-        # 标签页实例
+        # 标签页实例（首次选中时才创建）
         self.current_score_tab = None
         self.analysis_tab = None
         self.trend_tab = None
         self.suggestions_tab = None
+        self.leaderboard_tab = None
+        
+        # 标签页按需渲染：{标签页容器: (容器, 属性名, 标签页类, 渲染方法, 是否展示全班数据)}
+        self.notebook = None
+        self._tab_specs = {}
+        # 各标签页上次渲染时的数据版本，版本一致时切换回来无需重新渲染
+        self._rendered_versions = {}
+        self._data_version = None
         
         self.setup_ui()
         self.load_user_data()
@@ -110,19 +120,30 @@ class ReportWindow:
         # 创建 Notebook
         notebook = ttk.Notebook(content_frame, style='Report.TNotebook')
         notebook.pack(fill=tk.BOTH, expand=True)
-        
-        # 初始化各标签页
-        self.current_score_tab = CurrentScoreTab(notebook, self.user, self.score_calculator)
-        notebook.add(self.current_score_tab.frame, text="📈 当前成绩")
-        
-        self.analysis_tab = AnalysisTab(notebook, self.user, self.score_calculator)
-        notebook.add(self.analysis_tab.frame, text="📊 数据分析")
-        
-        self.trend_tab = TrendTab(notebook, self.user, self.score_calculator)
-        notebook.add(self.trend_tab.frame, text="📉 历史趋势")
-        
-        self.suggestions_tab = SuggestionsTab(notebook, self.user, self.score_calculator)
-        notebook.add(self.suggestions_tab.frame, text="💡 训练建议")
+        self.notebook = notebook
+        
+        # 各标签页先放置空容器，首次选中时再导入并创建控件
+        tab_definitions = [
+            ("current_score_tab", "CurrentScoreTab", self._render_current_score_tab, "📈 当前成绩", False),
+            ("analysis_tab", "AnalysisTab", self._render_analysis_tab, "📊 数据分析", False),
+            ("trend_tab", "TrendTab", self._render_trend_tab, "📉 历史趋势", False),
+            ("suggestions_tab", "SuggestionsTab", self._render_suggestions_tab, "💡 训练建议", False),
+            ("leaderboard_tab", "LeaderboardTab", self._render_leaderboard_tab, "🏆 班级排行", True),
+        ]
+        for attr_name, class_name, render, text, class_wide in tab_definitions:
+            container = tk.Frame(notebook, bg=self.THEME_BG)
+            notebook.add(container, text=text)
+            self._tab_specs[str(container)] = (container, attr_name, class_name, render, class_wide)
+        
+        notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+    
+    @property
+    def chart_generator(self):
+        """图表生成器（首次使用时才导入matplotlib）"""
+        if self._chart_generator is None:
+            from utils.chart_generator import ChartGenerator
+            self._chart_generator = ChartGenerator()
+        return self._chart_generator
     
     def center_window(self):
         """窗口居中显示"""
@@ -133,44 +154,81 @@ class ReportWindow:
         y = (self.window.winfo_screenheight() // 2) - (height // 2)
         self.window.geometry(f"{width}x{height}+{x}+{y}")
     
+    @profiler.profile_callback('report.load_data')
     def load_user_data(self):
-        """加载用户数据"""
-        records = self.user.get_all_records()
-        
-        if not records:
-            self.show_no_data_message()
+        """加载用户数据（只渲染当前可见的标签页，其余标签页在选中时渲染）"""
+        self._data_version = (self.user.id, self.user.records_version)
+        self._render_selected_tab()
+    
+    def _on_tab_changed(self, event=None):
+        """切换标签页时按需渲染"""
+        self._render_selected_tab()
+    
+    def _class_users(self):
+        """参与排名的全部学生（未提供数据管理器时只有当前学生）"""
+        return self.data_manager.users if self.data_manager else [self.user]
+    
+    def _class_version(self):
+        """全班数据版本：任一学生的记录或姓名、性别变化时改变"""
+        return tuple((user.id, user.name, user.gender, user.records_version)
+                     for user in self._class_users())
+    
+    def _render_selected_tab(self):
+        """渲染当前选中的标签页（数据版本未变化时跳过）"""
+        selected = self.notebook.select()
+        if not selected or selected not in self._tab_specs:
             return
         
-        # 分析数据
-        self.analysis_tab.analyze_all_data(records)
-        
-        # 显示最新成绩
-        latest_record = records[-1]
-        self.current_score_tab.display_current_score(latest_record)
-        
-        # 显示数据分析
-        self.analysis_tab.display_analysis()
+        container, attr_name, class_name, render, class_wide = self._tab_specs[selected]
+        # 展示全班数据的标签页按全班数据版本判断，同学的新成绩也会触发重新渲染
+        version = self._class_version() if class_wide else self._data_version
+        if self._rendered_versions.get(selected) == version:
+            return
         
-        # 显示历史记录
-        self.trend_tab.display_history_records(records)
+        tab = getattr(self, attr_name)
+        if tab is None:
+            tab_class = getattr(tabs, class_name)
+            tab = tab_class(container, self.user, self.score_calculator)
+            tab.frame.pack(fill=tk.BOTH, expand=True)
+            setattr(self, attr_name, tab)
         
-        # 渲染趋势图表
-        self.trend_tab.render_chart_in_window()
+        tab.user = self.user
+        records = self.user.get_all_records()
+        if records or class_wide:
+            render(tab, records)
+        elif hasattr(tab, "show_no_data"):
+            tab.show_no_data()
         
-        # 生成训练建议
-        self.suggestions_tab.display_suggestions(latest_record)
+        self._rendered_versions[selected] = version
+    
+    def _render_current_score_tab(self, tab, records):
+        """显示最新成绩"""
+        tab.display_current_score(records[-1])
+    
+    def _render_analysis_tab(self, tab, records):
+        """分析并显示数据"""
+        tab.analyze_all_data(records)
+        tab.display_analysis()
+    
+    def _render_trend_tab(self, tab, records):
+        """显示历史记录并渲染趋势图表"""
+        tab.display_history_records(records)
+        tab.render_chart_in_window()
+    
+    def _render_suggestions_tab(self, tab, records):
+        """生成训练建议"""
+        tab.display_suggestions(records[-1])
     
-    def show_no_data_message(self):
-        """显示无数据消息"""
-        self.current_score_tab.show_no_data()
-        self.analysis_tab.show_no_data()
+    def _render_leaderboard_tab(self, tab, records):
+        """显示班级排行榜"""
+        tab.set_users(self._class_users())
     
     def refresh_data(self, updated_user: User = None):
         """刷新数据 - 使用最新的用户数据更新报告"""
         if updated_user:
             self.user = updated_user
         
-        # 重新加载所有数据
+        # 重新计算数据版本，只重新渲染当前可见的标签页
         self.load_user_data()
     
     def show(self):
@@ -1,11 +1,28 @@
 # -*- coding: utf-8 -*-
 """
 报告窗口标签页模块
+历史趋势标签页依赖matplotlib，首次访问时才导入
 """
 
+import importlib
+
 from .current_score_tab import CurrentScoreTab
 from .analysis_tab import AnalysisTab
-from .trend_tab import TrendTab
 from .suggestions_tab import SuggestionsTab
+from .leaderboard_tab import LeaderboardTab
+
+__all__ = ['CurrentScoreTab', 'AnalysisTab', 'TrendTab', 'SuggestionsTab', 'LeaderboardTab']
+
+# 延迟导入的标签页: {类名: 模块名}
+_LAZY_TABS = {
+    'TrendTab': '.trend_tab',
+}
+
 
-__all__ = ['CurrentScoreTab', 'AnalysisTab', 'TrendTab', 'SuggestionsTab']
+def __getattr__(name):
+    if name in _LAZY_TABS:
+        module = importlib.import_module(_LAZY_TABS[name], __name__)
+        tab_class = getattr(module, name)
+        globals()[name] = tab_class
+        return tab_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
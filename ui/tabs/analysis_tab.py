@@ -6,8 +6,10 @@
 import tkinter as tk
 from tkinter import ttk
 from typing import Dict, Optional
-import statistics
 from config.constants import PROJECT_NAMES, THEME_COLORS, FONTS
+from services.analytics_engine import AnalyticsEngine
+from services.score_calculator import format_performance
+from services.forecast_engine import ForecastEngine, TOTAL_SERIES
 
 
 class AnalysisTab:
@@ -31,6 +33,10 @@ class AnalysisTab:
         self.user = user
         self.score_calculator = score_calculator
         self.analysis_data = None
+        self.analysis_engine = AnalyticsEngine()
+        # 按测试日期回归得出的趋势和考试日预计得分 {项目或 "total": 预测结果}
+        self.forecast_engine = ForecastEngine()
+        self.forecasts = {}
         self.setup_ui()
     
     def create_card_frame(self, parent, title, title_color=None):
@@ -220,6 +226,8 @@ class AnalysisTab:
                 bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT, width=15, anchor="w").pack(side=tk.LEFT)
         tk.Label(header_frame, text="趋势", font=FONTS["text_small"], 
                 bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT, width=10, anchor="e").pack(side=tk.RIGHT)
+        tk.Label(header_frame, text="考试预计", font=FONTS["text_small"], 
+                bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT, width=10, anchor="e").pack(side=tk.RIGHT)
         tk.Label(header_frame, text="最佳", font=FONTS["text_small"], 
                 bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT, width=15, anchor="e").pack(side=tk.RIGHT)
         tk.Label(header_frame, text="平均分", font=FONTS["text_small"], 
@@ -240,11 +248,13 @@ class AnalysisTab:
             tk.Label(project_frame, text=project_name, font=FONTS["text_normal"],
                     bg=bg_color, fg=self.THEME_TEXT_DARK, width=15, anchor="w").pack(side=tk.LEFT)
             
-            # 趋势
-            if data['trend'] == 'improving':
+            # 趋势：有日期回归结果时按每30天的得分变化判定，否则沿用首末两次比较
+            forecast = self.forecasts.get(project_key)
+            trend = forecast['trend'] if forecast else data['trend']
+            if trend == 'improving':
                 improvement_text = "📈 上升"
                 color = self.THEME_SUCCESS
-            elif data['trend'] == 'declining':
+            elif trend == 'declining':
                 improvement_text = "📉 下降"
                 color = self.THEME_DANGER
             else:
@@ -254,8 +264,13 @@ class AnalysisTab:
             tk.Label(project_frame, text=improvement_text, font=FONTS["text_small"],
                     bg=bg_color, fg=color, width=10, anchor="e").pack(side=tk.RIGHT)
             
+            # 考试日预计得分
+            projected_text = f"{forecast['projected']:.1f}" if forecast else "--"
+            tk.Label(project_frame, text=projected_text, font=FONTS["text_small"],
+                    bg=bg_color, fg=self.THEME_TEXT_DARK, width=10, anchor="e").pack(side=tk.RIGHT)
+            
             # 最佳成绩
-            best_perf = self.format_performance(project_key, data['best_performance'])
+            best_perf = format_performance(project_key, data['best_performance'])
             tk.Label(project_frame, text=f"{best_perf}", 
                     font=FONTS["text_small"],
                     bg=bg_color, fg=self.THEME_TEXT_LIGHT, width=15, anchor="e").pack(side=tk.RIGHT)
@@ -264,78 +279,33 @@ class AnalysisTab:
             tk.Label(project_frame, text=f"{data['avg_score']:.1f}", 
                     font=FONTS["score_detail"],
                     bg=bg_color, fg=self.THEME_PRIMARY, width=10, anchor="e").pack(side=tk.RIGHT)
-    
-    def format_performance(self, project_key: str, performance_value: float) -> str:
-        """格式化成绩显示"""
-        if project_key in ["1000m", "800m", "50m", "basketball", "football"]:
-            if project_key in ["1000m", "800m"]:
-                minutes = int(performance_value // 60)
-                seconds = int(performance_value % 60)
-                return f"{minutes}'{seconds}\""
-            elif project_key == "50m":
-                return f"{performance_value:.1f}秒"
-            else:
-                return f"{performance_value:.1f}秒"
-        elif project_key in ["sit_reach", "standing_jump"]:
-            return f"{performance_value:.1f}厘米"
-        else:
-            return f"{int(performance_value)}次"
-    
+        
+        total = self.forecasts.get(TOTAL_SERIES)
+        if total:
+            exam_date = self.forecast_engine.exam_date
+            tk.Label(self.projects_analysis_frame,
+                    text=f"按当前趋势，{exam_date.month}月{exam_date.day}日考试预计总分 {total['projected']:.1f} 分"
+                         f"（每30天 {total['slope_per_30d']:+.2f} 分）",
+                    font=FONTS["text_small"], bg=self.THEME_CARD,
+                    fg=self.THEME_TEXT_LIGHT).pack(anchor="w", pady=(10, 0))
     
     def analyze_all_data(self, records):
-        """分析所有数据"""
+        """分析所有数据（优先使用用户保存的累计统计，末尾新增记录时增量更新）"""
         if not records:
+            self.analysis_engine.reset()
             self.analysis_data = None
+            self.forecasts = {}
             return
         
-        # 找出最佳和最差记录
-        best_record = max(records, key=lambda x: x["scores"]["total"])
-        worst_record = min(records, key=lambda x: x["scores"]["total"])
-        
-        # 统计数据
-        total_records = len(records)
-        total_scores = [r["scores"]["total"] for r in records]
-        avg_score = statistics.mean(total_scores)
-        highest_score = max(total_scores)
-        lowest_score = min(total_scores)
-        
-        # 分析各项目
-        projects_data = {}
-        all_projects = set()
-        for record in records:
-            for category in ["required", "category1", "category2"]:
-                project_key = list(record[category].keys())[0]
-                all_projects.add(project_key)
-        
-        for project_key in all_projects:
-            project_scores = []
-            project_performances = []
-            
-            for record in records:
-                for category in ["required", "category1", "category2"]:
-                    if project_key in record[category]:
-                        project_scores.append(record["scores"][category])
-                        project_performances.append(record[category][project_key])
-            
-            if project_scores:
-                projects_data[project_key] = {
-                    "avg_score": statistics.mean(project_scores),
-                    "best_score": max(project_scores),
-                    "worst_score": min(project_scores),
-                    "best_performance": max(project_performances),
-                    "worst_performance": min(project_performances),
-                    "trend": "improving" if len(project_scores) >= 2 and project_scores[-1] > project_scores[0] else "declining" if len(project_scores) >= 2 and project_scores[-1] < project_scores[0] else "stable"
-                }
-        
-        self.analysis_data = {
-            "total_records": total_records,
-            "avg_score": avg_score,
-            "highest_score": highest_score,
-            "lowest_score": lowest_score,
-            "best_record": best_record,
-            "worst_record": worst_record,
-            "projects": projects_data
-        }
+        own_records = self.user.get_all_records() is records
+        if own_records:
+            # 以记录版本号判断，中间的记录被替换时也能发现
+            self.analysis_engine.sync(records, self.user.get_stats(), self.user.records_version)
+        else:
+            self.analysis_engine.sync(records)
+        self.analysis_data = self.analysis_engine.result()
+        # 预测结果按用户缓存，记录未变化时直接复用
+        self.forecasts = self.forecast_engine.forecast_user(self.user) if own_records else {}
     
     def display_analysis(self):
         """显示分析结果"""
@@ -9,6 +9,7 @@ from typing import Dict, Optional
 from config.constants import (
     PROJECT_NAMES, THEME_COLORS, FONTS
 )
+from services.score_calculator import format_performance
 
 
 class CurrentScoreTab:
@@ -215,7 +216,7 @@ class CurrentScoreTab:
         project_name = PROJECT_NAMES.get(project_key, project_key)
         performance_value = list(performance.values())[0]
         
-        formatted_value = self.format_performance(project_key, performance_value)
+        formatted_value = format_performance(project_key, performance_value)
         
         if score >= 9:
             color = self.THEME_SUCCESS
@@ -265,22 +266,6 @@ class CurrentScoreTab:
         # 底部增加分割线（除了最后一个）
         tk.Frame(self.score_items_frame, bg=THEME_COLORS["bg"], height=1).pack(fill=tk.X, pady=(5, 5))
     
-    def format_performance(self, project_key: str, performance_value: float) -> str:
-        """格式化成绩显示"""
-        if project_key in ["1000m", "800m", "50m", "basketball", "football"]:
-            if project_key in ["1000m", "800m"]:
-                minutes = int(performance_value // 60)
-                seconds = int(performance_value % 60)
-                return f"{minutes}'{seconds}\""
-            elif project_key == "50m":
-                return f"{performance_value:.1f}秒"
-            else:
-                return f"{performance_value:.1f}秒"
-        elif project_key in ["sit_reach", "standing_jump"]:
-            return f"{performance_value:.1f}厘米"
-        else:
-            return f"{int(performance_value)}次"
-    
     def get_item_display_name(self, item_key: str) -> str:
         """获取项目显示名称"""
         if item_key == "required":
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+班级排行榜标签页
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Dict, List
+from config.constants import PROJECT_NAMES, GRADE_STANDARDS, THEME_COLORS, FONTS
+from services.leaderboard_service import LeaderboardService, TOTAL_PROJECT
+
+
+class LeaderboardTab:
+    """班级排行榜标签页"""
+
+    # 颜色主题
+    THEME_PRIMARY = THEME_COLORS["primary"]
+    THEME_PRIMARY_LIGHT = THEME_COLORS["primary_light"]
+    THEME_BG = THEME_COLORS["bg"]
+    THEME_CARD = THEME_COLORS["card"]
+    THEME_TEXT_DARK = THEME_COLORS["text_dark"]
+    THEME_TEXT_LIGHT = THEME_COLORS["text_light"]
+    THEME_SUCCESS = THEME_COLORS["success"]
+    THEME_DANGER = THEME_COLORS["danger"]
+
+    # 筛选选项：{显示文本: 取值}
+    PROJECT_OPTIONS = {"总分": TOTAL_PROJECT, **{name: key for key, name in PROJECT_NAMES.items()}}
+    GENDER_OPTIONS = {"全部": None, "男生": "male", "女生": "female"}
+    GRADE_OPTIONS = {"全部": None, **{standard["name"]: key for key, standard in GRADE_STANDARDS.items()}}
+
+    COLUMNS = ("名次", "姓名", "性别", "日期", "得分", "成绩", "总分", "等级")
+
+    def __init__(self, parent, user, score_calculator):
+        self.parent = parent
+        self.user = user
+        self.score_calculator = score_calculator
+        self.service = LeaderboardService([user])
+        self.setup_ui()
+
+    def create_card_frame(self, parent, title, title_color=None):
+        """创建卡片框架"""
+        container = tk.Frame(parent, bg=self.THEME_BG, padx=2, pady=2)
+
+        card = tk.Frame(container, bg=self.THEME_CARD, relief=tk.FLAT, bd=0)
+        card.pack(fill=tk.BOTH, expand=True)
+
+        if title:
+            if title_color is None:
+                title_color = self.THEME_PRIMARY
+
+            header = tk.Frame(card, bg="white", height=45)
+            header.pack(fill=tk.X)
+            header.pack_propagate(False)
+
+            tk.Frame(header, bg=title_color, width=4).pack(side=tk.LEFT, fill=tk.Y)
+
+            tk.Label(header, text=title,
+                    font=FONTS["card_title"],
+                    bg="white", fg=self.THEME_TEXT_DARK,
+                    anchor="w", padx=10).pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+            tk.Frame(card, bg=THEME_COLORS["border"], height=1).pack(fill=tk.X)
+
+        content = tk.Frame(card, bg=self.THEME_CARD, padx=20, pady=15)
+        content.pack(fill=tk.BOTH, expand=True)
+
+        return container, content
+
+    def setup_ui(self):
+        """设置用户界面"""
+        leaderboard_frame = tk.Frame(self.parent, bg=self.THEME_BG, padx=10, pady=10)
+
+        # 筛选条件卡片
+        filter_card, filter_content = self.create_card_frame(leaderboard_frame, "🔍 筛选条件")
+        filter_card.pack(fill=tk.X, pady=(0, 10))
+
+        self.project_var = tk.StringVar(value="总分")
+        self.gender_var = tk.StringVar(value="全部")
+        self.grade_var = tk.StringVar(value="全部")
+        self.start_date_var = tk.StringVar()
+        self.end_date_var = tk.StringVar()
+        self.k_var = tk.StringVar(value="10")
+
+        filters = [
+            ("项目", ttk.Combobox(filter_content, textvariable=self.project_var, state="readonly",
+                                 values=list(self.PROJECT_OPTIONS), width=10)),
+            ("性别", ttk.Combobox(filter_content, textvariable=self.gender_var, state="readonly",
+                                 values=list(self.GENDER_OPTIONS), width=6)),
+            ("等级", ttk.Combobox(filter_content, textvariable=self.grade_var, state="readonly",
+                                 values=list(self.GRADE_OPTIONS), width=6)),
+            ("开始日期", tk.Entry(filter_content, textvariable=self.start_date_var, width=11,
+                               font=FONTS["text_small"])),
+            ("结束日期", tk.Entry(filter_content, textvariable=self.end_date_var, width=11,
+                               font=FONTS["text_small"])),
+            ("人数", tk.Spinbox(filter_content, textvariable=self.k_var, from_=1, to=100, width=4,
+                              font=FONTS["text_small"])),
+        ]
+        for column, (label, widget) in enumerate(filters):
+            tk.Label(filter_content, text=label, font=FONTS["text_small"],
+                    bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT).grid(row=0, column=column * 2, padx=(0, 4))
+            widget.grid(row=0, column=column * 2 + 1, padx=(0, 12))
+            if isinstance(widget, ttk.Combobox):
+                widget.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+            else:
+                widget.bind("<Return>", lambda e: self.refresh())
+
+        tk.Button(filter_content, text="查询", font=FONTS["text_small"],
+                 bg=self.THEME_PRIMARY, fg="white", relief=tk.FLAT, padx=12,
+                 command=self.refresh).grid(row=0, column=len(filters) * 2)
+
+        self.status_label = tk.Label(filter_content, text="", font=FONTS["text_small"],
+                                    bg=self.THEME_CARD, fg=self.THEME_TEXT_LIGHT, anchor="w")
+        self.status_label.grid(row=1, column=0, columnspan=len(filters) * 2 + 1, sticky="w", pady=(8, 0))
+
+        # 前K名 / 后K名
+        lists_frame = tk.Frame(leaderboard_frame, bg=self.THEME_BG)
+        lists_frame.pack(fill=tk.BOTH, expand=True)
+
+        style = ttk.Style()
+        style.configure("Leaderboard.Treeview",
+                       font=FONTS["text_small"],
+                       rowheight=28,
+                       background="white",
+                       fieldbackground="white",
+                       borderwidth=0)
+        style.configure("Leaderboard.Treeview.Heading",
+                       font=FONTS["section_title"],
+                       background=THEME_COLORS["bg"],
+                       foreground=self.THEME_TEXT_DARK,
+                       relief="flat")
+
+        top_card, top_content = self.create_card_frame(lists_frame, "🏆 前列", self.THEME_SUCCESS)
+        top_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
+        self.top_tree = self._create_tree(top_content)
+
+        bottom_card, bottom_content = self.create_card_frame(lists_frame, "📌 待提高", self.THEME_DANGER)
+        bottom_card.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
+        self.bottom_tree = self._create_tree(bottom_content)
+
+        self.frame = leaderboard_frame
+
+    def _create_tree(self, parent) -> ttk.Treeview:
+        """创建排行榜列表"""
+        tree = ttk.Treeview(parent, columns=self.COLUMNS, show="headings", height=12,
+                            style="Leaderboard.Treeview")
+        widths = {"名次": 45, "姓名": 80, "性别": 45, "日期": 95, "得分": 55, "成绩": 65, "总分": 55, "等级": 60}
+        for column in self.COLUMNS:
+            tree.heading(column, text=column)
+            tree.column(column, width=widths[column], anchor="center")
+        # 当前学生所在行高亮
+        tree.tag_configure("current", background=self.THEME_PRIMARY_LIGHT)
+        tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def set_users(self, users: List):
+        """设置参与排名的学生并刷新"""
+        self.service.set_users(users)
+        self.refresh()
+
+    def _filters(self) -> Dict:
+        """读取筛选条件"""
+        return {
+            "gender": self.GENDER_OPTIONS.get(self.gender_var.get()),
+            "grade": self.GRADE_OPTIONS.get(self.grade_var.get()),
+            "start_date": self.start_date_var.get().strip() or None,
+            "end_date": self.end_date_var.get().strip() or None,
+        }
+
+    def refresh(self):
+        """按当前筛选条件刷新前K名和后K名"""
+        project = self.PROJECT_OPTIONS.get(self.project_var.get(), TOTAL_PROJECT)
+        try:
+            k = max(1, int(self.k_var.get()))
+        except ValueError:
+            k = 10
+            self.k_var.set(str(k))
+        filters = self._filters()
+
+        top = self.service.top(project, k, **filters)
+        bottom = self.service.bottom(project, k, **filters)
+        self._fill_tree(self.top_tree, top)
+        self._fill_tree(self.bottom_tree, bottom)
+
+        self.status_label.config(text=f"参与排名学生: {len(self.service.users)} 人")
+
+    def _fill_tree(self, tree: ttk.Treeview, entries: List[Dict]):
+        """填充排行榜列表"""
+        tree.delete(*tree.get_children())
+        for entry in entries:
+            performance = entry["performance"]
+            tree.insert("", tk.END, values=(
+                entry["rank"], entry["name"],
+                "男" if entry["gender"] == "male" else "女",
+                entry["date"], f"{entry['score']:.1f}",
+                "--" if performance is None else performance,
+                f"{entry['total_score']:.1f}",
+                GRADE_STANDARDS[entry["grade"]]["name"]
+            ), tags=("current",) if entry["user_id"] == self.user.id else ())
+
+    def show_no_data(self):
+        """显示无数据消息"""
+        self._fill_tree(self.top_tree, [])
+        self._fill_tree(self.bottom_tree, [])
+        self.status_label.config(text="暂无成绩数据")
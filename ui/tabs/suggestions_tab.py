@@ -5,13 +5,14 @@
 
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict
+from typing import Dict, List
 from config.constants import (
     PROJECT_NAMES, THEME_COLORS, FONTS,
     SCORE_EVALUATION_TEXTS, WEAKNESS_INTENSITY_TEXTS,
     PROJECT_IMPROVEMENT_SUGGESTIONS, DETAILED_TRAINING_PLANS,
-    LIFE_SUGGESTIONS_TEXT, SCORE_PRIORITY
+    LIFE_SUGGESTIONS_TEXT, SCORE_PRIORITY, SCORE_TARGETS, LOWER_IS_BETTER_PROJECTS
 )
+from services.score_calculator import format_performance
 
 
 class SuggestionsTab:
@@ -120,6 +121,13 @@ class SuggestionsTab:
         self.weakness_frame = tk.Frame(weakness_content, bg=self.THEME_CARD)
         self.weakness_frame.pack(fill=tk.BOTH, expand=True)
         
+        # 提分性价比卡片
+        gain_card, gain_content = self.create_card_frame(scrollable_frame, "🎯 提分性价比排行", self.THEME_INFO)
+        gain_card.pack(fill=tk.X, pady=(0, 15))
+        
+        self.gain_frame = tk.Frame(gain_content, bg=self.THEME_CARD)
+        self.gain_frame.pack(fill=tk.BOTH, expand=True)
+        
         # 分项训练计划卡片
         plan_card, plan_content = self.create_card_frame(scrollable_frame, "🏋️ 分项训练计划")
         plan_card.pack(fill=tk.BOTH, expand=True, pady=(0, 15))
@@ -210,12 +218,22 @@ class SuggestionsTab:
             text_widget.insert("1.0", f"• {suggestion}")
             text_widget.config(state=tk.DISABLED)  # 设置为只读
             text_widget.pack(fill=tk.X)
+            
+            # 达到目标得分所需的成绩
+            target_text = self.get_target_requirements(actual_project, score)
+            if target_text:
+                tk.Label(self.weakness_frame, text=target_text, font=FONTS["text_normal"],
+                        bg=self.THEME_CARD, fg=self.THEME_TEXT_DARK,
+                        justify=tk.LEFT).pack(anchor="w", pady=(8, 0))
         else:
             tk.Label(self.weakness_frame, text="暂无明显弱项，请继续保持全面发展！",
                     font=FONTS["text_normal"],
                     bg=self.THEME_CARD, fg=self.THEME_SUCCESS).pack(anchor="w")
             
-        # 3. 分项训练计划
+        # 3. 提分性价比排行
+        self.display_gain_ranking()
+            
+        # 4. 分项训练计划
         for widget in self.plan_frame.winfo_children():
             widget.destroy()
             
@@ -266,7 +284,7 @@ class SuggestionsTab:
             # 分割线
             tk.Frame(self.plan_frame, bg=THEME_COLORS["border"], height=1).pack(fill=tk.X, pady=5)
 
-        # 4. 生活建议
+        # 5. 生活建议
         lifestyle_tips = [
             "• 保证充足睡眠：每天建议睡眠时间7-8小时，利于体能恢复。",
             "• 科学饮食：注意蛋白质和碳水化合物的摄入，运动后及时补充水分。",
@@ -279,6 +297,63 @@ class SuggestionsTab:
         self.lifestyle_text.insert(tk.END, "\n\n".join(lifestyle_tips))
         self.lifestyle_text.config(state=tk.DISABLED)
     
+    def get_target_requirements(self, project: str, score: float) -> str:
+        """达到各目标得分（SCORE_TARGETS）所需的成绩"""
+        lines = []
+        for target in SCORE_TARGETS:
+            if score >= target:
+                continue
+            performance = self.score_calculator.required_performance(self.user.gender, project, target)
+            if performance is not None:
+                lines.append(f"🎯 达到 {target:.1f} 分需要: {format_performance(project, performance)}")
+        return "\n".join(lines)
+    
+    def get_latest_performances(self) -> Dict[str, float]:
+        """各项目最近一次的成绩 {项目: 成绩}"""
+        performances = {}
+        for record in self.user.get_all_records():
+            for category in ("required", "category1", "category2"):
+                performances.update(record.get(category, {}))
+        return performances
+    
+    def display_gain_ranking(self):
+        """按提分代价从低到高列出各项目提高到下一个0.5分档所需的成绩"""
+        for widget in self.gain_frame.winfo_children():
+            widget.destroy()
+        
+        rows = self.score_calculator.gradient_table(self.user.gender, self.get_latest_performances())
+        for rank, row in enumerate(rows, 1):
+            project = row["project"]
+            current = f"{format_performance(project, row['performance'])}（{row['score']:.1f}分）"
+            if row["cost"] is None:
+                text = f"{rank}. {PROJECT_NAMES.get(project, project)}  {current}  已满分"
+                color = self.THEME_SUCCESS
+            else:
+                text = (f"{rank}. {PROJECT_NAMES.get(project, project)}  {current} → "
+                        f"{format_performance(project, row['target_performance'])}"
+                        f"（{row['target_score']:.1f}分），需提高 {self.format_improvement(project, row['improvement'])}，"
+                        f"每提高1{self.get_unit(project)}约 +{row['points_per_unit']:g} 分")
+                color = self.THEME_PRIMARY if rank == 1 else self.THEME_TEXT_DARK
+            tk.Label(self.gain_frame, text=text, font=FONTS["text_normal"],
+                    bg=self.THEME_CARD, fg=color, justify=tk.LEFT, anchor="w").pack(anchor="w", pady=2)
+        
+        if rows:
+            tk.Label(self.gain_frame, text="排序依据：每提高1分所需的成绩提高量占满分标准的比例，越靠前越容易提分",
+                    font=FONTS["text_tiny"], bg=self.THEME_CARD,
+                    fg=self.THEME_TEXT_LIGHT).pack(anchor="w", pady=(6, 0))
+    
+    def get_unit(self, project_key: str) -> str:
+        """成绩单位"""
+        if project_key in LOWER_IS_BETTER_PROJECTS:
+            return "秒"
+        if project_key in ["sit_reach", "standing_jump"]:
+            return "厘米"
+        return "次"
+    
+    def format_improvement(self, project_key: str, value: float) -> str:
+        """格式化需要提高的成绩量"""
+        return f"{value:g}{self.get_unit(project_key)}"
+    
     def get_overall_evaluation(self, total_score: float) -> str:
         """获取总体评价"""
         if total_score >= SCORE_EVALUATION_TEXTS["excellent"]["threshold"]:
@@ -3,16 +3,23 @@
 历史趋势标签页
 """
 
+import base64
+import io
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from typing import Optional
 import matplotlib
 matplotlib.use('TkAgg')
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-from config.constants import THEME_COLORS, FONTS
+from config.constants import CHART_CONFIG, THEME_COLORS, FONTS
 from ui.custom_button import CustomButton
+from utils import profiler
+from utils.chart_cache import ChartCache, get_chart_cache
+from utils.trend_chart import TrendChart, CHART_DATA_CHANGED, CHART_LAYOUT_CHANGED
+
+# 趋势图尺寸（英寸）和分辨率
+TREND_FIGSIZE = (9, 4)
+TREND_DPI = 100
 
 
 class TrendTab:
@@ -35,6 +42,15 @@ class TrendTab:
         self.parent = parent
         self.user = user
         self.score_calculator = score_calculator
+        # 趋势图只创建一次，刷新时原地更新
+        self.trend_chart: Optional[TrendChart] = None
+        self.chart_canvas: Optional[FigureCanvasTkAgg] = None
+        self._chart_background = None
+        self._chart_message = None
+        # 缓存图片：成绩未变化时直接显示，不创建 matplotlib 画布
+        self._cached_chart_label = None
+        self._cached_chart_image = None
+        self._pending_cache_key = None
         self.setup_ui()
     
     def create_card_frame(self, parent, title, title_color=None):
@@ -170,94 +186,131 @@ class TrendTab:
         
         self.frame = trend_frame
     
+    @profiler.profile_callback('chart.render')
     def render_chart_in_window(self):
         """在窗口中渲染趋势图"""
         records = self.user.get_all_records()
         
-        for widget in self.chart_frame.winfo_children():
-            widget.destroy()
+        if self.chart_placeholder is not None:
+            self.chart_placeholder.destroy()
+            self.chart_placeholder = None
         
         if len(records) < 2:
-            label = tk.Label(
-                self.chart_frame,
-                text="📊 需要至少2条记录才能生成趋势图\n\n请先录入更多成绩数据",
-                font=FONTS["text_normal"],
-                bg=self.THEME_CARD,
-                fg=self.THEME_TEXT_LIGHT
+            self._show_chart_message(
+                "📊 需要至少2条记录才能生成趋势图\n\n请先录入更多成绩数据",
+                self.THEME_TEXT_LIGHT
             )
-            label.place(relx=0.5, rely=0.5, anchor="center")
             return
         
         try:
-            plt.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'Microsoft YaHei']
-            plt.rcParams['axes.unicode_minus'] = False
-            
-            # 使用更现代的图表样式
-            fig = Figure(figsize=(9, 4), dpi=100, facecolor='white')
-            ax = fig.add_subplot(111)
-            
-            # 移除顶部和右侧边框
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_color(THEME_COLORS["text_light"])
-            ax.spines['bottom'].set_color(THEME_COLORS["text_light"])
-            
-            dates = [r['date'] for r in records]
-            total_scores = [r['scores']['total'] for r in records]
-            required_scores = [r['scores']['required'] for r in records]
-            category1_scores = [r['scores']['category1'] for r in records]
-            category2_scores = [r['scores']['category2'] for r in records]
+            title = f'{self.user.name} - 成绩趋势分析'
+            cache_key = ChartCache.make_key(records, "trend", (TREND_FIGSIZE, TREND_DPI, CHART_CONFIG["max_points"]),
+                                            [title, THEME_COLORS])
             
-            # 绘制线条
-            ax.plot(range(len(dates)), total_scores, marker='o', linewidth=3, 
-                   markersize=8, label='总分', color=THEME_COLORS["primary"], zorder=3)
-            ax.plot(range(len(dates)), required_scores, marker='s', linewidth=2, 
-                   markersize=6, label='必选项', color=THEME_COLORS["info"], alpha=0.6)
-            ax.plot(range(len(dates)), category1_scores, marker='^', linewidth=2, 
-                   markersize=6, label='第一类选考', color=THEME_COLORS["success"], alpha=0.6)
-            ax.plot(range(len(dates)), category2_scores, marker='d', linewidth=2, 
-                   markersize=6, label='第二类选考', color=THEME_COLORS["warning"], alpha=0.6)
+            if self.trend_chart is None:
+                cached = get_chart_cache().get(cache_key)
+                if cached is not None:
+                    self._hide_chart_message()
+                    self._show_cached_chart(cached)
+                    return
+                self._create_chart_canvas()
             
-            # 设置标题和标签
-            ax.set_title(f'{self.user.name} - 成绩趋势分析', 
-                        fontsize=14, fontweight='bold', pad=20, color=THEME_COLORS["text_dark"])
-            ax.set_xlabel('测试日期', fontsize=10, color=THEME_COLORS["text_light"])
-            ax.set_ylabel('得分', fontsize=10, color=THEME_COLORS["text_light"])
+            self._hide_chart_message()
+            self._hide_cached_chart()
             
-            # 设置坐标轴
-            ax.set_xticks(range(len(dates)))
-            ax.set_xticklabels(dates, rotation=30, ha='right', fontsize=9, color=THEME_COLORS["text_normal"])
-            ax.tick_params(axis='y', colors=THEME_COLORS["text_normal"])
-            
-            ax.set_ylim(0, 10.5)
-            ax.set_yticks(range(0, 11, 2))
-            
-            # 网格线
-            ax.grid(True, linestyle='--', alpha=0.2, zorder=0, color=THEME_COLORS["text_light"])
-            
-            # 图例
-            ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15),
-                     ncol=4, frameon=False, fontsize=9)
-            
-            fig.tight_layout()
-            
-            canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            change = self.trend_chart.update(records, title)
+            if change == CHART_LAYOUT_CHANGED:
+                # 坐标轴变化，需要完整重绘（重绘后在 draw_event 中更新背景缓存和图片缓存）
+                self._pending_cache_key = cache_key
+                self.chart_canvas.draw_idle()
+            elif change == CHART_DATA_CHANGED:
+                if self._blit_chart_lines():
+                    self._store_chart_bitmap(cache_key)
+                else:
+                    # 尚无背景缓存，改为完整重绘，画完后再写入图片缓存
+                    self._pending_cache_key = cache_key
             
         except Exception as e:
             print(f"渲染图表错误: {e}")
             import traceback
             traceback.print_exc()
             
-            label = tk.Label(
+            self._show_chart_message(f"❌ 图表渲染失败\n\n{str(e)}", self.THEME_DANGER)
+    
+    def _create_chart_canvas(self):
+        """创建可复用的趋势图画布"""
+        self.trend_chart = TrendChart(figsize=TREND_FIGSIZE, dpi=TREND_DPI, animated=True)
+        self.chart_canvas = FigureCanvasTkAgg(self.trend_chart.figure, master=self.chart_frame)
+        self.chart_canvas.mpl_connect('draw_event', self._on_chart_draw)
+        self.chart_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def _on_chart_draw(self, event):
+        """完整重绘后缓存不含折线的背景，再单独绘制折线"""
+        self._chart_background = self.chart_canvas.copy_from_bbox(self.trend_chart.figure.bbox)
+        self.trend_chart.draw_lines()
+        self.chart_canvas.blit(self.trend_chart.figure.bbox)
+        
+        if self._pending_cache_key is not None:
+            self._store_chart_bitmap(self._pending_cache_key)
+            self._pending_cache_key = None
+    
+    def _blit_chart_lines(self) -> bool:
+        """坐标轴未变化时，只在缓存的背景上重绘折线
+        
+        Returns:
+            是否已绘制；没有背景缓存时只安排一次完整重绘，返回 False
+        """
+        if self._chart_background is None:
+            self.chart_canvas.draw_idle()
+            return False
+        
+        self.chart_canvas.restore_region(self._chart_background)
+        self.trend_chart.draw_lines()
+        self.chart_canvas.blit(self.trend_chart.figure.bbox)
+        return True
+    
+    def _store_chart_bitmap(self, cache_key):
+        """将画布当前的图像（含折线）编码为PNG写入缓存"""
+        try:
+            from matplotlib import image as mpimg
+            buffer = io.BytesIO()
+            mpimg.imsave(buffer, self.chart_canvas.buffer_rgba(), format='png')
+            get_chart_cache().put(cache_key, buffer.getvalue())
+        except Exception as e:
+            print(f"缓存趋势图失败: {e}")
+    
+    def _show_cached_chart(self, data):
+        """显示缓存的趋势图图片"""
+        self._cached_chart_image = tk.PhotoImage(master=self.chart_frame,
+                                                 data=base64.b64encode(data))
+        if self._cached_chart_label is None:
+            self._cached_chart_label = tk.Label(self.chart_frame, bg=self.THEME_CARD)
+        self._cached_chart_label.config(image=self._cached_chart_image)
+        self._cached_chart_label.place(relx=0, rely=0, relwidth=1, relheight=1)
+    
+    def _hide_cached_chart(self):
+        """隐藏缓存的趋势图图片"""
+        if self._cached_chart_label is not None:
+            self._cached_chart_label.destroy()
+            self._cached_chart_label = None
+            self._cached_chart_image = None
+    
+    def _show_chart_message(self, text, color):
+        """在图表区域显示提示信息（覆盖在画布之上）"""
+        if self._chart_message is None:
+            self._chart_message = tk.Label(
                 self.chart_frame,
-                text=f"❌ 图表渲染失败\n\n{str(e)}",
                 font=FONTS["text_normal"],
-                bg=self.THEME_CARD,
-                fg=self.THEME_DANGER
+                bg=self.THEME_CARD
             )
-            label.place(relx=0.5, rely=0.5, anchor="center")
+        self._chart_message.config(text=text, fg=color)
+        self._chart_message.place(relx=0, rely=0, relwidth=1, relheight=1)
+        self._chart_message.lift()
+    
+    def _hide_chart_message(self):
+        """隐藏图表区域的提示信息"""
+        if self._chart_message is not None:
+            self._chart_message.place_forget()
 
     # ... (refresh_chart, export_chart 方法保持不变) ...
 
@@ -6,26 +6,43 @@
 import os
 import shutil
 import json
+import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from utils.logger import get_logger
+from utils.metrics import timed, annotate
 
 logger = get_logger()
 
+# 自动备份文件名前缀与时间戳格式
+AUTO_BACKUP_PREFIX = 'backup_'
+AUTO_BACKUP_TIME_FORMAT = '%Y%m%d_%H%M%S'
+
+# 各保留层级对应的时间桶划分方式
+RETENTION_BUCKETS = {
+    'hourly': lambda t: (t.year, t.month, t.day, t.hour),
+    'daily': lambda t: (t.year, t.month, t.day),
+    'weekly': lambda t: tuple(t.isocalendar()[:2]),
+    'monthly': lambda t: (t.year, t.month),
+}
+
 
 class BackupManager:
     """备份管理器"""
     
-    def __init__(self, data_file: str):
+    def __init__(self, data_file: str, backup_dir: str = None):
         """初始化备份管理器
         
         Args:
             data_file: 数据文件路径
+            backup_dir: 备份目录，默认使用用户数据目录下的backups
         """
         self.data_file = data_file
-        self.backup_dir = self._get_backup_directory()
+        self.backup_dir = backup_dir or self._get_backup_directory()
+        # 备份目录清单缓存（按时间降序），避免每次操作都重新遍历目录
+        self._catalog: Optional[List[dict]] = None
         self._ensure_backup_dir()
-        logger.info(f'备份管理器初始化完成，备份目录: {self.backup_dir}')
+        logger.info('备份管理器初始化完成，备份目录: %s', self.backup_dir)
     
     def _get_backup_directory(self) -> str:
         """获取备份目录"""
@@ -41,10 +58,11 @@ class BackupManager:
         """确保备份目录存在"""
         try:
             os.makedirs(self.backup_dir, exist_ok=True)
-            logger.debug(f'备份目录已准备就绪: {self.backup_dir}')
+            logger.debug('备份目录已准备就绪: %s', self.backup_dir)
         except Exception as e:
-            logger.error(f'创建备份目录失败: {e}', exc_info=True)
+            logger.error('创建备份目录失败: %s', e, exc_info=True)
     
+    @timed('create_backup')
     def create_backup(self, backup_name: str = None) -> Optional[str]:
         """创建数据备份
         
@@ -56,37 +74,41 @@ class BackupManager:
         """
         try:
             if not os.path.exists(self.data_file):
-                logger.warning(f'数据文件不存在，无法备份: {self.data_file}')
+                logger.warning('数据文件不存在，无法备份: %s', self.data_file)
                 return None
             
             # 生成备份文件名
             if backup_name is None:
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                backup_name = f'backup_{timestamp}.json'
+                timestamp = datetime.now().strftime(AUTO_BACKUP_TIME_FORMAT)
+                backup_name = f'{AUTO_BACKUP_PREFIX}{timestamp}.json'
             elif not backup_name.endswith('.json'):
                 backup_name += '.json'
             
             backup_path = os.path.join(self.backup_dir, backup_name)
             
-            logger.info(f'开始创建备份: {backup_path}')
+            logger.info('开始创建备份: %s', backup_path)
             
             # 复制文件
             shutil.copy2(self.data_file, backup_path)
             
             # 验证备份
             if self._verify_backup(backup_path):
-                logger.info(f'备份创建成功: {backup_path}')
+                logger.info('备份创建成功: %s', backup_path)
+                self._catalog_add(backup_path)
+                annotate(bytes=os.path.getsize(backup_path))
                 
-                # 清理旧备份（保留最近10个）
-                self._cleanup_old_backups(keep_count=10)
+                # 按保留策略清理旧备份
+                self.apply_retention()
                 
                 return backup_path
             else:
-                logger.error(f'备份验证失败: {backup_path}')
+                logger.error('备份验证失败: %s', backup_path)
+                annotate(status='error')
                 return None
                 
         except Exception as e:
-            logger.error(f'创建备份失败: {e}', exc_info=True)
+            logger.error('创建备份失败: %s', e, exc_info=True)
+            annotate(status='error')
             return None
     
     def restore_backup(self, backup_path: str) -> bool:
@@ -100,70 +122,111 @@ class BackupManager:
         """
         try:
             if not os.path.exists(backup_path):
-                logger.error(f'备份文件不存在: {backup_path}')
+                logger.error('备份文件不存在: %s', backup_path)
                 return False
             
             # 验证备份文件
             if not self._verify_backup(backup_path):
-                logger.error(f'备份文件无效: {backup_path}')
+                logger.error('备份文件无效: %s', backup_path)
                 return False
             
-            logger.info(f'开始恢复备份: {backup_path}')
+            logger.info('开始恢复备份: %s', backup_path)
             
             # 先备份当前数据（安全措施）
             if os.path.exists(self.data_file):
                 safety_backup = self.create_backup('pre_restore_backup')
-                logger.info(f'已创建恢复前安全备份: {safety_backup}')
+                logger.info('已创建恢复前安全备份: %s', safety_backup)
             
             # 恢复备份
             shutil.copy2(backup_path, self.data_file)
             
-            logger.info(f'备份恢复成功: {backup_path} -> {self.data_file}')
+            logger.info('备份恢复成功: %s -> %s', backup_path, self.data_file)
             return True
             
         except Exception as e:
-            logger.error(f'恢复备份失败: {e}', exc_info=True)
+            logger.error('恢复备份失败: %s', e, exc_info=True)
             return False
     
     def list_backups(self) -> List[dict]:
-        """列出所有备份
+        """列出所有备份（重新扫描备份目录并刷新清单缓存）
         
         Returns:
             备份信息列表，每项包含name, path, size, created_time
         """
         try:
-            backups = []
-            
-            if not os.path.exists(self.backup_dir):
-                return backups
-            
-            # 遍历备份目录
-            for filename in os.listdir(self.backup_dir):
-                if filename.endswith('.json'):
-                    filepath = os.path.join(self.backup_dir, filename)
-                    
-                    # 获取文件信息
-                    stat = os.stat(filepath)
-                    
-                    backups.append({
-                        'name': filename,
-                        'path': filepath,
-                        'size': stat.st_size,
-                        'created_time': datetime.fromtimestamp(stat.st_mtime),
-                        'formatted_size': self._format_size(stat.st_size),
-                        'formatted_time': datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    })
-            
-            # 按创建时间降序排序
-            backups.sort(key=lambda x: x['created_time'], reverse=True)
-            
-            logger.debug(f'找到 {len(backups)} 个备份文件')
+            backups = [dict(entry) for entry in self._load_catalog(refresh=True)]
+            logger.debug('找到 %s 个备份文件', len(backups))
             return backups
             
         except Exception as e:
-            logger.error(f'列出备份失败: {e}', exc_info=True)
+            logger.error('列出备份失败: %s', e, exc_info=True)
             return []
     
+    def _load_catalog(self, refresh: bool = False) -> List[dict]:
+        """获取备份清单，仅在首次使用或显式刷新时遍历目录
+        
+        Args:
+            refresh: 是否强制重新扫描备份目录
+            
+        Returns:
+            按创建时间降序排列的备份清单
+        """
+        if self._catalog is not None and not refresh:
+            return self._catalog
+        
+        catalog = []
+        if os.path.exists(self.backup_dir):
+            # 单次遍历目录，scandir 可复用目录项中的文件信息
+            with os.scandir(self.backup_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.endswith('.json'):
+                        catalog.append(self._make_catalog_entry(entry.name, entry.path, entry.stat()))
+        
+        catalog.sort(key=lambda x: x['backup_time'], reverse=True)
+        self._catalog = catalog
+        return catalog
+    
+    def _make_catalog_entry(self, filename: str, filepath: str, stat: os.stat_result) -> dict:
+        """构造单个备份的清单条目"""
+        modified_time = datetime.fromtimestamp(stat.st_mtime)
+        return {
+            'name': filename,
+            'path': filepath,
+            'size': stat.st_size,
+            'created_time': modified_time,
+            'backup_time': self._parse_backup_time(filename) or modified_time,
+            'formatted_size': self._format_size(stat.st_size),
+            'formatted_time': modified_time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    def _catalog_add(self, backup_path: str):
+        """将新建的备份加入清单缓存"""
+        if self._catalog is None:
+            return
+        
+        filename = os.path.basename(backup_path)
+        self._catalog = [b for b in self._catalog if b['name'] != filename]
+        self._catalog.append(self._make_catalog_entry(filename, backup_path, os.stat(backup_path)))
+        self._catalog.sort(key=lambda x: x['backup_time'], reverse=True)
+    
+    def _parse_backup_time(self, filename: str) -> Optional[datetime]:
+        """从自动备份文件名中解析备份时间
+        
+        Args:
+            filename: 备份文件名，如 backup_20251018_093000.json
+            
+        Returns:
+            备份时间，非自动备份或格式不符时返回None
+        """
+        if not filename.startswith(AUTO_BACKUP_PREFIX):
+            return None
+        
+        stamp = filename[len(AUTO_BACKUP_PREFIX):-len('.json')]
+        try:
+            return datetime.strptime(stamp, AUTO_BACKUP_TIME_FORMAT)
+        except ValueError:
+            return None
+    
     def delete_backup(self, backup_path: str) -> bool:
         """删除指定备份
         
@@ -175,15 +238,17 @@ class BackupManager:
         """
         try:
             if not os.path.exists(backup_path):
-                logger.warning(f'备份文件不存在: {backup_path}')
+                logger.warning('备份文件不存在: %s', backup_path)
                 return False
             
             os.remove(backup_path)
-            logger.info(f'备份已删除: {backup_path}')
+            if self._catalog is not None:
+                self._catalog = [b for b in self._catalog if b['path'] != backup_path]
+            logger.info('备份已删除: %s', backup_path)
             return True
             
         except Exception as e:
-            logger.error(f'删除备份失败: {e}', exc_info=True)
+            logger.error('删除备份失败: %s', e, exc_info=True)
             return False
     
     def _verify_backup(self, backup_path: str) -> bool:
@@ -201,45 +266,113 @@ class BackupManager:
                 
                 # 检查必要的数据结构
                 if 'users' not in data:
-                    logger.warning(f'备份文件缺少users字段: {backup_path}')
+                    logger.warning('备份文件缺少users字段: %s', backup_path)
                     return False
                 
                 if not isinstance(data['users'], list):
-                    logger.warning(f'备份文件users字段格式错误: {backup_path}')
+                    logger.warning('备份文件users字段格式错误: %s', backup_path)
                     return False
                 
                 return True
                 
         except json.JSONDecodeError as e:
-            logger.error(f'备份文件JSON格式错误: {e}')
+            logger.error('备份文件JSON格式错误: %s', e)
             return False
         except Exception as e:
-            logger.error(f'验证备份文件失败: {e}', exc_info=True)
+            logger.error('验证备份文件失败: %s', e, exc_info=True)
             return False
     
-    def _cleanup_old_backups(self, keep_count: int = 10):
-        """清理旧备份，保留最近的N个
+    def plan_retention(self, policy: Dict[str, int] = None) -> Dict[str, List[dict]]:
+        """按分层保留策略计算需要保留和清理的备份（不删除任何文件）
+        
+        对按时间降序排列的清单单次遍历：每个层级记录已占用的时间桶，
+        某备份是该层级中一个新时间桶的最新备份且桶数未满时即被保留。
+        手动命名的备份（不以backup_开头）始终保留。
         
         Args:
-            keep_count: 保留的备份数量
+            policy: 保留策略，如 {"last": 3, "daily": 7}，默认使用配置
+            
+        Returns:
+            {'keep': [...], 'prune': [...]}，keep中的条目附带保留原因 'tiers'
+        """
+        if policy is None:
+            from config.constants import BACKUP_RETENTION_POLICY
+            policy = BACKUP_RETENTION_POLICY
+        
+        keep_last = policy.get('last', 0)
+        tiers = [(tier, RETENTION_BUCKETS[tier], count)
+                 for tier, count in policy.items() if tier in RETENTION_BUCKETS and count > 0]
+        seen_buckets = {tier: set() for tier, _, _ in tiers}
+        
+        keep, prune = [], []
+        auto_index = 0
+        
+        for backup in self._load_catalog():
+            if not backup['name'].startswith(AUTO_BACKUP_PREFIX):
+                continue
+            
+            reasons = []
+            if auto_index < keep_last:
+                reasons.append('last')
+            auto_index += 1
+            
+            backup_time = backup['backup_time']
+            for tier, bucket_of, count in tiers:
+                buckets = seen_buckets[tier]
+                if len(buckets) >= count:
+                    continue
+                bucket = bucket_of(backup_time)
+                if bucket not in buckets:
+                    buckets.add(bucket)
+                    reasons.append(tier)
+            
+            if reasons:
+                keep.append(dict(backup, tiers=reasons))
+            else:
+                prune.append(backup)
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('保留备份明细: %s',
+                         ', '.join(f"{b['name']}({'/'.join(b['tiers'])})" for b in keep))
+        
+        return {'keep': keep, 'prune': prune}
+    
+    def apply_retention(self, policy: Dict[str, int] = None, dry_run: bool = False) -> Dict[str, List[dict]]:
+        """执行分层保留策略，清理不再需要的自动备份
+        
+        Args:
+            policy: 保留策略，默认使用配置
+            dry_run: 为True时只返回清理报告，不删除文件
+            
+        Returns:
+            plan_retention 的报告
         """
         try:
-            backups = self.list_backups()
+            report = self.plan_retention(policy)
+            
+            if dry_run:
+                logger.info('备份保留策略试运行: 保留 %s 个，将清理 %s 个',
+                            len(report["keep"]), len(report["prune"]))
+                return report
+            
+            removed = set()
+            for backup in report['prune']:
+                try:
+                    os.remove(backup['path'])
+                    removed.add(backup['path'])
+                    logger.info('清理旧备份: %s', backup["name"])
+                except OSError as e:
+                    logger.error('删除备份失败: %s', e, exc_info=True)
+            
+            # 一次性更新清单，避免逐个删除时反复重建
+            if removed and self._catalog is not None:
+                self._catalog = [b for b in self._catalog if b['path'] not in removed]
+            
+            return report
             
-            # 如果备份数量超过限制，删除旧的
-            if len(backups) > keep_count:
-                backups_to_delete = backups[keep_count:]
-                
-                for backup in backups_to_delete:
-                    # 跳过手动命名的备份（不以backup_开头）
-                    if not backup['name'].startswith('backup_'):
-                        continue
-                    
-                    self.delete_backup(backup['path'])
-                    logger.info(f'清理旧备份: {backup["name"]}')
-                
         except Exception as e:
-            logger.error(f'清理旧备份失败: {e}', exc_info=True)
+            logger.error('清理旧备份失败: %s', e, exc_info=True)
+            return {'keep': [], 'prune': []}
     
     def _format_size(self, size_bytes: int) -> str:
         """格式化文件大小显示
@@ -263,14 +396,14 @@ class BackupManager:
             备份文件路径，失败返回None
         """
         try:
-            # 检查是否需要备份（避免频繁备份）
-            backups = self.list_backups()
+            # 检查是否需要备份（避免频繁备份）：清单按时间降序，只需看最新的自动备份
+            latest_auto = next((b for b in self._load_catalog()
+                                if b['name'].startswith(AUTO_BACKUP_PREFIX)), None)
             
             # 如果今天还没有自动备份，则创建一次
-            today = datetime.now().strftime('%Y%m%d')
-            today_auto_backups = [b for b in backups if today in b['name'] and b['name'].startswith('backup_')]
+            today = datetime.now().date()
             
-            if not today_auto_backups:
+            if latest_auto is None or latest_auto['backup_time'].date() != today:
                 logger.info('执行每日自动备份')
                 return self.create_backup()
             else:
@@ -278,5 +411,5 @@ class BackupManager:
                 return None
                 
         except Exception as e:
-            logger.error(f'自动备份失败: {e}', exc_info=True)
+            logger.error('自动备份失败: %s', e, exc_info=True)
             return None
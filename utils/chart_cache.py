@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+图表渲染缓存模块
+以成绩记录、图表类型、尺寸和主题的摘要为键缓存已渲染的PNG图片，
+内存和磁盘（用户数据目录下）两级缓存，均按最近最少使用（LRU）淘汰并限制总大小，
+学生成绩未变化时再次打开报告或导出图表可直接复用图片
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from config.constants import CHART_CACHE_CONFIG
+from utils.logger import get_logger
+
+logger = get_logger()
+
+CACHE_FILE_SUFFIX = '.png'
+
+
+class ChartCache:
+    """两级（内存 + 磁盘）图表缓存"""
+
+    def __init__(self, cache_dir: str = None,
+                 memory_max_bytes: int = CHART_CACHE_CONFIG["memory_max_bytes"],
+                 disk_max_bytes: int = CHART_CACHE_CONFIG["disk_max_bytes"]):
+        """初始化缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录，默认为用户数据目录下的 chart_cache/
+            memory_max_bytes: 内存缓存上限（字节）
+            disk_max_bytes: 磁盘缓存上限（字节），为0时不使用磁盘缓存
+        """
+        if cache_dir is None:
+            try:
+                from utils.path_helper import get_user_data_dir
+                base_dir = get_user_data_dir()
+            except ImportError:
+                base_dir = "data"
+            cache_dir = os.path.join(base_dir, CHART_CACHE_CONFIG["directory"])
+
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        # {键: 图片数据}，按访问顺序排列，最久未使用的在前
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_bytes = 0
+        # {键: 文件大小}，首次访问磁盘缓存时按修改时间建立
+        self._disk_index: Optional['OrderedDict[str, int]'] = None
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(records: List[Dict], chart_type: str, size=None, theme=None) -> str:
+        """计算缓存键
+
+        Args:
+            records: 成绩记录列表
+            chart_type: 图表类型，如 "trend"
+            size: 图表尺寸和分辨率等影响输出的参数
+            theme: 主题配置（颜色、标题等）
+
+        Returns:
+            SHA-256 摘要
+        """
+        payload = json.dumps([chart_type, size, theme, records], sort_keys=True,
+                             ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_FILE_SUFFIX)
+
+    def _load_disk_index(self) -> 'OrderedDict[str, int]':
+        """扫描缓存目录，按修改时间（最近使用时间）建立磁盘索引"""
+        if self._disk_index is None:
+            entries = []
+            if os.path.isdir(self.cache_dir):
+                with os.scandir(self.cache_dir) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.endswith(CACHE_FILE_SUFFIX):
+                            stat = entry.stat()
+                            entries.append((stat.st_mtime, entry.name[:-len(CACHE_FILE_SUFFIX)], stat.st_size))
+            entries.sort()
+            self._disk_index = OrderedDict((key, size) for _, key, size in entries)
+            self._disk_bytes = sum(self._disk_index.values())
+        return self._disk_index
+
+    def _memory_put(self, key: str, data: bytes):
+        if len(data) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _disk_put(self, key: str, data: bytes):
+        if self.disk_max_bytes <= 0 or len(data) > self.disk_max_bytes:
+            return
+        index = self._load_disk_index()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # 先写临时文件再替换，避免其他进程读到不完整的图片
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        if key in index:
+            self._disk_bytes -= index.pop(key)
+        index[key] = len(data)
+        self._disk_bytes += len(data)
+
+        while self._disk_bytes > self.disk_max_bytes:
+            evicted_key, evicted_size = index.popitem(last=False)
+            self._disk_bytes -= evicted_size
+            try:
+                os.remove(self._path(evicted_key))
+            except FileNotFoundError:
+                pass
+
+    def _touch_disk(self, key: str):
+        """将磁盘缓存项标记为最近使用"""
+        if self.disk_max_bytes <= 0:
+            return
+        index = self._load_disk_index()
+        if key in index:
+            index.move_to_end(key)
+            # 同时更新修改时间，重启后仍能按最近使用顺序淘汰
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """读取缓存，未命中时返回None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._touch_disk(key)
+                self.hits += 1
+                return data
+
+            if self.disk_max_bytes > 0:
+                index = self._load_disk_index()
+                if key in index:
+                    try:
+                        with open(self._path(key), 'rb') as f:
+                            data = f.read()
+                        self._touch_disk(key)
+                    except OSError:
+                        self._disk_bytes -= index.pop(key)
+                        data = None
+                    if data is not None:
+                        self._memory_put(key, data)
+                        self.hits += 1
+                        return data
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        """写入缓存（内存和磁盘）"""
+        with self._lock:
+            self._memory_put(key, data)
+            try:
+                self._disk_put(key, data)
+            except OSError as e:
+                logger.warning('写入图表磁盘缓存失败: %s', e)
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        """读取缓存，未命中时调用 render 渲染并写入缓存"""
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        """清空内存和磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._load_disk_index()):
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self._disk_index.clear()
+            self._disk_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_entries": len(self._disk_index or ()),
+                "disk_bytes": self._disk_bytes,
+            }
+
+
+_chart_cache: Optional[ChartCache] = None
+
+
+def get_chart_cache() -> ChartCache:
+    """获取全局图表缓存实例"""
+    global _chart_cache
+    if _chart_cache is None:
+        _chart_cache = ChartCache()
+    return _chart_cache
@@ -1,188 +1,363 @@
 # -*- coding: utf-8 -*-
 """
 图表生成工具
+使用 matplotlib 面向对象的 Figure 接口和 Agg 后端渲染图片，不依赖 pyplot 全局状态，
+因此可以在多个进程中并行批量渲染；matplotlib 在首次生成图表时才导入
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+import io
 import os
+import re
+import time
+
+from config.constants import CHART_CONFIG
+from utils.chart_cache import ChartCache, get_chart_cache
+from utils.downsample import lttb_indices
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 图片输出分辨率
+CHART_SAVE_DPI = 300
+
+
+def _configure_fonts():
+    """设置中文字体（每个进程只需设置一次）"""
+    import matplotlib
+    if not getattr(_configure_fonts, '_configured', False):
+        matplotlib.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
+        matplotlib.rcParams['axes.unicode_minus'] = False
+        _configure_fonts._configured = True
+
+
+def _new_figure(figsize: Tuple[float, float]):
+    """创建绑定 Agg 画布的图表"""
+    _configure_fonts()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _default_save_path(user_name: str, chart_name: str) -> str:
+    """生成默认保存路径（用户数据目录）"""
+    try:
+        from utils.path_helper import get_user_data_dir
+        base_dir = get_user_data_dir()
+    except ImportError:
+        base_dir = "data"
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return os.path.join(base_dir, f"{user_name}_{chart_name}_{timestamp}.png")
+
+
+def _save_figure(fig, save_path: str, dpi: int = CHART_SAVE_DPI):
+    """保存图表为图片"""
+    # 确保目录存在
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+
+
+def _render_png(fig, dpi: int = CHART_SAVE_DPI) -> bytes:
+    """将图表渲染为PNG数据"""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _write_image(data: bytes, save_path: str):
+    """将图片数据写入文件"""
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with open(save_path, 'wb') as f:
+        f.write(data)
+
+
+def build_score_trend_figure(records: List[Dict], user_name: str,
+                             max_points: int = CHART_CONFIG["max_points"]):
+    """构建成绩趋势图
+
+    Args:
+        records: 成绩记录列表
+        user_name: 用户姓名
+        max_points: 每条折线最多绘制的点数，超过时按总分曲线做 LTTB 降采样，为0时不降采样
+
+    Returns:
+        matplotlib Figure 对象
+    """
+    if not records:
+        raise ValueError("没有成绩记录")
+
+    import matplotlib.dates as mdates
+
+    if max_points and len(records) > max_points:
+        all_dates = [mdates.date2num(datetime.strptime(r["date"], "%Y-%m-%d")) for r in records]
+        kept = lttb_indices(all_dates, [r["total_score"] for r in records], max_points)
+        records = [records[i] for i in kept]
+
+    # 提取数据
+    dates = []
+    total_scores = []
+    required_scores = []
+    category1_scores = []
+    category2_scores = []
+
+    for record in records:
+        date = datetime.strptime(record["date"], "%Y-%m-%d")
+        dates.append(date)
+        total_scores.append(record["total_score"])
+        required_scores.append(record["scores"]["required"])
+        category1_scores.append(record["scores"]["category1"])
+        category2_scores.append(record["scores"]["category2"])
+
+    # 创建图表
+    fig = _new_figure((12, 8))
+    ax = fig.add_subplot(111)
+
+    # 绘制折线图
+    ax.plot(dates, total_scores, 'o-', linewidth=2, markersize=6, label='总分', color='#2E86AB')
+    ax.plot(dates, required_scores, 's-', linewidth=1.5, markersize=5, label='必选项', color='#A23B72')
+    ax.plot(dates, category1_scores, '^-', linewidth=1.5, markersize=5, label='第一类选考', color='#F18F01')
+    ax.plot(dates, category2_scores, 'd-', linewidth=1.5, markersize=5, label='第二类选考', color='#C73E1D')
+
+    # 设置图表属性
+    ax.set_title(f'{user_name} 体育成绩发展趋势图', fontsize=16, fontweight='bold', pad=20)
+    ax.set_xlabel('日期', fontsize=12)
+    ax.set_ylabel('得分', fontsize=12)
+    ax.legend(fontsize=10)
+    ax.grid(True, alpha=0.3)
+
+    # 设置x轴日期格式
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
+    # 刻度数量随时间跨度自动调整，不再按记录数逐日设置
+    ax.xaxis.set_major_locator(mdates.AutoDateLocator(maxticks=CHART_CONFIG["max_ticks"]))
+    ax.tick_params(axis='x', labelrotation=45)
+
+    # 设置y轴范围
+    ax.set_ylim(0, 30)
+
+    # 添加水平参考线
+    ax.axhline(y=27, color='green', linestyle='--', alpha=0.5, label='优秀线')
+    ax.axhline(y=24, color='blue', linestyle='--', alpha=0.5, label='良好线')
+    ax.axhline(y=18, color='orange', linestyle='--', alpha=0.5, label='及格线')
+
+    # 调整布局
+    fig.tight_layout()
+    return fig
+
+
+def build_score_distribution_figure(scores: Dict[str, float], user_name: str):
+    """构建成绩分布图
+
+    Args:
+        scores: 各项得分字典
+        user_name: 用户姓名
+
+    Returns:
+        matplotlib Figure 对象
+    """
+    # 项目名称映射
+    item_names = {
+        "required": "必选项",
+        "category1": "第一类选考",
+        "category2": "第二类选考"
+    }
+
+    # 准备数据
+    items = []
+    values = []
+    colors = []
+
+    for key, value in scores.items():
+        if key == "total":
+            continue
+
+        items.append(item_names.get(key, key))
+        values.append(value)
+
+        # 根据得分设置颜色
+        if value >= 9:
+            colors.append('#2E86AB')  # 蓝色 - 优秀
+        elif value >= 7:
+            colors.append('#A23B72')  # 紫色 - 良好
+        elif value >= 5:
+            colors.append('#F18F01')  # 橙色 - 中等
+        else:
+            colors.append('#C73E1D')  # 红色 - 需要改进
+
+    # 创建图表
+    fig = _new_figure((10, 6))
+    ax = fig.add_subplot(111)
+
+    # 绘制柱状图
+    bars = ax.bar(items, values, color=colors, alpha=0.8, edgecolor='black', linewidth=1)
+
+    # 在柱子上添加数值标签
+    for bar, value in zip(bars, values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+               f'{value:.1f}', ha='center', va='bottom', fontweight='bold')
+
+    # 设置图表属性
+    ax.set_title(f'{user_name} 各项成绩分布图', fontsize=16, fontweight='bold', pad=20)
+    ax.set_ylabel('得分', fontsize=12)
+    ax.set_ylim(0, 10.5)
+
+    # 添加水平参考线
+    ax.axhline(y=9, color='green', linestyle='--', alpha=0.5, label='优秀线')
+    ax.axhline(y=7, color='blue', linestyle='--', alpha=0.5, label='良好线')
+    ax.axhline(y=5, color='orange', linestyle='--', alpha=0.5, label='及格线')
+
+    ax.legend()
+    ax.grid(True, alpha=0.3, axis='y')
+
+    # 调整布局
+    fig.tight_layout()
+    return fig
 
 
 class ChartGenerator:
-    """图表生成器"""
-    
-    def __init__(self):
-        # 设置中文字体
-        plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'DejaVu Sans']
-        plt.rcParams['axes.unicode_minus'] = False
-    
+    """图表生成器
+
+    成绩记录未变化时直接复用缓存中已渲染的图片
+    """
+
+    def __init__(self, cache: Optional[ChartCache] = None):
+        self.cache = cache or get_chart_cache()
+
     def generate_score_trend_chart(self, records: List[Dict], user_name: str, save_path: str = None) -> str:
         """生成成绩趋势图
-        
+
         Args:
             records: 成绩记录列表
             user_name: 用户姓名
             save_path: 保存路径，如果为None则自动生成
-            
+
         Returns:
             保存的文件路径
         """
-        if not records:
-            raise ValueError("没有成绩记录")
-        
-        # 提取数据
-        dates = []
-        total_scores = []
-        required_scores = []
-        category1_scores = []
-        category2_scores = []
-        
-        for record in records:
-            date = datetime.strptime(record["date"], "%Y-%m-%d")
-            dates.append(date)
-            total_scores.append(record["total_score"])
-            required_scores.append(record["scores"]["required"])
-            category1_scores.append(record["scores"]["category1"])
-            category2_scores.append(record["scores"]["category2"])
-        
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(12, 8))
-        
-        # 绘制折线图
-        ax.plot(dates, total_scores, 'o-', linewidth=2, markersize=6, label='总分', color='#2E86AB')
-        ax.plot(dates, required_scores, 's-', linewidth=1.5, markersize=5, label='必选项', color='#A23B72')
-        ax.plot(dates, category1_scores, '^-', linewidth=1.5, markersize=5, label='第一类选考', color='#F18F01')
-        ax.plot(dates, category2_scores, 'd-', linewidth=1.5, markersize=5, label='第二类选考', color='#C73E1D')
-        
-        # 设置图表属性
-        ax.set_title(f'{user_name} 体育成绩发展趋势图', fontsize=16, fontweight='bold', pad=20)
-        ax.set_xlabel('日期', fontsize=12)
-        ax.set_ylabel('得分', fontsize=12)
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
-        
-        # 设置x轴日期格式
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-        ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//10)))
-        plt.xticks(rotation=45)
-        
-        # 设置y轴范围
-        ax.set_ylim(0, 30)
-        
-        # 添加水平参考线
-        ax.axhline(y=27, color='green', linestyle='--', alpha=0.5, label='优秀线')
-        ax.axhline(y=24, color='blue', linestyle='--', alpha=0.5, label='良好线')
-        ax.axhline(y=18, color='orange', linestyle='--', alpha=0.5, label='及格线')
-        
-        # 调整布局
-        plt.tight_layout()
-        
+        key = ChartCache.make_key(records, "score_trend", (12, 8, CHART_SAVE_DPI, CHART_CONFIG["max_points"]),
+                                  user_name)
+        data = self.cache.get_or_render(
+            key, lambda: _render_png(build_score_trend_figure(records, user_name)))
+
         # 保存图表
         if save_path is None:
-            # 使用用户数据目录
-            try:
-                from utils.path_helper import get_user_data_dir
-                base_dir = get_user_data_dir()
-            except ImportError:
-                base_dir = "data"
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_path = os.path.join(base_dir, f"{user_name}_成绩趋势图_{timestamp}.png")
-        
-        # 确保目录存在
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
+            save_path = _default_save_path(user_name, "成绩趋势图")
+        _write_image(data, save_path)
+
         return save_path
-    
+
     def generate_score_distribution_chart(self, scores: Dict[str, float], user_name: str, save_path: str = None) -> str:
         """生成成绩分布图
-        
+
         Args:
             scores: 各项得分字典
             user_name: 用户姓名
             save_path: 保存路径
-            
+
         Returns:
             保存的文件路径
         """
-        # 准备数据
-        items = []
-        values = []
-        colors = []
-        
-        for key, value in scores.items():
-            if key == "total":
-                continue
-            
-            # 项目名称映射
-            item_names = {
-                "required": "必选项",
-                "category1": "第一类选考",
-                "category2": "第二类选考"
-            }
-            
-            items.append(item_names.get(key, key))
-            values.append(value)
-            
-            # 根据得分设置颜色
-            if value >= 9:
-                colors.append('#2E86AB')  # 蓝色 - 优秀
-            elif value >= 7:
-                colors.append('#A23B72')  # 紫色 - 良好
-            elif value >= 5:
-                colors.append('#F18F01')  # 橙色 - 中等
-            else:
-                colors.append('#C73E1D')  # 红色 - 需要改进
-        
-        # 创建图表
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # 绘制柱状图
-        bars = ax.bar(items, values, color=colors, alpha=0.8, edgecolor='black', linewidth=1)
-        
-        # 在柱子上添加数值标签
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                   f'{value:.1f}', ha='center', va='bottom', fontweight='bold')
-        
-        # 设置图表属性
-        ax.set_title(f'{user_name} 各项成绩分布图', fontsize=16, fontweight='bold', pad=20)
-        ax.set_ylabel('得分', fontsize=12)
-        ax.set_ylim(0, 10.5)
-        
-        # 添加水平参考线
-        ax.axhline(y=9, color='green', linestyle='--', alpha=0.5, label='优秀线')
-        ax.axhline(y=7, color='blue', linestyle='--', alpha=0.5, label='良好线')
-        ax.axhline(y=5, color='orange', linestyle='--', alpha=0.5, label='及格线')
-        
-        ax.legend()
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # 调整布局
-        plt.tight_layout()
-        
+        key = ChartCache.make_key(scores, "score_distribution", (10, 6, CHART_SAVE_DPI), user_name)
+        data = self.cache.get_or_render(
+            key, lambda: _render_png(build_score_distribution_figure(scores, user_name)))
+
         # 保存图表
         if save_path is None:
-            # 使用用户数据目录
-            try:
-                from utils.path_helper import get_user_data_dir
-                base_dir = get_user_data_dir()
-            except ImportError:
-                base_dir = "data"
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            save_path = os.path.join(base_dir, f"{user_name}_成绩分布图_{timestamp}.png")
-        
-        # 确保目录存在
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.close()
-        
+            save_path = _default_save_path(user_name, "成绩分布图")
+        _write_image(data, save_path)
+
         return save_path
+
+
+def _safe_file_name(name: str) -> str:
+    """去除文件名中的非法字符"""
+    return re.sub(r'[\\/:*?"<>|\s]+', '_', name).strip('_') or 'user'
+
+
+def _render_user_charts(task: Tuple[str, str, List[Dict], str, int]) -> List[str]:
+    """渲染单个用户的趋势图和分布图（在工作进程中执行）
+
+    Args:
+        task: (用户ID, 用户姓名, 成绩记录, 输出目录, 分辨率)
+
+    Returns:
+        生成的图片路径列表
+    """
+    user_id, user_name, records, output_dir, dpi = task
+    prefix = os.path.join(output_dir, f"{_safe_file_name(user_name)}_{user_id[:8]}")
+    paths = []
+
+    trend_path = f"{prefix}_成绩趋势图.png"
+    _save_figure(build_score_trend_figure(records, user_name), trend_path, dpi)
+    paths.append(trend_path)
+
+    distribution_path = f"{prefix}_成绩分布图.png"
+    _save_figure(build_score_distribution_figure(records[-1]["scores"], user_name), distribution_path, dpi)
+    paths.append(distribution_path)
+
+    return paths
+
+
+def render_charts_batch(users: List, output_dir: str, max_workers: Optional[int] = None,
+                        dpi: int = CHART_SAVE_DPI) -> Dict:
+    """批量渲染一组用户（如整个班级）的趋势图和分布图
+
+    每个用户的图表在进程池中独立渲染，无成绩记录的用户会被跳过。
+
+    Args:
+        users: User 对象列表
+        output_dir: 图片输出目录
+        max_workers: 进程数，默认为CPU核数；为1时在当前进程中顺序渲染
+        dpi: 图片分辨率
+
+    Returns:
+        {"paths": [...], "charts": 图表数, "users": 用户数, "failed": 失败用户列表,
+         "seconds": 耗时, "charts_per_second": 吞吐量}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(user.id, user.name, user.records, output_dir, dpi) for user in users if user.records]
+
+    logger.info('开始批量渲染图表: %s 个用户，输出目录: %s', len(tasks), output_dir)
+    start = time.perf_counter()
+    paths, failed = [], []
+
+    if max_workers == 1:
+        results = []
+        for task in tasks:
+            try:
+                results.append(_render_user_charts(task))
+            except Exception as e:
+                logger.error('渲染用户 %s 的图表失败: %s', task[1], e, exc_info=True)
+                failed.append(task[1])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [(task[1], executor.submit(_render_user_charts, task)) for task in tasks]
+            results = []
+            for user_name, future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error('渲染用户 %s 的图表失败: %s', user_name, e, exc_info=True)
+                    failed.append(user_name)
+
+    for user_paths in results:
+        paths.extend(user_paths)
+
+    seconds = time.perf_counter() - start
+    charts_per_second = len(paths) / seconds if seconds > 0 else 0.0
+    logger.info('批量渲染完成: %s 张图表，耗时 %.2f 秒，%.1f 张/秒', len(paths), seconds, charts_per_second)
+
+    return {
+        "paths": paths,
+        "charts": len(paths),
+        "users": len(tasks),
+        "failed": failed,
+        "seconds": seconds,
+        "charts_per_second": charts_per_second,
+    }
@@ -9,6 +9,7 @@ import csv
 from typing import List, Dict, Optional
 from datetime import datetime
 from utils.logger import get_logger
+from utils.metrics import timed, annotate
 
 logger = get_logger()
 
@@ -19,6 +20,7 @@ class DataExporter:
     def __init__(self):
         self.logger = logger
     
+    @timed('export_to_csv')
     def export_to_csv(self, records: List[Dict], user_name: str, output_dir: str = None) -> Optional[str]:
         """导出成绩记录为CSV格式
         
@@ -47,7 +49,7 @@ class DataExporter:
             filename = f'{user_name}_成绩记录_{timestamp}.csv'
             filepath = os.path.join(output_dir, filename)
             
-            logger.info(f'开始导出CSV: {filepath}')
+            logger.info('开始导出CSV: %s', filepath)
             
             # 写入CSV
             with open(filepath, 'w', newline='', encoding='utf-8-sig') as csvfile:
@@ -65,13 +67,16 @@ class DataExporter:
                     row = self._format_record_for_csv(record)
                     writer.writerow(row)
             
-            logger.info(f'成功导出 {len(records)} 条记录到: {filepath}')
+            annotate(records=len(records), bytes=os.path.getsize(filepath))
+            logger.info('成功导出 %s 条记录到: %s', len(records), filepath)
             return filepath
             
         except Exception as e:
-            logger.error(f'导出CSV失败: {e}', exc_info=True)
+            logger.error('导出CSV失败: %s', e, exc_info=True)
+            annotate(status='error')
             return None
     
+    @timed('export_to_excel')
     def export_to_excel(self, records: List[Dict], user_name: str, output_dir: str = None) -> Optional[str]:
         """导出成绩记录为Excel格式
         
@@ -90,6 +95,7 @@ class DataExporter:
                 from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
             except ImportError:
                 logger.error('未安装openpyxl库，无法导出Excel格式')
+                annotate(status='error')
                 return None
             
             if not records:
@@ -108,7 +114,7 @@ class DataExporter:
             filename = f'{user_name}_成绩记录_{timestamp}.xlsx'
             filepath = os.path.join(output_dir, filename)
             
-            logger.info(f'开始导出Excel: {filepath}')
+            logger.info('开始导出Excel: %s', filepath)
             
             # 创建工作簿
             wb = Workbook()
@@ -166,11 +172,13 @@ class DataExporter:
             # 保存文件
             wb.save(filepath)
             
-            logger.info(f'成功导出 {len(records)} 条记录到: {filepath}')
+            annotate(records=len(records), bytes=os.path.getsize(filepath))
+            logger.info('成功导出 %s 条记录到: %s', len(records), filepath)
             return filepath
             
         except Exception as e:
-            logger.error(f'导出Excel失败: {e}', exc_info=True)
+            logger.error('导出Excel失败: %s', e, exc_info=True)
+            annotate(status='error')
             return None
     
     def _format_record_for_csv(self, record: Dict) -> Dict:
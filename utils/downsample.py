@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+曲线降采样工具
+长期测试的学生会积累成百上千条记录，全部绘制既慢又看不清。
+使用 LTTB（Largest-Triangle-Three-Buckets）算法在给定点数预算内
+选出最能保持曲线形状的数据点，并对坐标轴刻度做抽稀
+"""
+
+from typing import List, Sequence
+
+
+def lttb_indices(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """LTTB 降采样，返回保留的数据点下标（升序，始终包含首尾两点）
+
+    Args:
+        xs: 横坐标（升序）
+        ys: 纵坐标
+        threshold: 点数预算，小于3或不小于数据点数时不降采样
+
+    Returns:
+        保留的下标列表
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    indices = [0]
+    # 除首尾两点外，其余点平均分到 threshold - 2 个桶中
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # 下一个桶的平均点，作为三角形的第三个顶点
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        if next_start >= next_end:
+            next_start, next_end = n - 1, n
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+
+        # 当前桶中与上一个选中点、下一桶平均点构成最大三角形的点
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = j
+
+        indices.append(best)
+        a = best
+
+    indices.append(n - 1)
+    return indices
+
+
+def thin_ticks(count: int, max_ticks: int) -> List[int]:
+    """在 count 个位置中均匀选出不超过 max_ticks 个刻度位置（包含首尾）
+
+    Args:
+        count: 数据点数量
+        max_ticks: 刻度数量上限
+
+    Returns:
+        刻度位置下标列表
+    """
+    if count <= max_ticks:
+        return list(range(count))
+    if max_ticks <= 1:
+        return [0]
+
+    step = (count - 1) / (max_ticks - 1)
+    return sorted({round(i * step) for i in range(max_ticks)})
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程文件锁
+Linux/macOS 使用 fcntl.flock 建议锁，Windows 使用 msvcrt.locking，
+两者都不可用时退化为不加锁（只保证单进程内的正确性）
+"""
+
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+
+class FileLock:
+    """基于独立锁文件的进程间互斥锁（上下文管理器）
+
+    用法:
+        with FileLock('data/users.json.lock'):
+            ...  # 读取、合并并写入数据文件
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Args:
+            path: 锁文件路径（不存在时自动创建）
+            timeout: Windows 下等待锁的最长时间（秒）；fcntl 为阻塞等待
+        """
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def acquire(self):
+        """获取锁（阻塞）"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a+')
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            elif msvcrt is not None:
+                self._lock_windows()
+        except Exception:
+            self._file.close()
+            self._file = None
+            raise
+
+    def _lock_windows(self):
+        deadline = time.monotonic() + self.timeout
+        self._file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f'等待文件锁超时: {self.path}')
+                time.sleep(0.01)
+
+    def release(self):
+        """释放锁"""
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> 'FileLock':
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
@@ -2,15 +2,81 @@
 """
 日志系统模块
 提供统一的日志管理功能，支持文件日志和控制台日志
+日志写入由后台线程完成，调用方只负责把日志记录放入队列
 """
 
+import atexit
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
 from typing import Optional
 
 
+# 日志队列容量，超出后按丢弃策略处理
+LOG_QUEUE_MAX_SIZE = 10000
+
+
+class DroppingQueueHandler(QueueHandler):
+    """有界队列日志处理器
+    
+    丢弃策略：队列已满时，WARNING以下的日志直接丢弃；
+    WARNING及以上的日志挤掉队列中最旧的一条，保证重要日志不丢失。
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_count = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        """非阻塞入队，避免日志拖慢界面线程"""
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        
+        self.dropped_count += 1
+        if record.levelno < logging.WARNING:
+            return
+        
+        try:
+            self.queue.get_nowait()
+            self.queue.task_done()
+        except queue.Empty:
+            pass
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """结构化指标日志格式化器，每条记录输出为一行JSON"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+        }
+        entry.update(record.metrics)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _is_metrics_record(record: logging.LogRecord) -> bool:
+    """是否为结构化指标日志记录"""
+    return hasattr(record, 'metrics')
+
+
+class BlockingStopQueueListener(QueueListener):
+    """停止时阻塞写入结束标记的队列监听器，避免队列满时无法停止"""
+    
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
 class Logger:
     """日志管理器"""
     
@@ -73,12 +139,59 @@ class Logger:
         file_handler.setFormatter(file_formatter)
         console_handler.setFormatter(console_formatter)
         
-        # 添加handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # 结构化指标日志（JSON Lines），与文本日志分开存放
+        self.metrics_file = os.path.join(log_dir, f'metrics_{datetime.now().strftime("%Y%m%d")}.jsonl')
+        metrics_handler = RotatingFileHandler(
+            self.metrics_file,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        metrics_handler.setLevel(logging.DEBUG)
+        metrics_handler.setFormatter(JsonLinesFormatter())
+        metrics_handler.addFilter(_is_metrics_record)
+        file_handler.addFilter(lambda record: not _is_metrics_record(record))
+        console_handler.addFilter(lambda record: not _is_metrics_record(record))
+        
+        self.console_handler = console_handler
+        
+        # 文件和控制台输出由后台线程完成
+        self._handlers = [file_handler, console_handler, metrics_handler]
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+        self._queue_handler = DroppingQueueHandler(self._queue)
+        self._listener = BlockingStopQueueListener(
+            self._queue, *self._handlers, respect_handler_level=True
+        )
+        self._listener.start()
+        
+        self.logger.addHandler(self._queue_handler)
+        atexit.register(self.shutdown)
         
         self.logger.info('日志系统初始化完成')
     
+    def shutdown(self):
+        """停止后台日志线程并写出队列中剩余的日志
+        
+        停止后日志改为直接同步写入，保证退出过程中的日志不丢失。
+        """
+        if self._listener is None:
+            return
+        
+        self._listener.stop()
+        self._listener = None
+        
+        self.logger.removeHandler(self._queue_handler)
+        for handler in self._handlers:
+            self.logger.addHandler(handler)
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # 解释器退出时控制台流可能已关闭
+                pass
+        
+        if self._queue_handler.dropped_count:
+            self.logger.warning('日志队列已满，共丢弃 %s 条日志', self._queue_handler.dropped_count)
+    
     def _get_log_directory(self) -> str:
         """获取日志目录路径"""
         try:
@@ -90,29 +203,53 @@ class Logger:
             # 开发环境回退方案
             return 'logs'
     
-    def debug(self, message: str):
+    def isEnabledFor(self, level: int) -> bool:
+        """判断指定级别的日志是否会被处理，用于跳过昂贵的日志参数计算"""
+        return self.logger.isEnabledFor(level)
+    
+    def set_level(self, level: int):
+        """设置日志级别"""
+        self.logger.setLevel(level)
+    
+    def set_console_level(self, level: int):
+        """设置控制台输出级别（文件日志不受影响）"""
+        self.console_handler.setLevel(level)
+    
+    def metric(self, operation: str, **fields):
+        """记录一条结构化指标日志（写入JSON Lines文件）
+        
+        Args:
+            operation: 操作名称，如 "save_data"
+            **fields: 指标字段，如 duration_ms、records、bytes
+        """
+        metrics = {'operation': operation}
+        metrics.update(fields)
+        self.logger.info('%s', operation, extra={'metrics': metrics})
+    
+    # 日志方法支持 %-style 参数，仅在级别启用时才格式化消息
+    def debug(self, message: str, *args):
         """记录DEBUG级别日志"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """记录INFO级别日志"""
-        self.logger.info(message)
+        self.logger.info(message, *args)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """记录WARNING级别日志"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args)
     
-    def error(self, message: str, exc_info: bool = False):
+    def error(self, message: str, *args, exc_info: bool = False):
         """记录ERROR级别日志"""
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, *args, exc_info=exc_info)
     
-    def critical(self, message: str, exc_info: bool = False):
+    def critical(self, message: str, *args, exc_info: bool = False):
         """记录CRITICAL级别日志"""
-        self.logger.critical(message, exc_info=exc_info)
+        self.logger.critical(message, *args, exc_info=exc_info)
     
-    def exception(self, message: str):
+    def exception(self, message: str, *args):
         """记录异常信息（自动包含堆栈跟踪）"""
-        self.logger.exception(message)
+        self.logger.exception(message, *args)
 
 
 # 创建全局logger实例
@@ -125,31 +262,36 @@ def get_logger() -> Logger:
 
 
 # 便捷函数
-def debug(message: str):
+def debug(message: str, *args):
     """记录DEBUG级别日志"""
-    _logger_instance.debug(message)
+    _logger_instance.debug(message, *args)
 
 
-def info(message: str):
+def info(message: str, *args):
     """记录INFO级别日志"""
-    _logger_instance.info(message)
+    _logger_instance.info(message, *args)
 
 
-def warning(message: str):
+def warning(message: str, *args):
     """记录WARNING级别日志"""
-    _logger_instance.warning(message)
+    _logger_instance.warning(message, *args)
 
 
-def error(message: str, exc_info: bool = False):
+def error(message: str, *args, exc_info: bool = False):
     """记录ERROR级别日志"""
-    _logger_instance.error(message, exc_info=exc_info)
+    _logger_instance.error(message, *args, exc_info=exc_info)
 
 
-def critical(message: str, exc_info: bool = False):
+def critical(message: str, *args, exc_info: bool = False):
     """记录CRITICAL级别日志"""
-    _logger_instance.critical(message, exc_info=exc_info)
+    _logger_instance.critical(message, *args, exc_info=exc_info)
 
 
-def exception(message: str):
+def exception(message: str, *args):
     """记录异常信息"""
-    _logger_instance.exception(message)
+    _logger_instance.exception(message, *args)
+
+
+def shutdown():
+    """停止后台日志线程并写出剩余日志"""
+    _logger_instance.shutdown()
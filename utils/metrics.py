@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+操作耗时指标模块
+提供计时装饰器，将各操作的耗时、记录数、字节数写入结构化指标日志，
+并可汇总指标日志生成各操作的 p50/p95/p99 报告
+
+用法: python -m utils.metrics [指标文件...]
+"""
+
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# 每个线程维护一个当前操作的指标字段栈，支持嵌套计时
+_local = threading.local()
+
+
+def _field_stack() -> List[Dict]:
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def annotate(**fields):
+    """为当前正在计时的操作补充指标字段（如 records、bytes）
+
+    自行捕获异常、以返回值表示失败的操作应调用 annotate(status='error')，
+    否则 timed 只能看到正常返回而记为 'ok'。不在计时操作中调用时忽略。
+    """
+    stack = _field_stack()
+    if stack:
+        stack[-1].update(fields)
+
+
+def timed(operation: str):
+    """计时装饰器：记录被装饰函数的耗时和通过 annotate 补充的字段
+
+    Args:
+        operation: 操作名称
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = _field_stack()
+            fields = {}
+            stack.append(fields)
+            status = 'error'
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                status = 'ok'
+                return result
+            finally:
+                duration_ms = (time.perf_counter() - start) * 1000
+                stack.pop()
+                metrics = {'duration_ms': round(duration_ms, 3), 'status': status}
+                metrics.update(fields)
+                logger.metric(operation, **metrics)
+        return wrapper
+    return decorator
+
+
+def load_metrics(paths: List[str]) -> List[Dict]:
+    """读取指标日志文件中的所有记录，跳过无法解析的行"""
+    entries = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if 'operation' in entry and 'duration_ms' in entry:
+                    entries.append(entry)
+    return entries
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """计算已排序数据的百分位数（线性插值）"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(entries: List[Dict]) -> Dict[str, Dict]:
+    """按操作汇总耗时分位数、调用次数以及记录数与字节数合计
+
+    Returns:
+        {operation: {"count", "errors", "p50", "p95", "p99", "max", "records", "bytes"}}
+    """
+    grouped: Dict[str, List[Dict]] = {}
+    for entry in entries:
+        grouped.setdefault(entry['operation'], []).append(entry)
+
+    summary = {}
+    for operation, items in grouped.items():
+        durations = sorted(item['duration_ms'] for item in items)
+        summary[operation] = {
+            'count': len(items),
+            'errors': sum(1 for item in items if item.get('status') == 'error'),
+            'p50': percentile(durations, 50),
+            'p95': percentile(durations, 95),
+            'p99': percentile(durations, 99),
+            'max': durations[-1],
+            'records': sum(item.get('records', 0) for item in items),
+            'bytes': sum(item.get('bytes', 0) for item in items),
+        }
+    return summary
+
+
+def format_report(summary: Dict[str, Dict]) -> str:
+    """格式化汇总结果为文本表格"""
+    header = f"{'操作':<20}{'次数':>8}{'失败':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}"
+    lines = [header, '-' * len(header)]
+    for operation in sorted(summary):
+        s = summary[operation]
+        lines.append(f"{operation:<20}{s['count']:>8}{s['errors']:>6}"
+                     f"{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}")
+    return '\n'.join(lines)
+
+
+def default_metrics_files() -> List[str]:
+    """默认汇总日志目录下的全部指标文件"""
+    log_dir = os.path.dirname(logger.metrics_file)
+    return sorted(glob.glob(os.path.join(log_dir, 'metrics_*.jsonl*')))
+
+
+def main(argv: Optional[List[str]] = None):
+    """汇总指标日志并打印报告"""
+    paths = (argv if argv is not None else sys.argv[1:]) or default_metrics_files()
+    if not paths:
+        print("未找到指标日志文件")
+        return
+
+    summary = summarize(load_metrics(paths))
+    if not summary:
+        print("指标日志中没有可汇总的记录")
+        return
+    print(format_report(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+性能剖析模块
+通过环境变量 SPORTS_PERFORMANCE_PROFILE=1 或命令行参数 --profile 开启，
+开启后主循环在 cProfile 下运行，并统计各界面回调（打开报告、渲染图表、保存成绩等）的耗时，
+退出时将结果写入用户数据目录下的 profiles/ 目录
+"""
+
+import functools
+import io
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict
+
+from utils.logger import get_logger
+
+logger = get_logger()
+
+PROFILE_ENV_VAR = 'SPORTS_PERFORMANCE_PROFILE'
+PROFILE_CLI_FLAG = '--profile'
+
+_enabled = os.environ.get(PROFILE_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes', 'on')
+
+# 回调耗时统计 {名称: {"count", "total_ms", "max_ms"}}
+_callback_stats: Dict[str, Dict[str, float]] = {}
+
+
+def enable():
+    """开启剖析模式"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """关闭剖析模式（已记录的回调耗时保留，需清空时调用 reset_stats）"""
+    global _enabled
+    _enabled = False
+
+
+def reset_stats():
+    """清空回调耗时统计"""
+    _callback_stats.clear()
+
+
+def is_enabled() -> bool:
+    """剖析模式是否开启"""
+    return _enabled
+
+
+def _record(name: str, duration_ms: float):
+    stats = _callback_stats.setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+    stats['count'] += 1
+    stats['total_ms'] += duration_ms
+    stats['max_ms'] = max(stats['max_ms'], duration_ms)
+
+
+@contextmanager
+def measure(name: str):
+    """统计一段代码的耗时（仅在剖析模式下记录）"""
+    if not _enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, (time.perf_counter() - start) * 1000)
+
+
+def profile_callback(name: str):
+    """界面回调耗时统计装饰器（仅在剖析模式下记录）
+
+    Args:
+        name: 回调名称，如 "report.open"
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def get_callback_stats() -> Dict[str, Dict[str, float]]:
+    """获取回调耗时统计（含平均耗时）"""
+    return {
+        name: dict(stats, avg_ms=stats['total_ms'] / stats['count'])
+        for name, stats in _callback_stats.items()
+    }
+
+
+def _get_profile_directory() -> str:
+    """获取剖析结果目录"""
+    try:
+        from utils.path_helper import get_user_data_dir
+        base_dir = get_user_data_dir()
+    except ImportError:
+        base_dir = 'data'
+    return os.path.join(base_dir, 'profiles')
+
+
+def dump_results(profile, output_dir: str = None) -> str:
+    """将 cProfile 结果和回调耗时写入文件
+
+    生成三个文件：.prof（可用 snakeviz 等工具查看）、按累计耗时排序的文本报告、回调耗时JSON
+
+    Args:
+        profile: cProfile.Profile 对象，为None时只写回调耗时
+        output_dir: 输出目录，默认为用户数据目录下的 profiles/
+
+    Returns:
+        文件名前缀路径
+    """
+    output_dir = output_dir or _get_profile_directory()
+    os.makedirs(output_dir, exist_ok=True)
+    prefix = os.path.join(output_dir, f'profile_{datetime.now().strftime("%Y%m%d_%H%M%S")}')
+
+    if profile is not None:
+        import pstats
+        profile.dump_stats(f'{prefix}.prof')
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(50)
+        with open(f'{prefix}.txt', 'w', encoding='utf-8') as f:
+            f.write(stream.getvalue())
+
+    with open(f'{prefix}_callbacks.json', 'w', encoding='utf-8') as f:
+        json.dump(get_callback_stats(), f, ensure_ascii=False, indent=2)
+
+    logger.info('剖析结果已保存: %s.*', prefix)
+    return prefix
+
+
+def run_profiled(func: Callable):
+    """在 cProfile 下运行函数（通常是 Tk 主循环），结束后保存剖析结果"""
+    import cProfile
+    profile = cProfile.Profile()
+    logger.info('剖析模式已开启')
+    try:
+        return profile.runcall(func)
+    finally:
+        try:
+            dump_results(profile)
+        except Exception as e:
+            logger.error('保存剖析结果失败: %s', e, exc_info=True)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+成绩趋势图模块
+使用面向对象的 Figure 接口构建可复用的趋势图：
+图表只创建一次，刷新时通过 set_data 原地更新折线数据，
+不依赖具体的绘图后端，可同时用于 Tk 界面和无界面渲染。
+记录过多时按点数预算做 LTTB 降采样，横坐标刻度自动抽稀
+"""
+
+from typing import Dict, List, Tuple
+
+import matplotlib
+from matplotlib.figure import Figure
+
+from config.constants import CHART_CONFIG, THEME_COLORS
+from utils.downsample import lttb_indices, thin_ticks
+
+# 中文字体只需设置一次，不在每次刷新时重置
+matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'Microsoft YaHei']
+matplotlib.rcParams['axes.unicode_minus'] = False
+
+# 折线配置: (得分键, 图例名称, 颜色, 标记, 线宽, 标记大小, 透明度, 图层)
+TREND_SERIES = [
+    ("total", "总分", THEME_COLORS["primary"], "o", 3, 8, 1.0, 3),
+    ("required", "必选项", THEME_COLORS["info"], "s", 2, 6, 0.6, 2),
+    ("category1", "第一类选考", THEME_COLORS["success"], "^", 2, 6, 0.6, 2),
+    ("category2", "第二类选考", THEME_COLORS["warning"], "d", 2, 6, 0.6, 2),
+]
+
+# update 的返回值
+CHART_UNCHANGED = "unchanged"  # 数据未变化，无需重绘
+CHART_DATA_CHANGED = "data"    # 仅折线数值变化，坐标轴不变，可使用局部重绘（blit）
+CHART_LAYOUT_CHANGED = "layout"  # 数据点数量、日期或标题变化，需要完整重绘
+
+
+class TrendChart:
+    """可复用的成绩趋势图"""
+
+    def __init__(self, figsize: Tuple[float, float] = (9, 4), dpi: int = 100, animated: bool = False,
+                 max_points: int = CHART_CONFIG["max_points"], max_ticks: int = CHART_CONFIG["max_ticks"]):
+        """初始化图表
+
+        Args:
+            figsize: 图表尺寸（英寸）
+            dpi: 分辨率
+            animated: 折线是否由调用方通过 blit 单独绘制
+            max_points: 每条折线最多绘制的点数，为0时不降采样
+            max_ticks: 横坐标最多显示的刻度数
+        """
+        self.max_points = max_points
+        self.max_ticks = max_ticks
+        self.figure = Figure(figsize=figsize, dpi=dpi, facecolor='white')
+        self.ax = self.figure.add_subplot(111)
+        self.lines = {}
+        self._layout_key = None
+        self._data_key = None
+
+        ax = self.ax
+        # 移除顶部和右侧边框
+        ax.spines['top'].set_visible(False)
+        ax.spines['right'].set_visible(False)
+        ax.spines['left'].set_color(THEME_COLORS["text_light"])
+        ax.spines['bottom'].set_color(THEME_COLORS["text_light"])
+
+        for key, label, color, marker, width, size, alpha, zorder in TREND_SERIES:
+            line, = ax.plot([], [], marker=marker, linewidth=width, markersize=size,
+                            label=label, color=color, alpha=alpha, zorder=zorder,
+                            animated=animated)
+            self.lines[key] = line
+
+        ax.set_xlabel('测试日期', fontsize=10, color=THEME_COLORS["text_light"])
+        ax.set_ylabel('得分', fontsize=10, color=THEME_COLORS["text_light"])
+        ax.tick_params(axis='y', colors=THEME_COLORS["text_normal"])
+        ax.set_ylim(0, 10.5)
+        ax.set_yticks(range(0, 11, 2))
+        ax.grid(True, linestyle='--', alpha=0.2, zorder=0, color=THEME_COLORS["text_light"])
+        ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15),
+                  ncol=len(TREND_SERIES), frameon=False, fontsize=9)
+
+    def update(self, records: List[Dict], title: str) -> str:
+        """用最新记录原地更新折线
+
+        Args:
+            records: 成绩记录列表
+            title: 图表标题
+
+        Returns:
+            CHART_UNCHANGED / CHART_DATA_CHANGED / CHART_LAYOUT_CHANGED
+        """
+        dates = tuple(r['date'] for r in records)
+        series = {key: [r['scores'][key] for r in records] for key, *_ in TREND_SERIES}
+        data_key = tuple(tuple(values) for values in series.values())
+        layout_key = (dates, title)
+
+        if layout_key == self._layout_key and data_key == self._data_key:
+            return CHART_UNCHANGED
+
+        # 按总分曲线选取保留的记录，各条折线使用相同的下标，横坐标仍为原始序号
+        x = lttb_indices(range(len(dates)), series["total"], self.max_points or len(dates))
+        for key, values in series.items():
+            self.lines[key].set_data(x, [values[i] for i in x])
+        self._data_key = data_key
+
+        if layout_key == self._layout_key:
+            return CHART_DATA_CHANGED
+
+        ax = self.ax
+        ax.set_title(title, fontsize=14, fontweight='bold', pad=20, color=THEME_COLORS["text_dark"])
+        ax.set_xlim(-0.5, max(len(dates) - 0.5, 0.5))
+        ticks = thin_ticks(len(dates), self.max_ticks)
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([dates[i] for i in ticks], rotation=30, ha='right', fontsize=9,
+                           color=THEME_COLORS["text_normal"])
+        self.figure.tight_layout()
+        self._layout_key = layout_key
+        return CHART_LAYOUT_CHANGED
+
+    def draw_lines(self):
+        """单独绘制各条折线（blit 时在恢复的背景上调用）"""
+        for line in self.lines.values():
+            self.ax.draw_artist(line)